@@ -0,0 +1,146 @@
+"""
+Benchmark of the import time of the package.
+
+Every import runs in a fresh interpreter with ``python -X importtime``, and
+the median of the total import time is reported, with the heavy dependencies
+the import loaded. The results are compared with a stored baseline.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --save-baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "import_baseline.json")
+
+# an import is a regression when it is slower than the baseline by this share.
+DEFAULT_TOLERANCE = 0.2
+
+IMPORTS = {
+    "package": "import fcb_data_providers",
+    "providers": "import fcb_data_providers.providers",
+    "provider_class": "from fcb_data_providers.providers import StatsPerformProvider",
+}
+
+HEAVY_MODULES = ("pandas", "pyarrow", "sqlalchemy", "pydantic", "dotenv")
+
+
+def measure_import(statement: str) -> tuple:
+    """
+    Run an import statement in a fresh interpreter.
+
+    statement: str: The import statement.
+
+    return: tuple: The total import time in milliseconds, and the heavy
+        modules it loaded.
+    """
+    code = (
+        f"{statement}\n"
+        "import sys\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    microseconds = 0
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # only the top level imports, their cumulative time includes the rest.
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            microseconds += int(cumulative)
+    loaded = [module for module in process.stdout.strip().split(",") if module]
+    return microseconds / 1000, loaded
+
+
+def run_benchmarks(repeat: int) -> Dict[str, dict]:
+    """
+    Measure every import of IMPORTS.
+
+    repeat: int: The number of runs of every import.
+
+    return: Dict[str, dict]: The median milliseconds and the loaded heavy
+        modules of every import.
+    """
+    results = {}
+    for name, statement in IMPORTS.items():
+        runs = [measure_import(statement) for _ in range(repeat)]
+        results[name] = {
+            "statement": statement,
+            "milliseconds": statistics.median(ms for ms, _ in runs),
+            "loaded": runs[0][1],
+        }
+    return results
+
+
+def compare_with_baseline(
+    results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    """
+    Get the imports which became slower than the baseline.
+
+    results: Dict[str, dict]: The results.
+    baseline: Dict[str, dict]: The baseline results.
+    tolerance: float: The allowed slowdown, as a share of the baseline.
+
+    return: List[str]: A description of every regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name, {}).get("milliseconds")
+        if expected and result["milliseconds"] > expected * (1 + tolerance):
+            regressions.append(
+                f"{name}: {result['milliseconds']:.1f} ms, baseline {expected:.1f} ms"
+            )
+    return regressions
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(arguments)
+
+    results = run_benchmarks(args.repeat)
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{'import':<16}{'ms':>10}{'vs baseline':>13}  loaded")
+    for name, result in results.items():
+        expected = baseline.get(name, {}).get("milliseconds")
+        change = f"{result['milliseconds'] / expected - 1:+.0%}" if expected else "-"
+        print(
+            f"{name:<16}{result['milliseconds']:>10.1f}{change:>13}  "
+            f"{', '.join(result['loaded']) or '-'}"
+        )
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
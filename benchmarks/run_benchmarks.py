@@ -0,0 +1,400 @@
+"""
+Benchmarks of the StatsPerform provider on synthetic feeds.
+
+Times get_json_data, the JSON decoders, every store_* stage and an end-to-end
+process_data run on SQLite, and on PostgreSQL when a URL is given, and reports
+rows/sec and peak python memory. The results are compared with a stored
+baseline.
+
+Usage:
+    python -m benchmarks.run_benchmarks --matches 4 --events 1800
+    python -m benchmarks.run_benchmarks --save-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from fcb_data_providers.providers import StatsPerformProvider
+from fcb_data_providers.readers import read_feed
+from fcb_data_providers.readers.decoders import (get_available_json_decoders,
+                                                 load_feed)
+from fcb_data_providers.synthetic import write_synthetic_feeds
+from fcb_data_providers.utils import initialize
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# a benchmark is a regression when its rows/sec drop by more than this share.
+DEFAULT_TOLERANCE = 0.2
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    The measurement of one benchmark.
+
+    name: str: The benchmark name, e.g. store_event_data.
+    database: str: The database dialect, sqlite or postgresql.
+    rows: int: The number of rows handled.
+    seconds: float: The wall time.
+    peak_memory_mb: float: The peak python memory allocated while it ran.
+    """
+
+    name: str
+    database: str
+    rows: int
+    seconds: float
+    peak_memory_mb: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.database}:{self.name}"
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def measure(function: Callable, *args, reset: Optional[Callable] = None) -> tuple:
+    """
+    Run a function, and measure its wall time and peak python memory.
+
+    The function runs once to warm up, e.g. to import its modules and fill the
+    page cache, then once timed, and once more for its peak memory, as
+    tracemalloc slows the function down several times.
+
+    function: Callable: The function.
+    args: Any: The arguments of the function.
+    reset: Callable: Restores the state the function starts from, before every
+        run, e.g. empty tables.
+
+    return: tuple: The result of the timed run, the seconds and the peak memory
+        in MB.
+    """
+
+    def run():
+        if reset is not None:
+            reset()
+        return function(*args)
+
+    run()
+    if reset is not None:
+        reset()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+
+    if reset is not None:
+        reset()
+    tracemalloc.start()
+    try:
+        function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def reset_database(provider: StatsPerformProvider) -> None:
+    """Empty the tables and the dimension cache of the provider."""
+    provider.db.drop_tables()
+    provider.db.create_tables()
+    provider.dimension_cache.clear()
+
+
+def count_event_rows(feed) -> int:
+    """Count the event and qualifier rows of a match_event feed."""
+    events = feed.live_data.get("event") or []
+    return len(events) + sum(len(event.get("qualifier") or []) for event in events)
+
+
+def benchmark_json_decoders(event_file: str, database: str) -> List[BenchmarkResult]:
+    """
+    Time reading a whole match_event feed with every installed JSON decoder,
+    and with the stream decoder.
+
+    event_file: str: The match_event file.
+    database: str: The database dialect of the run.
+
+    return: List[BenchmarkResult]: The results, one per decoder.
+    """
+
+    def read_with(decoder: str):
+        if decoder == StatsPerformProvider.STREAM_DECODER:
+            return read_feed(event_file).load()
+        return load_feed(event_file, decoder, stream_key=None)
+
+    results = []
+    decoders = get_available_json_decoders() + (StatsPerformProvider.STREAM_DECODER,)
+    for decoder in decoders:
+        feed, seconds, peak = measure(read_with, decoder)
+        rows = len(feed.live_data["event"])
+        results.append(
+            BenchmarkResult(f"decode.{decoder}", database, rows, seconds, peak)
+        )
+    return results
+
+
+def benchmark_store_stages(
+    provider: StatsPerformProvider, event_file: str, stats_file: str, database: str
+) -> List[BenchmarkResult]:
+    """
+    Time every store_* stage on the feeds of one match.
+
+    Every stage runs in its own match scope, as in process_data, and its time
+    includes the commit. Before every run of a stage, the tables are emptied
+    and the stages before it are stored again.
+
+    provider: StatsPerformProvider: The provider.
+    event_file: str: A match_event file.
+    stats_file: str: The match_stats file of the same match.
+    database: str: The database dialect.
+
+    return: List[BenchmarkResult]: The result of every stage.
+    """
+    event_feed = provider.read_feed(event_file).load()
+    stats_feed = provider.read_feed(stats_file).load()
+    match_id, contestants, match_details = provider.get_match_info(event_feed)
+    lineups = stats_feed.live_data["lineUp"]
+    goals = stats_feed.live_data["goal"]
+    cards = stats_feed.live_data["card"]
+    stages = [
+        ("store_match_data", 1, (match_id, match_details)),
+        ("store_team_data", len(contestants), (contestants,)),
+        ("store_period_data", len(match_details["period"]), (match_id, match_details)),
+        ("store_score_data", 1, (match_id, match_details)),
+        (
+            "store_event_data",
+            count_event_rows(event_feed),
+            (match_id, event_feed.live_data["event"]),
+        ),
+        (
+            "store_player_data",
+            sum(len(lineup["player"]) for lineup in lineups),
+            (lineups,),
+        ),
+        ("store_goal_data", len(goals), (match_id, goals)),
+        ("store_card_data", len(cards), (match_id, cards)),
+    ]
+
+    def run_stage(name: str, args: tuple) -> None:
+        with provider.match_scope(match_id):
+            provider.store_section(
+                match_id, name, getattr(provider, name), *args, required=True
+            )
+
+    def reset_stage(index: int) -> None:
+        reset_database(provider)
+        for name, _, args in stages[:index]:
+            run_stage(name, args)
+
+    results = []
+    for index, (name, rows, args) in enumerate(stages):
+        _, seconds, peak = measure(
+            run_stage, name, args, reset=lambda: reset_stage(index)
+        )
+        results.append(BenchmarkResult(name, database, rows, seconds, peak))
+    return results
+
+
+def run_benchmarks(
+    database_url: str,
+    data_path: str,
+    matches: int,
+    events: int,
+    qualifiers_per_event: int,
+    players_per_team: int,
+    bulk_insert: bool,
+    extension: str = ".json",
+    json_decoder: str = "auto",
+) -> List[BenchmarkResult]:
+    """
+    Run all the benchmarks against one database.
+
+    database_url: str: The database URL, the database should be empty.
+    data_path: str: The directory of the synthetic feed files.
+    matches: int: The number of matches of the end-to-end run.
+    events: int: The number of events per match.
+    qualifiers_per_event: int: The average number of qualifiers per event.
+    players_per_team: int: The number of players of every team.
+    bulk_insert: bool: Run the provider in bulk insert mode.
+    extension: str: The extension of the feed files, e.g. .json or .json.gz.
+    json_decoder: str: The JSON decoder of the provider.
+
+    return: List[BenchmarkResult]: The results.
+    """
+    file_paths = write_synthetic_feeds(
+        data_path,
+        matches=matches,
+        events=events,
+        qualifiers_per_event=qualifiers_per_event,
+        players_per_team=players_per_team,
+        extension=extension,
+    )
+    provider = StatsPerformProvider(
+        data_path=data_path,
+        database_url=database_url,
+        bulk_insert=bulk_insert,
+        json_decoder=json_decoder,
+    )
+    database = provider.db.engine.dialect.name
+    event_files = [path for path in file_paths if "match_event_" in path]
+    stats_files = [path for path in file_paths if "match_stats_" in path]
+
+    results = []
+    feed, seconds, peak = measure(provider.get_json_data, event_files[0])
+    rows = len(feed["liveData"]["event"])
+    results.append(BenchmarkResult("get_json_data", database, rows, seconds, peak))
+    results.extend(benchmark_json_decoders(event_files[0], database))
+
+    results.extend(
+        benchmark_store_stages(provider, event_files[0], stats_files[0], database)
+    )
+
+    rows = sum(
+        count_event_rows(provider.read_feed(path).load()) for path in event_files
+    )
+    # every run ingests all the files into empty tables.
+    process_results, seconds, peak = measure(
+        provider.process_data, reset=lambda: reset_database(provider)
+    )
+    failed = [result for result in process_results if not result.success]
+    if failed:
+        raise RuntimeError(f"process_data failed for {len(failed)} files")
+    results.append(BenchmarkResult("process_data", database, rows, seconds, peak))
+    provider.session.close()
+    return results
+
+
+def compare_with_baseline(
+    results: List[BenchmarkResult], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    """
+    Get the benchmarks whose rows/sec dropped below the baseline.
+
+    results: List[BenchmarkResult]: The results.
+    baseline: Dict[str, dict]: The baseline results by benchmark key.
+    tolerance: float: The allowed drop, as a share of the baseline rows/sec.
+
+    return: List[str]: A description of every regression.
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.key, {}).get("rows_per_sec")
+        if expected and result.rows_per_sec < expected * (1 - tolerance):
+            regressions.append(
+                f"{result.key}: {result.rows_per_sec:,.0f} rows/sec, "
+                f"baseline {expected:,.0f} rows/sec"
+            )
+    return regressions
+
+
+def format_report(results: List[BenchmarkResult], baseline: Dict[str, dict]) -> str:
+    """
+    Format the results as a table, with the change against the baseline.
+
+    results: List[BenchmarkResult]: The results.
+    baseline: Dict[str, dict]: The baseline results by benchmark key.
+
+    return: str: The report.
+    """
+    lines = [
+        f"{'benchmark':<32}{'rows':>10}{'seconds':>10}"
+        f"{'rows/sec':>14}{'peak MB':>10}{'vs baseline':>13}"
+    ]
+    for result in results:
+        expected = baseline.get(result.key, {}).get("rows_per_sec")
+        change = f"{result.rows_per_sec / expected - 1:+.0%}" if expected else "-"
+        lines.append(
+            f"{result.key:<32}{result.rows:>10}{result.seconds:>10.3f}"
+            f"{result.rows_per_sec:>14,.0f}{result.peak_memory_mb:>10.1f}{change:>13}"
+        )
+    return "\n".join(lines)
+
+
+def to_baseline(results: List[BenchmarkResult]) -> Dict[str, dict]:
+    """Get the baseline entries of the results, by benchmark key."""
+    return {
+        result.key: {**asdict(result), "rows_per_sec": result.rows_per_sec}
+        for result in results
+    }
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matches", type=int, default=4)
+    parser.add_argument("--events", type=int, default=1800)
+    parser.add_argument("--qualifiers", type=int, default=4)
+    parser.add_argument("--players", type=int, default=18)
+    parser.add_argument("--bulk-insert", action="store_true")
+    parser.add_argument(
+        "--extension",
+        default=".json",
+        help="The feed file extension, e.g. .json.gz, .json.zst or .jsonl.",
+    )
+    parser.add_argument(
+        "--json-decoder",
+        default="auto",
+        help="The JSON decoder of the provider: stream, auto, orjson, msgspec or json.",
+    )
+    parser.add_argument(
+        "--postgres-url",
+        default=os.getenv("BENCHMARK_POSTGRES_URL"),
+        help="An empty PostgreSQL database to benchmark as well.",
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(arguments)
+
+    initialize()
+    logging.getLogger("fcb_data_providers").setLevel(args.log_level)
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_urls = [f"sqlite:///{os.path.join(temp_dir, 'benchmark.db')}"]
+        if args.postgres_url:
+            database_urls.append(args.postgres_url)
+        for index, database_url in enumerate(database_urls):
+            results.extend(
+                run_benchmarks(
+                    database_url,
+                    os.path.join(temp_dir, f"data_{index}"),
+                    matches=args.matches,
+                    events=args.events,
+                    qualifiers_per_event=args.qualifiers,
+                    players_per_team=args.players,
+                    bulk_insert=args.bulk_insert,
+                    extension=args.extension,
+                    json_decoder=args.json_decoder,
+                )
+            )
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print(format_report(results, baseline))
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(to_baseline(results), f, indent=2)
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -39,6 +39,14 @@ setup(
     package_data={"fcb_data_providers": ["res/*"]},
     long_description=read("README.md"),
     install_requires=get_prod_requirements(),
+    extras_require={
+        # the numpy of the prod requirements is 1.x, newer pyarrow needs numpy 2.
+        "parquet": ["pyarrow>=14.0,<18", "numpy>=1.26,<2"],
+        "zstd": ["zstandard>=0.22"],
+        "orjson": ["orjson>=3.8"],
+        "msgspec": ["msgspec>=0.18"],
+        "async": ["greenlet", "aiosqlite", "asyncpg"],
+    },
     tests_require=[
         "pytest",
         "pytest-cov",
@@ -8,4 +8,25 @@ This is a python package to handle the data providers for the scouting models
 __title__ = "FC Bayern Data Providers"
 __copyright__ = "© 2024 saud"
 
+from .lazy import lazy_exports
 from .version import __version__
+
+# submodules and helpers, imported on first access, so importing the package
+# loads neither pandas nor SQLAlchemy, and does not configure anything.
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "database": None,
+        "database_models": None,
+        "metrics": None,
+        "models": None,
+        "providers": None,
+        "readers": None,
+        "repositories": None,
+        "sinks": None,
+        "synthetic": None,
+        "utils": None,
+        "initialize": ".utils",
+        "configure_logging": ".utils",
+    },
+)
@@ -0,0 +1,139 @@
+from collections import defaultdict
+from contextlib import nullcontext
+from logging import Logger
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm.session import Session
+
+from fcb_data_providers.metrics import IngestMetrics, StageMetrics
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class BulkWriter:
+    """
+    Collect validated rows per table and write them in batches.
+
+    Rows are buffered per ORM model and flushed through a single Core
+    multi-row ``insert()`` (executemany) once a buffer reaches ``batch_size``,
+    instead of one ``session.add`` and ``session.commit`` per row.
+
+    With ``autocommit`` disabled the batches are only executed, and committing
+    or rolling back is left to the surrounding transaction. Every batch is
+    measured as the write stage of its table when ``metrics`` are given.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        logger: Logger,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        autocommit: bool = True,
+        metrics: Optional[IngestMetrics] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        self.session = session
+        self.logger = logger
+        self.batch_size = batch_size
+        self.autocommit = autocommit
+        self.metrics = metrics
+        self._buffers: Dict[type, List[dict]] = defaultdict(list)
+
+    def add(self, model, row: dict) -> None:
+        """
+        Buffer one row for the given model, flushing the buffer when it is full.
+
+        model: BaseModel: The model class.
+        row: dict: The validated row data.
+
+        return: None
+        """
+        buffer = self._buffers[model]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+
+    def add_many(self, model, rows: List[dict]) -> None:
+        """
+        Buffer many rows for the given model, flushing full batches.
+
+        model: BaseModel: The model class.
+        rows: List[dict]: The validated rows data.
+
+        return: None
+        """
+        buffer = self._buffers[model]
+        buffer.extend(rows)
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+
+    def pending(self, model=None) -> int:
+        """
+        Get the number of buffered rows.
+
+        model: BaseModel: Only count rows of this model class, optional.
+
+        return: int: Number of rows waiting to be written.
+        """
+        if model is not None:
+            return len(self._buffers.get(model, []))
+        return sum(len(rows) for rows in self._buffers.values())
+
+    def clear(self) -> None:
+        """
+        Drop all the buffered rows without writing them.
+
+        return: None
+        """
+        self._buffers.clear()
+
+    def flush(self, model=None) -> int:
+        """
+        Write the buffered rows to the database.
+
+        model: BaseModel: Only flush rows of this model class, optional.
+
+        return: int: Number of rows written.
+        """
+        models = [model] if model is not None else list(self._buffers)
+        written = 0
+        for table_model in models:
+            rows = self._buffers.pop(table_model, None)
+            if not rows:
+                continue
+            for start in range(0, len(rows), self.batch_size):
+                end = start + self.batch_size
+                batch = rows[start:end]
+                written += self._write_rows(table_model, batch)
+        return written
+
+    def _write_rows(self, model, rows: List[dict]) -> int:
+        table_name = model.__tablename__
+        stage = (
+            self.metrics.measure(f"write.{table_name}", rows=len(rows))
+            if self.metrics is not None
+            else nullcontext(StageMetrics())
+        )
+        with stage as measured:
+            try:
+                self.session.execute(insert(model.__table__), rows)
+                if self.autocommit:
+                    self.session.commit()
+                self.logger.debug("Stored %s rows into %s", len(rows), table_name)
+                return len(rows)
+            except Exception as e:
+                self.logger.error(
+                    "Error storing batch of %s rows into %s. Error: %s",
+                    len(rows),
+                    table_name,
+                    e,
+                )
+                if not self.autocommit:
+                    raise
+                self.session.rollback()
+                measured.rows = 0
+                measured.failures += 1
+                return 0
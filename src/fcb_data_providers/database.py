@@ -1,27 +1,187 @@
 from contextlib import contextmanager
+from typing import List
 
-from sqlalchemy import create_engine
+from sqlalchemy import Index, create_engine, event, inspect, make_url, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from sqlalchemy.schema import CreateTable
 
 from fcb_data_providers.database_models import BaseModel
 from fcb_data_providers.utils import get_logger
 
+# views of earlier versions, which are replaced by tables of the same name.
+LEGACY_VIEWS = ("match_details",)
+
+# asyncio driver of every supported database.
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+# execution option of the SQLite transactions which take the write lock when
+# they begin, see begin_write.
+SQLITE_IMMEDIATE = "sqlite_immediate"
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Get the asyncio driver URL of a database URL.
+
+    database_url: str: The database URL, e.g. postgresql://user@host/db.
+
+    return: str: The URL with the asyncio driver, e.g. postgresql+asyncpg://...
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver for database: {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+def begin_write(session: Session) -> None:
+    """
+    Begin the transaction of a session which is going to write, e.g. a match.
+
+    On SQLite, the transaction takes the write lock right away with BEGIN
+    IMMEDIATE, so concurrent writers wait for each other instead of failing
+    with a deadlock when two readers upgrade to writers. A session which is
+    already in a transaction is left as it is.
+
+    session: Session: The session.
+
+    return: None
+    """
+    if not session.in_transaction():
+        session.connection(execution_options={SQLITE_IMMEDIATE: True})
+
 
 class Database:
     def __init__(self, database_url):
+        self.database_url = database_url
         self.engine = create_engine(database_url)
+        if self.engine.dialect.name == "sqlite":
+            self._enable_sqlite_savepoints(self.engine)
+        self.async_engine = None
         self.Session = scoped_session(sessionmaker(bind=self.engine))
         BaseModel.metadata.bind = self.engine
         self.logger = get_logger(__name__)
 
+    def _enable_sqlite_savepoints(self, engine):
+        """
+        Let SQLAlchemy emit BEGIN itself, the pysqlite driver otherwise starts
+        transactions lazily and SAVEPOINT / RELEASE would commit the outer one.
+
+        Transactions begin deferred, so reads do not take the write lock.
+        Transactions started with begin_write take it when they begin.
+        """
+
+        @event.listens_for(engine, "connect")
+        def do_connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def do_begin(connection):
+            if connection.get_execution_options().get(SQLITE_IMMEDIATE):
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+            else:
+                connection.exec_driver_sql("BEGIN")
+
+    def get_async_engine(self, pool_size: int = 5):
+        """
+        Get the asyncio engine of the database, created on first use.
+
+        It needs the asyncio extra: greenlet, and asyncpg or aiosqlite.
+
+        pool_size: int: The maximum number of connections of the engine.
+
+        return: AsyncEngine: The asyncio engine.
+        """
+        if self.async_engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            async_url = get_async_database_url(self.database_url)
+            if self.engine.dialect.name == "sqlite":
+                self.async_engine = create_async_engine(async_url)
+                self._enable_sqlite_savepoints(self.async_engine.sync_engine)
+            else:
+                self.async_engine = create_async_engine(
+                    async_url, pool_size=pool_size, max_overflow=0
+                )
+        return self.async_engine
+
+    def get_async_session(self, pool_size: int = 5):
+        """
+        Get a new asyncio session.
+
+        pool_size: int: The maximum number of connections of the engine.
+
+        return: AsyncSession: The session, to use as an async context manager.
+        """
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        return AsyncSession(self.get_async_engine(pool_size), expire_on_commit=False)
+
+    async def dispose_async_engine(self):
+        """Close the connections of the asyncio engine."""
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+            self.async_engine = None
+
     def get_session(self):
         self.logger.info("Getting session")
         return self.Session()
 
-    def create_tables(self):
+    def create_tables(self, create_indexes: bool = True):
+        """
+        Create the missing tables.
+
+        The indexes can be left out and built with create_indexes once a bulk
+        load finished, which is faster than updating them for every insert.
+
+        create_indexes: bool: Also create the indexes of the tables.
+
+        return: None
+        """
         self.logger.info("Creating tables")
-        BaseModel.metadata.create_all(self.engine)
+        self.drop_legacy_views()
+        if create_indexes:
+            BaseModel.metadata.create_all(self.engine)
+            return
+        with self.engine.begin() as connection:
+            existing_tables = set(inspect(connection).get_table_names())
+            for table in BaseModel.metadata.sorted_tables:
+                if table.name not in existing_tables:
+                    connection.execute(CreateTable(table))
+
+    def drop_legacy_views(self):
+        """Drop the views which are replaced by tables."""
+        with self.engine.begin() as connection:
+            existing_views = set(inspect(connection).get_view_names())
+            for view in LEGACY_VIEWS:
+                if view in existing_views:
+                    self.logger.info("Dropping view %s", view)
+                    connection.execute(text(f"DROP VIEW {view}"))
+
+    def get_indexes(self) -> List[Index]:
+        """Get the managed indexes of all the tables."""
+        return [
+            index
+            for table in BaseModel.metadata.sorted_tables
+            for index in sorted(table.indexes, key=lambda index: index.name)
+        ]
+
+    def create_indexes(self):
+        """Create the managed indexes which do not exist yet."""
+        self.logger.info("Creating indexes")
+        with self.engine.begin() as connection:
+            for index in self.get_indexes():
+                index.create(connection, checkfirst=True)
+
+    def drop_indexes(self):
+        """Drop the managed indexes, e.g. before reloading all the data."""
+        self.logger.info("Dropping indexes")
+        with self.engine.begin() as connection:
+            for index in self.get_indexes():
+                index.drop(connection, checkfirst=True)
 
     def drop_tables(self):
         self.logger.info("Dropping tables")
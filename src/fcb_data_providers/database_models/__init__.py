@@ -2,9 +2,13 @@ from fcb_data_providers.database_models.base_model import BaseModel
 from fcb_data_providers.database_models.card import Card
 from fcb_data_providers.database_models.events import Event
 from fcb_data_providers.database_models.goal import Goal
+from fcb_data_providers.database_models.ingestion_manifest import \
+    IngestionManifest
 from fcb_data_providers.database_models.match import Match
+from fcb_data_providers.database_models.match_detail import MatchDetail
 from fcb_data_providers.database_models.period import Period
 from fcb_data_providers.database_models.player import Player
 from fcb_data_providers.database_models.qualifier import Qualifier
 from fcb_data_providers.database_models.score import Score
 from fcb_data_providers.database_models.teams import Team
+from fcb_data_providers.database_models.work_item import WorkItem
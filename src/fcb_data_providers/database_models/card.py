@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from fcb_data_providers.database_models import BaseModel
@@ -6,6 +6,10 @@ from fcb_data_providers.database_models import BaseModel
 
 class Card(BaseModel):
     __tablename__ = "cards"
+    __table_args__ = (
+        Index("ix_cards_match_id", "match_id"),
+        Index("ix_cards_player_id", "player_id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)  # Card ID
     match_id = Column(String, nullable=False)
@@ -1,5 +1,6 @@
-from sqlalchemy import (BigInteger, Boolean, Column, DateTime, Float, Integer,
-                        String)
+from sqlalchemy import (JSON, BigInteger, Boolean, Column, DateTime, Float,
+                        Index, Integer, String)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from fcb_data_providers.database_models import BaseModel
@@ -7,7 +8,26 @@ from fcb_data_providers.database_models import BaseModel
 
 class Event(BaseModel):
     __tablename__ = "events"
-    id = Column(BigInteger, primary_key=True, autoincrement=True)  # unique event id
+    # events of a match in order, events of a player by type, and the
+    # qualifiers join on e_id.
+    __table_args__ = (
+        Index(
+            "ix_events_match_period_time",
+            "match_id",
+            "period_id",
+            "time_min",
+            "time_sec",
+        ),
+        Index("ix_events_player_type", "player_id", "type_id"),
+        Index("ix_events_e_id", "e_id"),
+    )
+
+    # sqlite only autoincrements INTEGER primary keys.
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )  # unique event id
     e_id = Column(BigInteger)
     event_id = Column(Integer)  # eventId
     type_id = Column(Integer)  # typeId
@@ -22,6 +42,10 @@ class Event(BaseModel):
     team_id = Column(String)
     period_id = Column(Integer)
     player_id = Column(String)
+    # qualifier values by qualifier id, when stored with the compact layout.
+    qualifiers = Column(
+        JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+    )
 
     # Foreign Keys
     # match_id = Column(String, ForeignKey("matches.id"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from fcb_data_providers.database_models import BaseModel
@@ -6,6 +6,11 @@ from fcb_data_providers.database_models import BaseModel
 
 class Goal(BaseModel):
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_match_id", "match_id"),
+        Index("ix_goals_scorer_id", "scorer_id"),
+    )
+
     id = Column(Integer, primary_key=True, autoincrement=True)  # Goal ID
     match_id = Column(String, nullable=False)
     contestant_id = Column(String)  # Team ID of the scorer
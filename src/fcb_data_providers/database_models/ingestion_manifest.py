@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, Column, Float, String
+
+from fcb_data_providers.database_models import BaseModel
+
+
+class IngestionManifest(BaseModel):
+    __tablename__ = "ingestion_manifest"
+    file_path = Column(String, primary_key=True)
+    file_type = Column(String, nullable=False)  # match_event, match_stats
+    size = Column(BigInteger, nullable=False)  # file size in bytes
+    mtime = Column(Float, nullable=False)  # modification time of the file
+    content_hash = Column(String, nullable=False)  # sha256 of the file content
+    match_id = Column(String)
+    failed_sections = Column(String)  # comma separated, retried on the next run
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from fcb_data_providers.database_models import BaseModel
@@ -7,6 +7,7 @@ from fcb_data_providers.database_models import BaseModel
 # Match Entity
 class Match(BaseModel):
     __tablename__ = "matches"
+    __table_args__ = (Index("ix_matches_match_date", "match_date"),)
 
     id = Column(String, primary_key=True)  # Match ID
     match_date = Column(DateTime)
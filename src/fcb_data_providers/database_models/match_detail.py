@@ -0,0 +1,30 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from fcb_data_providers.database_models import BaseModel
+
+
+# Match summary, refreshed from the other tables for the ingested matches.
+class MatchDetail(BaseModel):
+    __tablename__ = "match_details"
+    __table_args__ = (Index("ix_match_details_match_date", "match_date"),)
+
+    id = Column(String, primary_key=True)  # Match ID
+    match_date = Column(DateTime)
+    match_status = Column(String)
+    home_team_id = Column(String)
+    home_team_name = Column(String)  # official name of the home team
+    away_team_id = Column(String)
+    away_team_name = Column(String)
+    winner = Column(String)
+    match_length_min = Column(Integer)
+    match_length_sec = Column(Integer)
+    ht_home = Column(Integer)
+    ht_away = Column(Integer)
+    ft_home = Column(Integer)
+    ft_away = Column(Integer)
+    home_goals = Column(Integer)
+    away_goals = Column(Integer)
+    home_yellow_cards = Column(Integer)
+    away_yellow_cards = Column(Integer)
+    home_red_cards = Column(Integer)
+    away_red_cards = Column(Integer)
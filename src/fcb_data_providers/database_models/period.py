@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from fcb_data_providers.database_models import BaseModel
@@ -6,6 +6,7 @@ from fcb_data_providers.database_models import BaseModel
 
 class Period(BaseModel):
     __tablename__ = "periods"
+    __table_args__ = (Index("ix_periods_match_id", "match_id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)  # Period ID
     match_id = Column(String, nullable=False)
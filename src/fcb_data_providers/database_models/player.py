@@ -1,5 +1,5 @@
 from sqlalchemy import (JSON, Boolean, Column, DateTime, Enum, Float,
-                        ForeignKey, Integer, String)
+                        ForeignKey, Index, Integer, String)
 from sqlalchemy.orm import relationship
 
 from fcb_data_providers.database_models import BaseModel
@@ -7,6 +7,8 @@ from fcb_data_providers.database_models import BaseModel
 
 class Player(BaseModel):
     __tablename__ = "players"
+    __table_args__ = (Index("ix_players_team_id", "team_id"),)
+
     id = Column(String, primary_key=True)  # player id
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
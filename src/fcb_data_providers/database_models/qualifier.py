@@ -1,5 +1,5 @@
 from sqlalchemy import (BigInteger, Boolean, Column, DateTime, Enum, Float,
-                        ForeignKey, Integer, String)
+                        ForeignKey, Index, Integer, String)
 from sqlalchemy.orm import relationship
 
 from fcb_data_providers.database_models import BaseModel
@@ -7,6 +7,10 @@ from fcb_data_providers.database_models import BaseModel
 
 class Qualifier(BaseModel):
     __tablename__ = "qualifiers"
+    __table_args__ = (
+        Index("ix_qualifiers_event_qualifier", "event_id", "qualifier_id"),
+    )
+
     id = Column(Integer, primary_key=True, autoincrement=True)  # qualifier id
     q_id = Column(BigInteger, nullable=True)  # qId
     qualifier_id = Column(Integer, nullable=False)  # qualifierId
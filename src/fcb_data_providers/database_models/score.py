@@ -1,5 +1,5 @@
 from sqlalchemy import (JSON, Boolean, Column, DateTime, Enum, Float,
-                        ForeignKey, Integer, String)
+                        ForeignKey, Index, Integer, String)
 from sqlalchemy.orm import relationship
 
 from fcb_data_providers.database_models import BaseModel
@@ -7,6 +7,7 @@ from fcb_data_providers.database_models import BaseModel
 
 class Score(BaseModel):
     __tablename__ = "scores"
+    __table_args__ = (Index("ix_scores_match_id", "match_id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)  # Score ID
     match_id = Column(String, nullable=False)
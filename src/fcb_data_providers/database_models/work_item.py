@@ -0,0 +1,23 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from fcb_data_providers.database_models import BaseModel
+
+
+# Feed files of the distributed ingestion, claimed by the nodes with leases,
+# all the files of a match at once.
+class WorkItem(BaseModel):
+    __tablename__ = "work_queue"
+    __table_args__ = (
+        Index("ix_work_queue_status_lease", "status", "lease_expires_at"),
+        Index("ix_work_queue_match_id", "match_id"),
+    )
+
+    file_path = Column(String, primary_key=True)
+    file_type = Column(String, nullable=False)  # match_event, match_stats
+    match_id = Column(String, nullable=False)  # of the file name, see get_match_id
+    status = Column(String, nullable=False)  # pending, leased, done, failed
+    attempts = Column(Integer, nullable=False, default=0)  # number of claims
+    lease_owner = Column(String)  # worker id of the node holding the lease
+    lease_expires_at = Column(DateTime)  # UTC, the file is claimable again after
+    heartbeat_at = Column(DateTime)  # UTC, last heartbeat of the lease owner
+    error = Column(String)  # error of the last failed attempt
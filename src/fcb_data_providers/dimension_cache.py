@@ -0,0 +1,82 @@
+import hashlib
+import json
+from collections import defaultdict
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+
+class DimensionCache:
+    """
+    Remember the dimension rows (teams, players) persisted during a run.
+
+    Every row is kept as its key and a fingerprint of its stored values. A row
+    whose fingerprint matches the cache is unchanged and can be skipped before
+    it is validated or sent to the database.
+
+    Rows seen in the current transaction are staged first, and only become
+    cached with ``commit``, so rows of a rolled back match are sent again.
+    """
+
+    def __init__(self):
+        self._persisted: Dict[str, Dict[Hashable, bytes]] = defaultdict(dict)
+        self._staged: List[Tuple[str, Hashable, bytes]] = []
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(values: Sequence) -> bytes:
+        """
+        Get the fingerprint of the stored values of a row.
+
+        values: Sequence: The values, in a fixed order.
+
+        return: bytes: The fingerprint.
+        """
+        content = json.dumps(values, default=str).encode()
+        return hashlib.blake2b(content, digest_size=16).digest()
+
+    def changed(self, table: str, key: Hashable, values: Sequence) -> bool:
+        """
+        Check if a row differs from the persisted one, and stage it if it does.
+
+        table: str: The table name.
+        key: Hashable: The primary key of the row.
+        values: Sequence: The stored values of the row.
+
+        return: bool: True if the row is new or changed.
+        """
+        fingerprint = self.fingerprint(values)
+        if self._persisted[table].get(key) == fingerprint:
+            self.hits += 1
+            return False
+        self.misses += 1
+        self._staged.append((table, key, fingerprint))
+        return True
+
+    def commit(self) -> None:
+        """
+        Cache the staged rows, once their transaction is committed.
+
+        return: None
+        """
+        for table, key, fingerprint in self._staged:
+            self._persisted[table][key] = fingerprint
+        self._staged.clear()
+
+    def rollback(self) -> None:
+        """
+        Drop the staged rows, when their transaction is rolled back.
+
+        return: None
+        """
+        self._staged.clear()
+
+    def clear(self) -> None:
+        """
+        Forget all the rows, e.g. at the start of a run.
+
+        return: None
+        """
+        self._persisted.clear()
+        self._staged.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,211 @@
+import os
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from fcb_data_providers.readers.compression import FEED_EXTENSIONS
+
+# file name prefix of every feed file type, followed by the match id.
+FEED_PREFIXES = {
+    "match_event": "match_event_",
+    "match_stats": "match_stats_",
+}
+
+
+@dataclass
+class FeedFile:
+    """
+    A feed file found in the data directory.
+
+    path: str: The file path.
+    file_type: str: The file type, e.g. match_event or match_stats.
+    match_id: str: The match id of the file name.
+    """
+
+    path: str
+    file_type: str
+    match_id: str
+
+
+@dataclass
+class MatchFiles:
+    """
+    The feed files of one match.
+
+    match_id: str: The match id of the file names.
+    files: Dict[str, FeedFile]: The files by file type.
+    """
+
+    match_id: str
+    files: Dict[str, FeedFile] = field(default_factory=dict)
+
+
+def parse_feed_file_name(file_name: str) -> Optional[tuple]:
+    """
+    Get the file type and match id of a feed file name, e.g. match_event_<id>.json
+    or match_event_<id>.jsonl.gz.
+
+    file_name: str: The file name.
+
+    return: tuple: The file type and the match id, None for other files.
+    """
+    extension = next(
+        (
+            extension
+            for extension in sorted(FEED_EXTENSIONS, key=len, reverse=True)
+            if file_name.endswith(extension)
+        ),
+        None,
+    )
+    if extension is None:
+        return None
+    for file_type, prefix in FEED_PREFIXES.items():
+        if file_name.startswith(prefix):
+            start, end = len(prefix), len(file_name) - len(extension)
+            match_id = file_name[start:end]
+            return (file_type, match_id) if match_id else None
+    return None
+
+
+def get_match_id(file_path: str, file_type: str) -> str:
+    """
+    Get the match id of a feed file from its name, as the files of a match are
+    grouped by pair_files.
+
+    file_path: str: The file path.
+    file_type: str: The file type, e.g. match_event or match_stats.
+
+    return: str: The match id, or the file path for files which are named
+        otherwise, as it can not be the match id of another file.
+    """
+    parsed = parse_feed_file_name(os.path.basename(file_path))
+    if parsed is None or parsed[0] != file_type:
+        return file_path
+    return parsed[1]
+
+
+def matches_any(path: str, patterns: Optional[Sequence[str]]) -> bool:
+    """Check if a relative path matches one of the glob patterns."""
+    return any(fnmatch(path, pattern) for pattern in patterns or ())
+
+
+def iter_feed_files(
+    root_path: str,
+    file_types: Optional[Sequence[str]] = None,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+) -> Iterator[FeedFile]:
+    """
+    Walk the data directory and its subdirectories, and yield the feed files.
+
+    The files are yielded while the directories are scanned with os.scandir,
+    directory by directory in name order. The glob patterns are matched
+    against the path relative to the root, with / as separator, e.g.
+    ``2023-2024/*`` or ``*/friendlies/*``. Directories matching an exclude
+    pattern are not entered.
+
+    root_path: str: The data directory.
+    file_types: Sequence[str]: The file types to yield, all by default.
+    include: Sequence[str]: Only yield files matching one of these patterns.
+    exclude: Sequence[str]: Skip files and directories matching these patterns.
+
+    return: Iterator[FeedFile]: The feed files.
+    """
+    directories = [(root_path, "")]
+    while directories:
+        directory, relative_directory = directories.pop()
+        try:
+            with os.scandir(directory) as scan:
+                entries = sorted(scan, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            relative_path = f"{relative_directory}{entry.name}"
+            if matches_any(relative_path, exclude):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append((entry.path, f"{relative_path}/"))
+                continue
+            parsed = parse_feed_file_name(entry.name)
+            if parsed is None:
+                continue
+            file_type, match_id = parsed
+            if file_types is not None and file_type not in file_types:
+                continue
+            if include and not matches_any(relative_path, include):
+                continue
+            yield FeedFile(entry.path, file_type, match_id)
+        # visit the subdirectories in name order.
+        directories.extend(reversed(subdirectories))
+
+
+def pair_feed_files(
+    feed_files: Iterable[FeedFile], file_types: Sequence[str] = tuple(FEED_PREFIXES)
+) -> Iterator[MatchFiles]:
+    """
+    Group feed files by match id.
+
+    A match is yielded as soon as it has a file of every type, and the matches
+    missing a file are yielded at the end, so the files can be paired while
+    they are discovered. A second file of the same type and match, e.g. in
+    another directory, starts a new group.
+
+    feed_files: Iterable[FeedFile]: The feed files.
+    file_types: Sequence[str]: The file types of a complete match.
+
+    return: Iterator[MatchFiles]: The files of every match.
+    """
+    incomplete: Dict[str, MatchFiles] = {}
+    for feed_file in feed_files:
+        match_files = incomplete.get(feed_file.match_id)
+        if match_files is not None and feed_file.file_type in match_files.files:
+            yield incomplete.pop(feed_file.match_id)
+        match_files = incomplete.setdefault(
+            feed_file.match_id, MatchFiles(feed_file.match_id)
+        )
+        match_files.files[feed_file.file_type] = feed_file
+        if all(file_type in match_files.files for file_type in file_types):
+            yield incomplete.pop(feed_file.match_id)
+    yield from incomplete.values()
+
+
+def pair_files(
+    files: Iterable[tuple], file_types: Sequence[str] = tuple(FEED_PREFIXES)
+) -> Iterator[List[tuple]]:
+    """
+    Group (file_path, file_type) pairs by the match id of their file name, like
+    pair_feed_files. Files which are named otherwise stay on their own.
+
+    files: Iterable[tuple]: The (file_path, file_type) pairs.
+    file_types: Sequence[str]: The file types of a complete match, in order.
+
+    return: Iterator[List[tuple]]: The (file_path, file_type) pairs of every match.
+    """
+
+    feed_files = (
+        FeedFile(file_path, file_type, get_match_id(file_path, file_type))
+        for file_path, file_type in files
+    )
+    for match_files in pair_feed_files(feed_files, file_types):
+        yield [
+            (feed_file.path, feed_file.file_type)
+            for feed_file in sort_feed_files(match_files.files.values(), file_types)
+        ]
+
+
+def sort_feed_files(
+    feed_files: Iterable[FeedFile], file_types: Sequence[str]
+) -> List[FeedFile]:
+    """
+    Sort feed files by file type, in the order of file_types, and keep the
+    discovery order within a type.
+
+    feed_files: Iterable[FeedFile]: The feed files.
+    file_types: Sequence[str]: The file types, in order.
+
+    return: List[FeedFile]: The sorted files.
+    """
+    order = {file_type: index for index, file_type in enumerate(file_types)}
+    return sorted(feed_files, key=lambda feed_file: order[feed_file.file_type])
@@ -0,0 +1,34 @@
+import importlib
+
+# no typing import, importing this module has to stay as cheap as possible.
+
+
+def lazy_exports(package: str, exports: dict) -> tuple:
+    """
+    Get the module __getattr__ and __dir__ of a package whose public names are
+    imported on first access (PEP 562), so importing the package stays cheap.
+
+    package: str: The package name, __name__ of its __init__.
+    exports: dict: The submodule of every public name, relative to
+        the package. A name mapped to None is a submodule itself.
+
+    return: tuple: The __getattr__ and __dir__ functions of the package.
+    """
+    package_module = importlib.import_module(package)
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        submodule = exports[name]
+        if submodule is None:
+            value = importlib.import_module(f".{name}", package)
+        else:
+            value = getattr(importlib.import_module(submodule, package), name)
+        # cache it, the next access does not go through __getattr__.
+        setattr(package_module, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(package_module)) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,213 @@
+import hashlib
+import os
+from logging import Logger
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm.session import Session
+
+from fcb_data_providers.database_models import IngestionManifest
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# maximum number of file paths looked up with a single IN query.
+LOOKUP_BATCH_SIZE = 500
+
+
+def compute_content_hash(file_path: str) -> str:
+    """
+    Compute the sha256 hash of a file, reading it in chunks.
+
+    file_path: str: The file path.
+
+    return: str: The hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_file_fingerprint(file_path: str) -> dict:
+    """
+    Get the size, modification time and content hash of a file.
+
+    file_path: str: The file path.
+
+    return: dict: The file fingerprint.
+    """
+    stat = os.stat(file_path)
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "content_hash": compute_content_hash(file_path),
+    }
+
+
+def is_file_changed(file_path: str, fingerprint: Optional[dict]) -> bool:
+    """
+    Check if a file is new or changed since its fingerprint was taken. A file
+    with failed sections counts as changed, so it is retried.
+
+    file_path: str: The file path.
+    fingerprint: dict: The size, mtime, content_hash and failed_sections of the
+        ingested file, None for a new file.
+
+    return: bool: True if the file is new or changed.
+    """
+    if fingerprint is None or fingerprint.get("failed_sections"):
+        return True
+    try:
+        stat = os.stat(file_path)
+        if (
+            stat.st_size == fingerprint["size"]
+            and stat.st_mtime == fingerprint["mtime"]
+        ):
+            return False
+        return compute_content_hash(file_path) != fingerprint["content_hash"]
+    except OSError:
+        return True
+
+
+class FileManifest:
+    """
+    Track the ingested feed files in the ingestion_manifest table.
+
+    A file is unchanged when its size and modification time match the
+    manifest. Files whose size or modification time differ are hashed, and
+    only count as changed when their content hash differs as well. Files which
+    were stored with failed sections always count as changed.
+    """
+
+    def __init__(self, session: Session, logger: Logger):
+        self.session = session
+        self.logger = logger
+
+    def get_entries(self, file_paths: List[str]) -> Dict[str, IngestionManifest]:
+        """
+        Get the manifest entries of the given files.
+
+        file_paths: List[str]: The file paths.
+
+        return: Dict[str, IngestionManifest]: The entries by file path.
+        """
+        entries = {}
+        for start in range(0, len(file_paths), LOOKUP_BATCH_SIZE):
+            end = start + LOOKUP_BATCH_SIZE
+            batch = file_paths[start:end]
+            query = select(IngestionManifest).where(
+                IngestionManifest.file_path.in_(batch)
+            )
+            for entry in self.session.scalars(query):
+                entries[entry.file_path] = entry
+        return entries
+
+    def get_entry(self, file_path: str) -> Optional[IngestionManifest]:
+        """
+        Get the manifest entry of a file.
+
+        file_path: str: The file path.
+
+        return: IngestionManifest: The entry, None if the file was not ingested.
+        """
+        return self.session.get(IngestionManifest, file_path)
+
+    def get_fingerprints(self) -> Dict[str, dict]:
+        """
+        Get the fingerprints of all the ingested files, e.g. to check files for
+        changes from another thread with is_file_changed, without the session.
+
+        return: Dict[str, dict]: The size, mtime, content_hash and
+            failed_sections by file path.
+        """
+        query = select(
+            IngestionManifest.file_path,
+            IngestionManifest.size,
+            IngestionManifest.mtime,
+            IngestionManifest.content_hash,
+            IngestionManifest.failed_sections,
+        )
+        fingerprints = {
+            row.file_path: {
+                "size": row.size,
+                "mtime": row.mtime,
+                "content_hash": row.content_hash,
+                "failed_sections": row.failed_sections,
+            }
+            for row in self.session.execute(query)
+        }
+        # also ends the read transaction, which would block writers on SQLite.
+        self.session.commit()
+        return fingerprints
+
+    def filter_changed_files(self, file_paths: List[str]) -> List[str]:
+        """
+        Get the files which are new or changed since they were ingested.
+
+        file_paths: List[str]: The file paths.
+
+        return: List[str]: The new and changed file paths, in input order.
+        """
+        entries = self.get_entries(file_paths)
+        changed_files = []
+        for file_path in file_paths:
+            entry = entries.get(file_path)
+            if entry is None or entry.failed_sections:
+                changed_files.append(file_path)
+                continue
+            try:
+                stat = os.stat(file_path)
+                if stat.st_size == entry.size and stat.st_mtime == entry.mtime:
+                    continue
+                content_hash = compute_content_hash(file_path)
+            except OSError:
+                changed_files.append(file_path)
+                continue
+            if content_hash == entry.content_hash:
+                # only touched, remember the new mtime to skip hashing next time.
+                entry.mtime = stat.st_mtime
+                continue
+            changed_files.append(file_path)
+
+        # also ends the read transaction, which would block writers on SQLite.
+        self.session.commit()
+        self.logger.info(
+            "%s of %s files are new or changed", len(changed_files), len(file_paths)
+        )
+        return changed_files
+
+    def record_file(
+        self,
+        file_path: str,
+        file_type: str,
+        fingerprint: dict,
+        match_id: str = None,
+        failed_sections: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Add or update the manifest entry of an ingested file.
+
+        The entry is only added to the session, and committed with the data of
+        the file.
+
+        file_path: str: The file path.
+        file_type: str: The file type, match_event or match_stats.
+        fingerprint: dict: The fingerprint of get_file_fingerprint.
+        match_id: str: The match id of the file.
+        failed_sections: List[str]: The sections of the file which failed to
+            store, so the file is retried on the next run.
+
+        return: None
+        """
+        self.session.merge(
+            IngestionManifest(
+                file_path=file_path,
+                file_type=file_type,
+                match_id=match_id,
+                size=fingerprint["size"],
+                mtime=fingerprint["mtime"],
+                content_hash=fingerprint["content_hash"],
+                failed_sections=",".join(failed_sections) if failed_sections else None,
+            )
+        )
@@ -0,0 +1,138 @@
+from logging import Logger
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.session import Session
+
+from fcb_data_providers.database_models import (Card, Goal, Match, MatchDetail,
+                                                Score, Team)
+
+# card types counted as yellow and red cards, a second yellow is a red card.
+YELLOW_CARD_TYPES = ("YC",)
+RED_CARD_TYPES = ("RC", "Y2C")
+
+# maximum number of match ids refreshed with a single statement.
+REFRESH_BATCH_SIZE = 500
+
+
+def count_team_rows(model, team_id_column, *conditions):
+    """
+    Build a subquery counting the rows of a team in the current match.
+
+    model: BaseModel: The model class, Goal or Card.
+    team_id_column: Column: The matches column with the team id.
+    conditions: Any: Additional filters of the rows.
+
+    return: ScalarSelect: The count subquery.
+    """
+    return (
+        select(func.count(model.id))
+        .where(
+            model.match_id == Match.id,
+            model.contestant_id == team_id_column,
+            *conditions,
+        )
+        .scalar_subquery()
+    )
+
+
+def build_match_details_query():
+    """
+    Build the query of the match_details rows.
+
+    Every match is joined with the names of its teams and its scores, and the
+    goals and cards of both teams are counted.
+
+    return: Select: The query, with one column per match_details column.
+    """
+    home_team = aliased(Team)
+    away_team = aliased(Team)
+    # the event and stats feeds of a match both store its scores.
+    scores = (
+        select(
+            Score.match_id,
+            func.max(Score.ht_home).label("ht_home"),
+            func.max(Score.ht_away).label("ht_away"),
+            func.max(Score.ft_home).label("ft_home"),
+            func.max(Score.ft_away).label("ft_away"),
+        )
+        .group_by(Score.match_id)
+        .subquery()
+    )
+    return (
+        select(
+            Match.id,
+            Match.match_date,
+            Match.match_status,
+            Match.home_team_id,
+            home_team.official_name.label("home_team_name"),
+            Match.away_team_id,
+            away_team.official_name.label("away_team_name"),
+            Match.winner,
+            Match.match_length_min,
+            Match.match_length_sec,
+            scores.c.ht_home,
+            scores.c.ht_away,
+            scores.c.ft_home,
+            scores.c.ft_away,
+            count_team_rows(Goal, Match.home_team_id).label("home_goals"),
+            count_team_rows(Goal, Match.away_team_id).label("away_goals"),
+            count_team_rows(
+                Card, Match.home_team_id, Card.type.in_(YELLOW_CARD_TYPES)
+            ).label("home_yellow_cards"),
+            count_team_rows(
+                Card, Match.away_team_id, Card.type.in_(YELLOW_CARD_TYPES)
+            ).label("away_yellow_cards"),
+            count_team_rows(
+                Card, Match.home_team_id, Card.type.in_(RED_CARD_TYPES)
+            ).label("home_red_cards"),
+            count_team_rows(
+                Card, Match.away_team_id, Card.type.in_(RED_CARD_TYPES)
+            ).label("away_red_cards"),
+        )
+        .outerjoin(home_team, Match.home_team_id == home_team.id)
+        .outerjoin(away_team, Match.away_team_id == away_team.id)
+        .outerjoin(scores, scores.c.match_id == Match.id)
+    )
+
+
+def refresh_match_details(
+    session: Session, logger: Logger, match_ids: Optional[List[str]] = None
+) -> bool:
+    """
+    Refresh the match_details rows of the given matches.
+
+    The rows of the matches are deleted and computed again from the other
+    tables, in one transaction. All the rows are refreshed without match ids.
+
+    session: Session: The database session.
+    logger: Logger: The logger.
+    match_ids: List[str]: The ids of the ingested matches.
+
+    return: bool: True if the rows were refreshed.
+    """
+    query = build_match_details_query()
+    columns = [column.name for column in query.selected_columns]
+    try:
+        if match_ids is None:
+            session.execute(delete(MatchDetail))
+            session.execute(insert(MatchDetail).from_select(columns, query))
+        else:
+            for start in range(0, len(match_ids), REFRESH_BATCH_SIZE):
+                end = start + REFRESH_BATCH_SIZE
+                batch = match_ids[start:end]
+                session.execute(delete(MatchDetail).where(MatchDetail.id.in_(batch)))
+                session.execute(
+                    insert(MatchDetail).from_select(
+                        columns, query.where(Match.id.in_(batch))
+                    )
+                )
+        session.commit()
+        refreshed = "all matches" if match_ids is None else f"{len(match_ids)} matches"
+        logger.info("Refreshed match details of %s", refreshed)
+        return True
+    except Exception as exc:
+        session.rollback()
+        logger.error("Error while refreshing match details: %s", exc)
+        return False
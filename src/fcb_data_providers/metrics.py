@@ -0,0 +1,304 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+# the match whose rows are measured, per thread and per async lane.
+_current_match_id: ContextVar = ContextVar("current_match_id", default=None)
+
+PROMETHEUS_PREFIX = "fcb_ingest"
+
+
+@dataclass
+class StageMetrics:
+    """
+    The measurements of one ingest stage, e.g. read, validate.events or
+    write.qualifiers.
+
+    seconds: float: The wall time spent in the stage.
+    rows: int: The number of rows handled by the stage.
+    calls: int: The number of times the stage ran.
+    retries: int: The number of retried calls.
+    failures: int: The number of failed calls.
+    """
+
+    seconds: float = 0.0
+    rows: int = 0
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add(self, other: "StageMetrics") -> None:
+        """Add the measurements of another stage into this one."""
+        self.seconds += other.seconds
+        self.rows += other.rows
+        self.calls += other.calls
+        self.retries += other.retries
+        self.failures += other.failures
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "rows_per_sec": self.rows_per_sec}
+
+
+@dataclass
+class RunReport:
+    """
+    The metrics of one process_data run.
+
+    started_at: str: The start time of the run, in ISO format.
+    seconds: float: The wall time of the run.
+    files: int: The number of processed files.
+    failed_files: int: The number of failed files.
+    stages: Dict[str, StageMetrics]: The metrics of every stage.
+    matches: Dict[str, Dict[str, StageMetrics]]: The metrics of every stage by
+        match id.
+    """
+
+    started_at: str
+    seconds: float
+    files: int
+    failed_files: int
+    stages: Dict[str, StageMetrics] = field(default_factory=dict)
+    matches: Dict[str, Dict[str, StageMetrics]] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "seconds": self.seconds,
+            "files": self.files,
+            "failed_files": self.failed_files,
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()},
+            "matches": {
+                match_id: {name: stage.to_dict() for name, stage in stages.items()}
+                for match_id, stages in self.matches.items()
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Format the run and stage totals in the Prometheus text format.
+
+        The per match metrics are left out, as one series per match would
+        grow without bound.
+
+        return: str: The metrics.
+        """
+        metrics = [
+            ("run_seconds", "Wall time of the last ingest run.", self.seconds),
+            ("run_files", "Files processed by the last ingest run.", self.files),
+            (
+                "run_failed_files",
+                "Files which failed in the last ingest run.",
+                self.failed_files,
+            ),
+        ]
+        lines = []
+        for name, description, value in metrics:
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} gauge")
+            lines.append(f"{PROMETHEUS_PREFIX}_{name} {value}")
+
+        stage_metrics = [
+            ("seconds", "Wall time spent in an ingest stage."),
+            ("rows", "Rows handled by an ingest stage."),
+            ("rows_per_sec", "Rows per second of an ingest stage."),
+            ("calls", "Calls of an ingest stage."),
+            ("retries", "Retried calls of an ingest stage."),
+            ("failures", "Failed calls of an ingest stage."),
+        ]
+        for name, description in stage_metrics:
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_stage_{name} {description}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_stage_{name} gauge")
+            for stage_name, stage in sorted(self.stages.items()):
+                value = getattr(stage, name)
+                lines.append(
+                    f'{PROMETHEUS_PREFIX}_stage_{name}{{stage="{stage_name}"}} {value}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, file_path: str) -> None:
+        """
+        Write the report as a JSON file.
+
+        file_path: str: The file path.
+
+        return: None
+        """
+        write_file(file_path, json.dumps(self.to_dict(), indent=2))
+
+    def write_prometheus(self, file_path: str) -> None:
+        """
+        Write the report for the textfile collector of the Prometheus node
+        exporter, e.g. into <collector directory>/fcb_ingest.prom.
+
+        file_path: str: The file path.
+
+        return: None
+        """
+        write_file(file_path, self.to_prometheus())
+
+
+def write_file(file_path: str, content: str) -> None:
+    """
+    Write a file under a temporary name and then rename it, so readers, e.g.
+    the node exporter, never see a partial file.
+
+    file_path: str: The file path.
+    content: str: The file content.
+
+    return: None
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+    with open(temp_path, "w") as f:
+        f.write(content)
+    os.replace(temp_path, file_path)
+
+
+class IngestMetrics:
+    """
+    Collect the metrics of the stages of an ingest run, in total and by match.
+
+    Stages are measured with ``measure``, from any thread. The match of the
+    measured rows is set with ``match``, and kept per thread and per async
+    lane.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Drop all the measurements, and start a new run.
+
+        return: None
+        """
+        with self._lock:
+            self.stages: Dict[str, StageMetrics] = {}
+            self.matches: Dict[str, Dict[str, StageMetrics]] = {}
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+
+    @contextmanager
+    def match(self, match_id: Optional[str]) -> Iterator[None]:
+        """
+        Attribute the stages measured inside the context to a match.
+
+        match_id: str: The match id.
+        """
+        token = _current_match_id.set(match_id)
+        try:
+            yield
+        finally:
+            _current_match_id.reset(token)
+
+    def record(self, stage: str, measured: StageMetrics) -> None:
+        """
+        Add the measurements of one stage call.
+
+        stage: str: The stage name.
+        measured: StageMetrics: The measurements.
+
+        return: None
+        """
+        match_id = _current_match_id.get()
+        with self._lock:
+            self.stages.setdefault(stage, StageMetrics()).add(measured)
+            if match_id is not None:
+                match_stages = self.matches.setdefault(match_id, {})
+                match_stages.setdefault(stage, StageMetrics()).add(measured)
+
+    @contextmanager
+    def measure(self, stage: str, rows: int = 0) -> Iterator[StageMetrics]:
+        """
+        Measure the wall time of one stage call.
+
+        The yielded metrics can be updated with the rows and retries known
+        inside the context. A call which raises is counted as a failure.
+
+        stage: str: The stage name.
+        rows: int: The number of rows handled by the call.
+        """
+        measured = StageMetrics(rows=rows, calls=1)
+        start = time.perf_counter()
+        try:
+            yield measured
+        except Exception:
+            measured.failures += 1
+            raise
+        finally:
+            measured.seconds = time.perf_counter() - start
+            self.record(stage, measured)
+
+    def snapshot(self) -> dict:
+        """
+        Get the measurements as plain data, e.g. to send them from a worker
+        process.
+
+        return: dict: The stages, and the stages by match id.
+        """
+        with self._lock:
+            return {
+                "stages": {name: asdict(stage) for name, stage in self.stages.items()},
+                "matches": {
+                    match_id: {name: asdict(stage) for name, stage in stages.items()}
+                    for match_id, stages in self.matches.items()
+                },
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        """
+        Add the measurements of a snapshot, e.g. of a worker process.
+
+        snapshot: dict: The snapshot.
+
+        return: None
+        """
+        with self._lock:
+            for name, stage in snapshot["stages"].items():
+                self.stages.setdefault(name, StageMetrics()).add(StageMetrics(**stage))
+            for match_id, stages in snapshot["matches"].items():
+                match_stages = self.matches.setdefault(match_id, {})
+                for name, stage in stages.items():
+                    match_stages.setdefault(name, StageMetrics()).add(
+                        StageMetrics(**stage)
+                    )
+
+    def report(self, results: List) -> RunReport:
+        """
+        Build the report of the run.
+
+        results: List[FileResult]: The outcome of every file of the run.
+
+        return: RunReport: The report.
+        """
+        with self._lock:
+            return RunReport(
+                started_at=self.started_at.isoformat(),
+                seconds=time.perf_counter() - self._started,
+                files=len(results),
+                failed_files=sum(1 for result in results if not result.success),
+                stages={
+                    name: StageMetrics(**asdict(stage))
+                    for name, stage in sorted(self.stages.items())
+                },
+                matches={
+                    match_id: {
+                        name: StageMetrics(**asdict(stage))
+                        for name, stage in sorted(stages.items())
+                    }
+                    for match_id, stages in self.matches.items()
+                },
+            )
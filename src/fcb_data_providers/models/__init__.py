@@ -1,3 +1,4 @@
+from .batch import validate_rows
 from .card import CardModel
 from .events import EventModel
 from .goal import GoalModel
@@ -0,0 +1,51 @@
+from functools import lru_cache
+from typing import List, Type
+
+from pydantic import BaseModel as PydanticBaseModel
+from pydantic import TypeAdapter, ValidationError
+
+
+@lru_cache(maxsize=None)
+def get_list_adapter(model: Type[PydanticBaseModel]) -> TypeAdapter:
+    """
+    Get the cached TypeAdapter validating a list of a model.
+
+    model: Type[PydanticBaseModel]: The model class.
+
+    return: TypeAdapter: The list adapter.
+    """
+    return TypeAdapter(List[model])
+
+
+def validate_rows(
+    model: Type[PydanticBaseModel],
+    rows: List[dict],
+    skip_invalid: bool = False,
+    **context,
+) -> List[dict]:
+    """
+    Validate a list of raw StatsPerform rows at once.
+
+    The rows use the camelCase keys of the feed, which are the field aliases of
+    the models. Values which are not part of the rows, e.g. the match id, are
+    given as keyword arguments and added to every row. The validated rows are
+    returned as plain dicts with the field names, ready for Core inserts.
+
+    model: Type[PydanticBaseModel]: The model class.
+    rows: List[dict]: The raw rows.
+    skip_invalid: bool: Drop the invalid rows instead of raising.
+    context: Any: Values added to every row.
+
+    return: List[dict]: The validated rows.
+    """
+    if context:
+        rows = [{**row, **context} for row in rows]
+    adapter = get_list_adapter(model)
+    try:
+        return adapter.dump_python(adapter.validate_python(rows))
+    except ValidationError as e:
+        if not skip_invalid:
+            raise
+        invalid = {error["loc"][0] for error in e.errors() if error["loc"]}
+        rows = [row for index, row in enumerate(rows) if index not in invalid]
+        return adapter.dump_python(adapter.validate_python(rows))
@@ -2,18 +2,21 @@ from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ConfigDict, Field
 
 
 class CardModel(PydanticBaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     match_id: str
-    contestant_id: Optional[str]
-    period_id: Optional[int]
-    time_min: Optional[int]
-    time_min_sec: Optional[str]
-    last_updated: Optional[datetime]
-    timestamp: Optional[datetime]
-    type: Optional[str]
-    player_id: Optional[str]
-    player_name: Optional[str]
-    opta_event_id: Optional[str]
-    card_reason: Optional[str]
+    contestant_id: Optional[str] = Field(None, alias="contestantId")
+    period_id: Optional[int] = Field(None, alias="periodId")
+    time_min: Optional[int] = Field(None, alias="timeMin")
+    time_min_sec: Optional[str] = Field(None, alias="timeMinSec")
+    last_updated: Optional[datetime] = Field(None, alias="lastUpdated")
+    timestamp: Optional[datetime] = None
+    type: Optional[str] = None
+    player_id: Optional[str] = Field(None, alias="playerId")
+    player_name: Optional[str] = Field(None, alias="playerName")
+    opta_event_id: Optional[str] = Field(None, alias="optaEventId")
+    card_reason: Optional[str] = Field(None, alias="cardReason")
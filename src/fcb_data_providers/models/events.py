@@ -2,20 +2,23 @@ from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ConfigDict, Field
 
 
 class EventModel(PydanticBaseModel):
-    e_id: Optional[int]
-    event_id: int
-    type_id: int
-    period_id: Optional[int]
-    time_min: int
-    time_sec: int
+    model_config = ConfigDict(populate_by_name=True)
+
+    e_id: Optional[int] = Field(None, alias="id")
+    event_id: int = Field(alias="eventId")
+    type_id: int = Field(alias="typeId")
+    period_id: Optional[int] = Field(None, alias="periodId")
+    time_min: int = Field(alias="timeMin")
+    time_sec: int = Field(alias="timeSec")
     x: float
     y: float
-    outcome: Optional[bool]
-    timestamp: Optional[datetime]
-    last_modified: Optional[datetime]
+    outcome: Optional[bool] = None
+    timestamp: Optional[datetime] = None
+    last_modified: Optional[datetime] = Field(None, alias="lastModified")
     match_id: str
-    player_id: Optional[str]
-    team_id: Optional[str]
+    player_id: Optional[str] = Field(None, alias="playerId")
+    team_id: Optional[str] = Field(None, alias="contestantId")
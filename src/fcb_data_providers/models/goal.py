@@ -2,21 +2,24 @@ from datetime import datetime
 from typing import Optional
 
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ConfigDict, Field
 
 
 class GoalModel(PydanticBaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     match_id: str
-    contestant_id: Optional[str]
-    period_id: Optional[int]
-    time_min: Optional[int]
-    time_min_sec: Optional[str]
-    last_updated: Optional[datetime]
-    timestamp: Optional[datetime]
-    type: Optional[str]
-    scorer_id: Optional[str]
-    scorer_name: Optional[str]
-    assist_player_id: Optional[str]
-    assist_player_name: Optional[str]
-    opta_event_id: Optional[str]
-    home_score: Optional[int]
-    away_score: Optional[int]
+    contestant_id: Optional[str] = Field(None, alias="contestantId")
+    period_id: Optional[int] = Field(None, alias="periodId")
+    time_min: Optional[int] = Field(None, alias="timeMin")
+    time_min_sec: Optional[str] = Field(None, alias="timeMinSec")
+    last_updated: Optional[datetime] = Field(None, alias="lastUpdated")
+    timestamp: Optional[datetime] = None
+    type: Optional[str] = None
+    scorer_id: Optional[str] = Field(None, alias="scorerId")
+    scorer_name: Optional[str] = Field(None, alias="scorerName")
+    assist_player_id: Optional[str] = Field(None, alias="assistPlayerId")
+    assist_player_name: Optional[str] = Field(None, alias="assistPlayerName")
+    opta_event_id: Optional[str] = Field(None, alias="optaEventId")
+    home_score: Optional[int] = Field(None, alias="homeScore")
+    away_score: Optional[int] = Field(None, alias="awayScore")
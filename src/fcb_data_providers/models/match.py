@@ -1,15 +1,21 @@
 from datetime import date
 from typing import Optional
 
+from pydantic import AliasChoices
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ConfigDict, Field
 
 
 class MatchModel(PydanticBaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     id: str
-    match_date: Optional[date]
-    match_status: Optional[str]
-    home_team_id: Optional[str]
-    away_team_id: Optional[str]
-    winner: Optional[str]
-    match_length_min: Optional[int]
-    match_length_sec: Optional[int]
+    match_date: Optional[date] = Field(
+        None, validation_alias=AliasChoices("localDate", "local_date")
+    )
+    match_status: Optional[str] = Field(None, alias="matchStatus")
+    home_team_id: Optional[str] = None
+    away_team_id: Optional[str] = None
+    winner: Optional[str] = None
+    match_length_min: Optional[int] = Field(None, alias="matchLengthMin")
+    match_length_sec: Optional[int] = Field(None, alias="matchLengthSec")
@@ -1,11 +1,14 @@
 from datetime import datetime
 
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ConfigDict, Field
 
 
 class PeriodModel(PydanticBaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     match_id: str
-    start_time: datetime
-    end_time: datetime
-    length_min: int
-    length_sec: int
+    start_time: datetime = Field(alias="start")
+    end_time: datetime = Field(alias="end")
+    length_min: int = Field(alias="lengthMin")
+    length_sec: int = Field(alias="lengthSec")
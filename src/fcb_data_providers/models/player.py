@@ -1,16 +1,19 @@
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ConfigDict, Field
 
 
 class PlayerModel(PydanticBaseModel):
-    id: str
-    first_name: str
-    last_name: str
-    short_first_name: str | None = None
-    short_last_name: str | None = None
-    match_name: str
-    shirt_number: int | None = None
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str = Field(alias="playerId")
+    first_name: str = Field(alias="firstName")
+    last_name: str = Field(alias="lastName")
+    short_first_name: str | None = Field(None, alias="shortFirstName")
+    short_last_name: str | None = Field(None, alias="shortLastName")
+    match_name: str = Field(alias="matchName")
+    shirt_number: int | None = Field(None, alias="shirtNumber")
     position: str | None = None
-    position_side: str | None = None
-    formation_place: str | None = None
-    is_captain: str | None = None
+    position_side: str | None = Field(None, alias="positionSide")
+    formation_place: str | None = Field(None, alias="formationPlace")
+    is_captain: bool | None = Field(None, alias="captain")
     team_id: str
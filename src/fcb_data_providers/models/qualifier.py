@@ -1,10 +1,13 @@
 from typing import Optional
 
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ConfigDict, Field
 
 
 class QualifierModel(PydanticBaseModel):
-    q_id: Optional[int]
-    qualifier_id: Optional[int]
+    model_config = ConfigDict(populate_by_name=True)
+
+    q_id: Optional[int] = Field(None, alias="id")
+    qualifier_id: int = Field(..., alias="qualifierId")
     value: str | None = None
-    event_id: Optional[int]
+    event_id: Optional[int] = None
@@ -1,9 +1,12 @@
 from pydantic import BaseModel as PydanticBaseModel
+from pydantic import ConfigDict, Field
 
 
 class TeamModel(PydanticBaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     id: str
     name: str
-    short_name: str = None
-    official_name: str = None
+    short_name: str = Field(None, alias="shortName")
+    official_name: str = Field(None, alias="officialName")
     code: str = None
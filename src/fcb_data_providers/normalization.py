@@ -0,0 +1,157 @@
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# feed key, column name and dtype of every stored event field.
+EVENT_COLUMNS = [
+    ("id", "e_id", "Int64"),
+    ("eventId", "event_id", "Int64"),
+    ("typeId", "type_id", "Int64"),
+    ("periodId", "period_id", "Int64"),
+    ("timeMin", "time_min", "Int64"),
+    ("timeSec", "time_sec", "Int64"),
+    ("x", "x", "float64"),
+    ("y", "y", "float64"),
+    ("outcome", "outcome", "boolean"),
+    ("timestamp", "timestamp", "datetime"),
+    ("lastModified", "last_modified", "datetime"),
+    ("playerId", "player_id", "string"),
+    ("contestantId", "team_id", "string"),
+]
+
+# columns an event cannot be stored without, as in EventModel.
+REQUIRED_EVENT_COLUMNS = ["event_id", "type_id", "time_min", "time_sec", "x", "y"]
+
+# feed key, column name and dtype of every stored qualifier field.
+QUALIFIER_COLUMNS = [
+    ("id", "q_id", "Int64"),
+    ("qualifierId", "qualifier_id", "Int64"),
+    ("value", "value", "string"),
+]
+
+REQUIRED_QUALIFIER_COLUMNS = ["qualifier_id"]
+
+
+def coerce_column(values: list, dtype: str) -> pd.Series:
+    """
+    Convert the raw values of one column to a typed series.
+
+    Values which cannot be converted become missing values, e.g. a number in a
+    string column, as the pydantic models reject them.
+
+    values: list | pd.Series: The raw values.
+    dtype: str: Int64, float64, boolean, datetime or string.
+
+    return: pd.Series: The typed column.
+    """
+    series = pd.Series(values, dtype="object")
+    if dtype == "datetime":
+        # values with a Z suffix are parsed one by one, without it all at once.
+        return pd.to_datetime(
+            series.str.removesuffix("Z"), errors="coerce", utc=True, format="ISO8601"
+        )
+    if dtype == "string":
+        if pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+            series = series.where(series.map(lambda value: isinstance(value, str)))
+        return series.astype("string")
+    numbers = pd.to_numeric(series, errors="coerce")
+    if dtype == "Int64":
+        # floats like 12.0 are valid integers, 12.5 is not.
+        integral = numbers.where(numbers.round() == numbers)
+        return integral.astype("Int64")
+    if dtype == "boolean":
+        return numbers.map({0: False, 1: True}).astype("boolean")
+    return numbers.astype(dtype)
+
+
+def build_frame(
+    records: List[dict], columns: List[tuple]
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Build a typed dataframe from feed records.
+
+    records: List[dict]: The feed records.
+    columns: List[tuple]: The feed key, column name and dtype of every column.
+
+    return: tuple: The typed dataframe, and the boolean mask of the records
+        with a value which could not be converted.
+    """
+    frame = {}
+    invalid = np.zeros(len(records), dtype=bool)
+    for key, name, dtype in columns:
+        values = pd.Series([record.get(key) for record in records], dtype="object")
+        frame[name] = coerce_column(values, dtype)
+        invalid |= values.notna().to_numpy() & frame[name].isna().to_numpy()
+    return pd.DataFrame(frame), invalid
+
+
+def normalize_events(
+    match_id: str, events: List[dict]
+) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+    """
+    Normalize the liveData.event list into typed event and qualifier tables.
+
+    The qualifiers of every event are exploded into one row per qualifier,
+    keyed by the event id. Like with the pydantic models, events with a value
+    which cannot be converted, or missing a required column, are dropped with
+    their qualifiers, and invalid qualifiers are dropped on their own.
+
+    match_id: str: The match id.
+    events: List[dict]: The feed events.
+
+    return: tuple: The events, the qualifiers and the number of dropped rows.
+    """
+    df_events, invalid_events = build_frame(events, EVENT_COLUMNS)
+    df_events["match_id"] = pd.Series(match_id, index=df_events.index, dtype="string")
+
+    event_qualifiers = [event.get("qualifier") or [] for event in events]
+    df_qualifiers, invalid_qualifiers = build_frame(
+        [qualifier for qualifiers in event_qualifiers for qualifier in qualifiers],
+        QUALIFIER_COLUMNS,
+    )
+    # the position of the event of every qualifier.
+    event_index = np.repeat(
+        np.arange(len(events)), [len(qualifiers) for qualifiers in event_qualifiers]
+    )
+    df_qualifiers["event_id"] = df_events["e_id"].take(event_index).to_numpy()
+
+    valid_events = (
+        df_events[REQUIRED_EVENT_COLUMNS].notna().all(axis=1).to_numpy()
+        & ~invalid_events
+    )
+    valid_qualifiers = (
+        df_qualifiers[REQUIRED_QUALIFIER_COLUMNS].notna().all(axis=1).to_numpy()
+        & ~invalid_qualifiers
+        & valid_events[event_index]
+    )
+
+    dropped = int((~valid_events).sum() + (~valid_qualifiers).sum())
+    return (
+        df_events[valid_events].reset_index(drop=True),
+        df_qualifiers[valid_qualifiers].reset_index(drop=True),
+        dropped,
+    )
+
+
+def to_records(dataframe: pd.DataFrame) -> List[dict]:
+    """
+    Convert a typed dataframe into rows for Core inserts.
+
+    Every column is converted at once to plain python values, with None for
+    the missing values, and then zipped into rows.
+
+    dataframe: pd.DataFrame: The typed dataframe.
+
+    return: List[dict]: The rows.
+    """
+    columns = []
+    for _, series in dataframe.items():
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            values = series.array.to_pydatetime()
+            values[series.isna().to_numpy()] = None
+        else:
+            values = series.to_numpy(dtype=object, na_value=None)
+        columns.append(values.tolist())
+    names = list(dataframe.columns)
+    return [dict(zip(names, row)) for row in zip(*columns)]
@@ -0,0 +1,141 @@
+import threading
+from dataclasses import dataclass
+from logging import Logger
+from queue import Queue
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+DEFAULT_QUEUE_SIZE = 4
+
+# marks the end of the items in a queue.
+_END = object()
+
+
+@dataclass
+class Stage:
+    """
+    One stage of a pipeline.
+
+    name: str: The stage name, used for logging.
+    function: Callable: Turns an item of the previous stage into the next one.
+    workers: int: The number of threads running the stage.
+    on_error: Callable: Turns an item whose function raised, and the error, into
+        the output of the stage, e.g. a failed result.
+    """
+
+    name: str
+    function: Callable[[Any], Any]
+    workers: int = 1
+    on_error: Optional[Callable[[Any, Exception], Any]] = None
+
+
+class Pipeline:
+    """
+    Run items through stages of worker threads, connected by bounded queues.
+
+    Every stage takes the items of the previous one from its input queue, and
+    puts its output into the next queue. A full queue blocks the stage before
+    it, so the slowest stage sets the pace and at most queue_size items wait
+    between two stages. The output of the last stage is consumed by the
+    caller of ``run``, e.g. to write it with a database session of its own
+    thread.
+
+    An item whose stage function raises is logged and passed to the on_error
+    function of the stage, and its output goes on to the next stage. Without
+    on_error, or when the items can not be read, the first error is raised by
+    ``run`` once the other items are through the stages.
+    """
+
+    def __init__(
+        self, stages: List[Stage], logger: Logger, queue_size: int = DEFAULT_QUEUE_SIZE
+    ):
+        for stage in stages:
+            if stage.workers < 1:
+                raise ValueError(f"Pipeline stage {stage.name} needs a worker")
+        self.stages = stages
+        self.logger = logger
+        self.queue_size = queue_size
+
+    def _feed(self, items: Iterable, output: Queue, errors: List[Exception]) -> None:
+        """Put the items into the first queue, e.g. while they are discovered."""
+        try:
+            for item in items:
+                output.put(item)
+        except Exception as e:
+            self.logger.error("Error reading the pipeline items. Error: %s", e)
+            errors.append(e)
+        finally:
+            output.put(_END)
+
+    def _apply(self, stage: Stage, item: Any) -> Any:
+        """Run the stage function on an item, or its on_error function if it raises."""
+        try:
+            return stage.function(item)
+        except Exception as e:
+            self.logger.error("Error in pipeline stage %s. Error: %s", stage.name, e)
+            if stage.on_error is None:
+                raise
+            return stage.on_error(item, e)
+
+    def _work(
+        self,
+        stage: Stage,
+        source: Queue,
+        output: Queue,
+        state: dict,
+        errors: List[Exception],
+    ) -> None:
+        """Run the stage function on the items of the source queue."""
+        while True:
+            item = source.get()
+            if item is _END:
+                # let the other workers of the stage see the end as well.
+                source.put(_END)
+                break
+            try:
+                output.put(self._apply(stage, item))
+            except Exception as e:
+                errors.append(e)
+        with state["lock"]:
+            state["running"] -= 1
+            if state["running"] == 0:
+                output.put(_END)
+
+    def run(self, items: Iterable) -> Iterator:
+        """
+        Run the items through all the stages.
+
+        The first error of a stage without on_error, or of reading the items,
+        is raised once the last output item is yielded.
+
+        items: Iterable: The input items, consumed lazily.
+
+        return: Iterator: The output items of the last stage, as they are ready.
+        """
+        queues = [Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        errors = []
+        threads = [
+            threading.Thread(
+                target=self._feed, args=(items, queues[0], errors), daemon=True
+            )
+        ]
+        for index, stage in enumerate(self.stages):
+            state = {"lock": threading.Lock(), "running": stage.workers}
+            threads.extend(
+                threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[index], queues[index + 1], state, errors),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True,
+                )
+                for worker in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        while True:
+            item = queues[-1].get()
+            if item is _END:
+                break
+            yield item
+        if errors:
+            raise errors[0]
@@ -1 +1,8 @@
-from .stats_perform import StatsPerformProvider
+from fcb_data_providers.lazy import lazy_exports
+
+__all__ = ["FileResult", "StatsPerformProvider"]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {"FileResult": ".results", "StatsPerformProvider": ".stats_perform"},
+)
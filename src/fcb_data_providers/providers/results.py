@@ -0,0 +1,45 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class FileResult:
+    """
+    The outcome of processing one feed file.
+
+    file_path: str: The processed file.
+    file_type: str: The file type, e.g. match_event or match_stats.
+    success: bool: True if the file was processed without an error.
+    error: str: The error message of a failed file.
+    match_id: str: The match id of the file, once it is read.
+    metrics: dict: The stage metrics of the file, when it was processed in a
+        worker process.
+    """
+
+    file_path: str
+    file_type: str
+    success: bool
+    error: Optional[str] = None
+    match_id: Optional[str] = None
+    metrics: Optional[dict] = None
+
+
+@dataclass
+class PendingMatch:
+    """
+    The feed files of a match on their way through the stages of the
+    processing pipeline.
+
+    index: int: The position of the match in the run.
+    files: List[tuple]: The (file_path, file_type) pairs of the match.
+    feeds: Dict[str, MatchFeed]: The parsed feeds by file path.
+    fingerprints: Dict[str, dict]: The file fingerprints of the ingestion
+        manifest by file path.
+    error: str: The error message of a match which failed in a stage.
+    """
+
+    index: int
+    files: List[tuple]
+    feeds: Dict[str, Any] = field(default_factory=dict)
+    fingerprints: Dict[str, dict] = field(default_factory=dict)
+    error: Optional[str] = None
@@ -1,60 +1,284 @@
-import os
-from typing import List
-
-import pandas as pd
-from dotenv import load_dotenv
-
-from fcb_data_providers.create_match_View import create_match_detail_view
-from fcb_data_providers.database import Database
+import asyncio
+import copy
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import (TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional,
+                    Union)
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm.session import Session
+
+from fcb_data_providers.bulk_writer import DEFAULT_BATCH_SIZE, BulkWriter
+from fcb_data_providers.database import Database, begin_write
 from fcb_data_providers.database_models import (Card, Event, Goal, Match,
                                                 Period, Player, Qualifier,
                                                 Score, Team)
+from fcb_data_providers.dimension_cache import DimensionCache
+from fcb_data_providers.discovery import (FeedFile, iter_feed_files,
+                                          pair_files, sort_feed_files)
+from fcb_data_providers.manifest import (FileManifest, get_file_fingerprint,
+                                         is_file_changed)
+from fcb_data_providers.match_details import refresh_match_details
+from fcb_data_providers.metrics import IngestMetrics, RunReport
 from fcb_data_providers.models import (CardModel, EventModel, GoalModel,
                                        MatchModel, PeriodModel, PlayerModel,
-                                       QualifierModel, ScoreModel, TeamModel)
+                                       QualifierModel, ScoreModel, TeamModel,
+                                       validate_rows)
+from fcb_data_providers.pipeline import DEFAULT_QUEUE_SIZE, Pipeline, Stage
+from fcb_data_providers.providers.results import FileResult, PendingMatch
+from fcb_data_providers.providers.worker import (init_worker,
+                                                 process_match_files)
+from fcb_data_providers.qualifiers import QUALIFIER_LAYOUTS, pack_qualifiers
+from fcb_data_providers.readers import MatchFeed, read_feed
+from fcb_data_providers.readers.decoders import (get_json_decoder, load_feed,
+                                                 load_json_feed)
+from fcb_data_providers.sinks import ParquetSink
+from fcb_data_providers.upsert import supports_upsert, upsert_rows
 from fcb_data_providers.utils import get_logger
+from fcb_data_providers.work_queue import (DEFAULT_LEASE_SECONDS,
+                                           DEFAULT_MAX_ATTEMPTS, LEASED,
+                                           Heartbeat, WorkQueue, get_worker_id)
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class StatsPerformProvider:
 
-    def __init__(self, data_path: str, database_url: str):
+    # high volume tables which are written in batches when bulk insert is enabled.
+    BULK_MODELS = (Event, Qualifier)
+
+    # tables filled from one file type, cleared when a file is re-ingested.
+    FEED_MODELS = {
+        "match_event": (Qualifier, Event),
+        "match_stats": (Goal, Card),
+    }
+
+    # tables filled from the match details which both file types repeat, stored
+    # once per match, and replaced when a match is stored again.
+    SHARED_MODELS = (Period, Score)
+
+    # dimension tables which are upserted, as every match file repeats them.
+    UPSERT_MODELS = (Match, Team, Player)
+
+    # feed fields stored for a team and a player, fingerprinted by the dimension cache.
+    TEAM_FIELDS = ("id", "name", "shortName", "officialName", "code")
+    PLAYER_FIELDS = (
+        "playerId",
+        "firstName",
+        "lastName",
+        "shortFirstName",
+        "shortLastName",
+        "matchName",
+        "shirtNumber",
+        "position",
+        "positionSide",
+        "formationPlace",
+        "captain",
+    )
+
+    # datasets of the parquet sink, and the fact tables it can replace.
+    PARQUET_DATASETS = {
+        Event: "events",
+        Qualifier: "qualifiers",
+        Goal: "goals",
+        Card: "cards",
+        Player: "lineups",
+    }
+    FACT_MODELS = (Event, Qualifier, Goal, Card)
+
+    # parquet datasets filled from one file type, replaced when a file is re-ingested.
+    PARQUET_FEED_MODELS = {
+        "match_event": (Event, Qualifier),
+        "match_stats": (Goal, Card, Player),
+    }
+
+    # process method of every supported file type.
+    FILE_PROCESSORS = {
+        "match_event": "process_event_data",
+        "match_stats": "process_stats_data",
+    }
+
+    # databases with SELECT ... FOR UPDATE SKIP LOCKED, for the distributed mode.
+    WORK_QUEUE_DIALECTS = ("postgresql",)
+
+    # seconds a node waits for the files leased by other nodes.
+    WORK_QUEUE_POLL_SECONDS = 5
+
+    # event batches of a match validated ahead of its write by the pipeline, the
+    # rest of its events are streamed and validated while the match is written.
+    PREPARED_BATCHES = 4
+
+    # the opt-in JSON decoder, which reads the feeds incrementally with bounded
+    # memory. The decoders of get_json_decoder decode uncompressed JSON files at
+    # once, which is faster.
+    STREAM_DECODER = "stream"
+
+    def __init__(
+        self,
+        data_path: str,
+        database_url: str,
+        bulk_insert: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        parquet_path: Optional[str] = None,
+        database_sink: bool = True,
+        defer_indexes: bool = False,
+        qualifier_layout: str = "rows",
+        metrics_path: Optional[str] = None,
+        prometheus_path: Optional[str] = None,
+        include_patterns: Optional[List[str]] = None,
+        exclude_patterns: Optional[List[str]] = None,
+        json_decoder: str = "auto",
+    ):
 
         self.logger = get_logger(__name__)
 
         self.logger.info("Initializing StatsPerform data provider")
 
         self.data_path = data_path
+        self.database_url = database_url
+        self.batch_size = batch_size
+        self.parquet_path = parquet_path
+        self.database_sink = database_sink
+        self.defer_indexes = defer_indexes
+        if qualifier_layout not in QUALIFIER_LAYOUTS:
+            raise ValueError(
+                f"Unknown qualifier layout: {qualifier_layout}, "
+                f"expected one of {QUALIFIER_LAYOUTS}"
+            )
+        self.qualifier_layout = qualifier_layout
+        self.metrics_path = metrics_path
+        self.prometheus_path = prometheus_path
+        self.include_patterns = include_patterns
+        self.exclude_patterns = exclude_patterns
+        if json_decoder != self.STREAM_DECODER:
+            # fails early for an unknown decoder, or one which is not installed.
+            get_json_decoder(json_decoder)
+        self.json_decoder = json_decoder
 
         self.db = Database(database_url=database_url)
-        self.db.create_tables()
+        # with deferred indexes, they are built at the end of process_data.
+        self.db.create_tables(create_indexes=not defer_indexes)
         self.session = self.db.get_session()
 
-        load_dotenv()
+        self._in_match_scope = False
+        self._current_files: List[dict] = []
+        self._failed_sections: List[str] = []
+        self.dimension_cache = DimensionCache()
+        self.metrics = IngestMetrics()
+        self.run_report: Optional[RunReport] = None
+        self.bulk_writer = (
+            BulkWriter(
+                self.session, self.logger, batch_size=batch_size, metrics=self.metrics
+            )
+            if bulk_insert
+            else None
+        )
+        self.parquet_sink = (
+            ParquetSink(parquet_path, self.logger, self.PARQUET_DATASETS)
+            if parquet_path
+            else None
+        )
+        if not database_sink and self.parquet_sink is None:
+            raise ValueError("database_sink can only be disabled with a parquet_path")
 
-    def get_match_related_files(self, file_type: str) -> List[str]:
+    @property
+    def manifest(self) -> FileManifest:
+        """The ingestion manifest of the provider session."""
+        return FileManifest(self.session, self.logger)
+
+    def iter_feed_files(
+        self, file_types: Optional[List[str]] = None
+    ) -> Iterator[FeedFile]:
+        """
+        Walk the StatsPerform data provider directory and its subdirectories,
+        and yield the feed files matching the include and exclude patterns.
+
+        file_types: List[str]: The file types to yield, all by default.
+
+        return: Iterator[FeedFile]: The feed files, while they are discovered.
+        """
+        return iter_feed_files(
+            self.data_path,
+            file_types=file_types,
+            include=self.include_patterns,
+            exclude=self.exclude_patterns,
+        )
+
+    def get_match_related_files(self, file_type: str, force: bool = False) -> List[str]:
         """
         Get the match event data files from the StatsPerform data provider directory.
+
+        Files which were already ingested and did not change since are skipped,
+        using the ingestion manifest.
+
         :param file_type: str: The type of file to get.
+        :param force: bool: Return all the files, also the unchanged ones.
         return: List[str]: List of file names.
         """
         self.logger.info(
-            "Getting match event data files from StatsPerform data provider directory"
+            "Getting %s data files from StatsPerform data provider directory",
+            file_type,
         )
-        return [
-            self.data_path + "/" + file
-            for file in os.listdir(self.data_path)
-            if file.startswith(file_type)
+        files = [
+            feed_file.path for feed_file in self.iter_feed_files(file_types=[file_type])
         ]
+        if force:
+            return files
+        return self.manifest.filter_changed_files(files)
 
-    def get_json_data(self, file_path: str) -> pd.DataFrame:
+    def get_json_data(self, file_path: str) -> "pd.DataFrame":
         """
         Get the JSON data from the file.
 
+        The file is decoded with the JSON decoder of the provider, and the
+        dataframe is built from the decoded sections, instead of parsing the
+        file with pandas.
+
         file_path: str: The file path to the JSON file.
 
         return: pd.DataFrame: Dataframe.
         """
-        return pd.read_json(file_path)
+        import pandas as pd
+
+        if self.json_decoder == self.STREAM_DECODER:
+            feed = read_feed(file_path, stream_key=None)
+            data = {"matchInfo": feed.match_info, "liveData": feed.live_data}
+        else:
+            data = load_json_feed(file_path, self.json_decoder)
+        return pd.DataFrame(data)
+
+    def read_feed(self, file_path: str) -> MatchFeed:
+        """
+        Read a feed file with the JSON decoder of the provider.
+
+        The stream decoder streams the events instead of loading them at once.
+        The other decoders decode uncompressed JSON files at once, e.g. orjson
+        from a memory map of the file, and stream the events of compressed and
+        JSON Lines files as well, see load_feed.
+
+        file_path: str: The file path to the JSON or JSON Lines file, which
+            can be compressed.
+
+        return: MatchFeed: The feed.
+        """
+        if self.json_decoder == self.STREAM_DECODER:
+            return read_feed(file_path, stream_key="event")
+        return load_feed(file_path, self.json_decoder)
+
+    def as_feed(self, data: Union[MatchFeed, "pd.DataFrame"]) -> MatchFeed:
+        """
+        Get the feed of data read by read_feed or get_json_data.
+
+        data: MatchFeed | pd.DataFrame: The feed data.
+
+        return: MatchFeed: The feed.
+        """
+        if isinstance(data, MatchFeed):
+            return data
+        return MatchFeed.from_dataframe(data)
 
     def store_model_in_database(self, model, model_name, pydantic_model):
         """
@@ -66,16 +290,154 @@ class StatsPerformProvider:
 
         return: None
         """
+        self.store_rows_in_database(model, model_name, [pydantic_model.model_dump()])
+
+    def store_row_in_database(self, model, model_name, row: dict) -> None:
+        """
+        Store one validated row in the database.
+
+        Inside a match, the row is only added to the session and committed by
+        the match scope.
+
+        model: BaseModel: The model class.
+        model_name: str: The model name.
+        row: dict: The validated row data.
+
+        return: None
+        """
+        if self._in_match_scope:
+            self.session.add(model(**row))
+            return
+        try:
+            self.session.add(model(**row))
+            self.session.commit()
+            self.logger.debug("Stored %s data", model_name)
+        except Exception as e:
+            self.logger.error(
+                "Error storing model data for model: %s. Error: %s", model_name, e
+            )
+            self.session.rollback()
+
+    def upsert_rows_in_database(self, model, model_name, rows: List[dict]) -> None:
+        """
+        Insert or update validated rows with one native upsert statement.
+
+        Unchanged rows are skipped by the database.
+
+        model: BaseModel: The model class.
+        model_name: str: The model name.
+        rows: List[dict]: The validated rows data.
+
+        return: None
+        """
+        if self._in_match_scope:
+            # committed once per match by the match scope.
+            upsert_rows(self.session, model, rows)
+            return
         try:
-            self.session.add(model(**pydantic_model.model_dump()))
+            count = upsert_rows(self.session, model, rows)
             self.session.commit()
-            self.logger.info(f"Stored {model_name} data")
+            self.logger.debug("Upserted %s %s rows", count, model_name)
         except Exception as e:
             self.logger.error(
-                f"Error storing model data for model: {model_name}. Error: {e}"
+                "Error storing model data for model: %s. Error: %s", model_name, e
             )
             self.session.rollback()
 
+    def store_rows_in_database(self, model, model_name, rows: List[dict]) -> None:
+        """
+        Store validated rows in the database.
+
+        Inside a match, rows of the parquet datasets are also written to the
+        parquet sink, and only to it when the database sink is disabled. Models
+        in UPSERT_MODELS are upserted on PostgreSQL and SQLite, models in
+        BULK_MODELS are written in batches by the bulk writer, and other rows
+        are stored one at a time.
+
+        model: BaseModel: The model class.
+        model_name: str: The model name.
+        rows: List[dict]: The validated rows data.
+
+        return: None
+        """
+        if not rows:
+            return
+        if self._in_match_scope and self.parquet_sink is not None:
+            if self.parquet_sink.accepts(model):
+                self.parquet_sink.add_many(model, rows)
+            if not self.database_sink and model in self.FACT_MODELS:
+                return
+        self.write_rows_in_database(model, model_name, rows)
+
+    def write_rows_in_database(self, model, model_name, rows: List[dict]) -> None:
+        """
+        Write validated rows to the database, measured as the write stage of
+        their table.
+
+        Rows buffered by the bulk writer are measured when the writer flushes
+        them. Inside a match, rows stored one at a time are flushed right away,
+        so their inserts are measured with their table.
+
+        model: BaseModel: The model class.
+        model_name: str: The model name.
+        rows: List[dict]: The validated rows data.
+
+        return: None
+        """
+        if self.bulk_writer is not None and model in self.BULK_MODELS:
+            self.bulk_writer.add_many(model, rows)
+            self.logger.debug("Buffered %s %s rows", len(rows), model_name)
+            return
+        with self.metrics.measure(f"write.{model.__tablename__}", rows=len(rows)):
+            if model in self.UPSERT_MODELS and supports_upsert(self.session):
+                self.upsert_rows_in_database(model, model_name, rows)
+                return
+            for row in rows:
+                self.store_row_in_database(model, model_name, row)
+            if self._in_match_scope:
+                self.session.flush()
+
+    def validate_table_rows(
+        self, model, pydantic_model, rows: List[dict], **context
+    ) -> List[dict]:
+        """
+        Validate the feed rows of a table, measured as its validate stage.
+
+        Invalid rows are dropped and logged, the other rows of the batch are
+        kept.
+
+        model: BaseModel: The model class of the table.
+        pydantic_model: Pydantic Model: The model class validating the rows.
+        rows: List[dict]: The feed rows.
+        context: Any: Fields added to every row, e.g. the match id.
+
+        return: List[dict]: The validated rows.
+        """
+        rows = rows or []
+        with self.metrics.measure(f"validate.{model.__tablename__}", rows=len(rows)):
+            validated = validate_rows(
+                pydantic_model, rows, skip_invalid=True, **context
+            )
+        dropped = len(rows) - len(validated)
+        if dropped:
+            self.logger.warning(
+                "Dropped %s invalid %s rows", dropped, model.__tablename__
+            )
+        return validated
+
+    def store_models_in_database(self, model, model_name, pydantic_models):
+        """
+        Store a list of models in the database.
+
+        model: BaseModel: The model class.
+        model_name: str: The model name.
+        pydantic_models: List[Pydantic Model]: The models data.
+
+        return: None
+        """
+        rows = [pydantic_model.model_dump() for pydantic_model in pydantic_models]
+        self.store_rows_in_database(model, model_name, rows)
+
     def store_match_data(self, match_id: str, match_details: dict) -> None:
         """
         Store the match data.
@@ -85,35 +447,32 @@ class StatsPerformProvider:
 
         return: None
         """
-        match_model = MatchModel(
-            id=match_id,
-            match_date=match_details.get("local_date"),
-            match_status=match_details.get("matchStatus"),
-            home_team_id=match_details.get("home_team_id"),
-            away_team_id=match_details.get("away_team_id"),
-            winner=match_details.get("winner"),
-            match_length_min=match_details.get("matchLengthMin"),
-            match_length_sec=match_details.get("matchLengthSec"),
-        )
-        self.store_model_in_database(Match, "Match", match_model)
+        rows = self.validate_table_rows(Match, MatchModel, [match_details], id=match_id)
+        self.store_rows_in_database(Match, "Match", rows)
 
     def store_team_data(self, teams_data: List[dict]) -> None:
         """
         Store the team data.
 
+        Inside a match, teams which are unchanged since they were stored in this
+        run are skipped.
+
         teams_data: List[dict]: The team data.
 
         return: None
         """
-        for team_details in teams_data:
-            team_model = TeamModel(
-                id=team_details.get("id"),
-                name=team_details.get("name"),
-                short_name=team_details.get("shortName"),
-                official_name=team_details.get("officialName"),
-                code=team_details.get("code"),
-            )
-            self.store_model_in_database(Team, "Team", team_model)
+        if self._in_match_scope:
+            teams_data = [
+                team_details
+                for team_details in teams_data
+                if self.dimension_cache.changed(
+                    Team.__tablename__,
+                    team_details.get("id"),
+                    [team_details.get(field) for field in self.TEAM_FIELDS],
+                )
+            ]
+        rows = self.validate_table_rows(Team, TeamModel, teams_data)
+        self.store_rows_in_database(Team, "Team", rows)
 
     def store_period_data(self, match_id: str, match_data: dict) -> None:
         """
@@ -123,16 +482,10 @@ class StatsPerformProvider:
 
         return: None
         """
-        periods = match_data.get("period")
-        for period in periods:
-            period_model = PeriodModel(
-                match_id=match_id,
-                start_time=period.get("start"),
-                end_time=period.get("end"),
-                length_min=period.get("lengthMin"),
-                length_sec=period.get("lengthSec"),
-            )
-            self.store_model_in_database(Period, "Period", period_model)
+        rows = self.validate_table_rows(
+            Period, PeriodModel, match_data.get("period"), match_id=match_id
+        )
+        self.store_rows_in_database(Period, "Period", rows)
 
     def store_score_data(self, match_id: str, match_data: dict) -> None:
         """
@@ -166,14 +519,90 @@ class StatsPerformProvider:
 
         return: None
         """
-        for qualifier in qualifiers_data:
-            qualifier_model = QualifierModel(
-                q_id=qualifier.get("id"),
-                qualifier_id=qualifier.get("qualifierId"),
-                value=qualifier.get("value"),
-                event_id=event_id,
+        rows = self.validate_table_rows(
+            Qualifier, QualifierModel, qualifiers_data, event_id=event_id
+        )
+        self.store_rows_in_database(Qualifier, "Qualifier", rows)
+
+    def build_normalized_event_rows(
+        self, match_id: str, events_data: List[dict]
+    ) -> tuple:
+        """
+        Build the event and qualifier rows through the columnar normalization.
+
+        The events and their qualifiers are converted to typed columns at once,
+        without a pydantic model per row. Rows missing a required column are
+        dropped. It is measured as the validate stage of the events, with the
+        rows of their qualifiers.
+
+        match_id: str: The match id.
+        events_data: List[dict]: The event data.
+
+        return: tuple: The event rows and the qualifier rows.
+        """
+        # pandas is only imported by the bulk insert mode.
+        from fcb_data_providers.normalization import (normalize_events,
+                                                      to_records)
+
+        with self.metrics.measure("validate.events") as measured:
+            df_events, df_qualifiers, dropped = normalize_events(match_id, events_data)
+            event_rows, qualifier_rows = to_records(df_events), to_records(
+                df_qualifiers
             )
-            self.store_model_in_database(Qualifier, "Qualifier", qualifier_model)
+            measured.rows = len(event_rows) + len(qualifier_rows)
+        if dropped:
+            self.logger.warning(
+                "Dropped %s invalid event and qualifier rows for match id: %s",
+                dropped,
+                match_id,
+            )
+        return event_rows, qualifier_rows
+
+    def build_event_rows(self, match_id: str, events_data: List[dict]) -> tuple:
+        """
+        Build the validated event and qualifier rows of a batch of events.
+
+        The events, and then the qualifiers of all events, are validated as one
+        batch each. Invalid events are dropped with their qualifiers. In bulk
+        insert mode, the events are normalized as columns instead. It does not
+        use the database, so it can run in another thread.
+
+        match_id: str: The match id.
+        events_data: List[dict]: The event data.
+
+        return: tuple: The event rows and the qualifier rows.
+        """
+        if self.bulk_writer is not None:
+            return self.build_normalized_event_rows(match_id, events_data)
+
+        event_rows = self.validate_table_rows(
+            Event, EventModel, events_data, match_id=match_id
+        )
+        event_ids = {event_row["e_id"] for event_row in event_rows}
+        qualifiers = [
+            {**qualifier, "event_id": event.get("id")}
+            for event in events_data
+            if event.get("id") in event_ids
+            for qualifier in event.get("qualifier") or []
+        ]
+        return event_rows, self.validate_table_rows(
+            Qualifier, QualifierModel, qualifiers
+        )
+
+    def store_normalized_event_data(
+        self, match_id: str, events_data: List[dict]
+    ) -> None:
+        """
+        Store the event data through the columnar normalization stage, and
+        write it with the bulk writer.
+
+        match_id: str: The match id.
+        events_data: List[dict]: The event data.
+
+        return: None
+        """
+        self.store_event_rows(*self.build_normalized_event_rows(match_id, events_data))
+        self.bulk_writer.flush()
 
     def store_event_data(self, match_id: str, events_data: List[dict]) -> None:
         """
@@ -184,55 +613,80 @@ class StatsPerformProvider:
 
         return: None
         """
-        for event in events_data:
-            event_id = event.get("id")
-            event_model = EventModel(
-                e_id=event.get("id"),
-                event_id=event.get("eventId"),
-                type_id=event.get("typeId"),
-                period_id=event.get("periodId"),
-                time_min=event.get("timeMin"),
-                time_sec=event.get("timeSec"),
-                x=event.get("x"),
-                y=event.get("y"),
-                outcome=event.get("outcome"),
-                timestamp=event.get("timestamp"),
-                last_modified=event.get("lastModified"),
-                match_id=match_id,
-                player_id=event.get("playerId"),
-                team_id=event.get("contestantId"),
-            )
-            self.store_model_in_database(Event, "Event", event_model)
-            qualifier_data = event.get("qualifier")
-            self.store_event_quailifier_data(event_id, qualifier_data)
+        if self.bulk_writer is not None:
+            self.store_normalized_event_data(match_id, events_data)
+            return
+        self.store_event_rows(*self.build_event_rows(match_id, events_data))
+
+    def store_prepared_event_data(self, prepared) -> None:
+        """
+        Store a batch of events prepared with build_event_rows.
+
+        prepared: tuple | Exception: The event and qualifier rows, or the error
+            which made the batch invalid.
+
+        return: None
+        """
+        if isinstance(prepared, Exception):
+            raise prepared
+        self.store_event_rows(*prepared)
+
+    def store_event_rows(
+        self, event_rows: List[dict], qualifier_rows: List[dict]
+    ) -> None:
+        """
+        Store validated event and qualifier rows in the qualifier layout.
+
+        With the compact layout, the qualifiers are stored as a map on their
+        event row instead of one row each.
+
+        event_rows: List[dict]: The validated event rows.
+        qualifier_rows: List[dict]: The validated qualifier rows of the events.
+
+        return: None
+        """
+        if self.qualifier_layout == "compact":
+            pack_qualifiers(event_rows, qualifier_rows)
+            qualifier_rows = []
+        self.store_rows_in_database(Event, "Event", event_rows)
+        self.store_rows_in_database(Qualifier, "Qualifier", qualifier_rows)
 
     def store_player_data(self, lineups: List[dict]) -> None:
         """
         Store the player data.
 
+        Inside a match, players which are unchanged since they were stored in
+        this run are skipped, but still written to the lineups of the parquet
+        sink.
+
         lineups: List[dict]: The lineup data.
 
         return: None
         """
+        # the lineup of every match is written to the parquet sink.
+        write_lineup = self._in_match_scope and self.parquet_sink is not None
         for lineup in lineups:
             team_id = lineup.get("contestantId")
             players = lineup.get("player")
-            for player in players:
-                player_model = PlayerModel(
-                    id=player.get("playerId"),
-                    first_name=player.get("firstName"),
-                    last_name=player.get("lastName"),
-                    short_first_name=player.get("shortFirstName"),
-                    short_last_name=player.get("shortLastName"),
-                    match_name=player.get("matchName"),
-                    shirt_number=player.get("shirtNumber"),
-                    position=player.get("position"),
-                    position_side=player.get("positionSide"),
-                    formation_place=player.get("formationPlace"),
-                    is_captain=player.get("captain"),
-                    team_id=team_id,
+            changed = [
+                not self._in_match_scope
+                or self.dimension_cache.changed(
+                    Player.__tablename__,
+                    player.get("playerId"),
+                    [team_id] + [player.get(field) for field in self.PLAYER_FIELDS],
                 )
-                self.store_model_in_database(Player, "Player", player_model)
+                for player in players
+            ]
+            if not write_lineup:
+                players = [player for player, new in zip(players, changed) if new]
+            rows = self.validate_table_rows(
+                Player, PlayerModel, players, team_id=team_id
+            )
+            if write_lineup:
+                self.parquet_sink.add_many(Player, rows)
+                rows = [row for row, new in zip(rows, changed) if new]
+            if rows:
+                self.write_rows_in_database(Player, "Player", rows)
 
     def store_goal_data(self, match_id: str, goals_data: List[dict]) -> None:
         """
@@ -243,25 +697,8 @@ class StatsPerformProvider:
 
         return: None
         """
-        for goal in goals_data:
-            goal_model = GoalModel(
-                match_id=match_id,
-                contestant_id=goal.get("contestantId"),
-                period_id=goal.get("periodId"),
-                time_min=goal.get("timeMin"),
-                time_min_sec=goal.get("timeMinSec"),
-                last_updated=goal.get("lastUpdated"),
-                timestamp=goal.get("timestamp"),
-                type=goal.get("type"),
-                scorer_id=goal.get("scorerId"),
-                scorer_name=goal.get("scorerName"),
-                assist_player_id=goal.get("assistPlayerId"),
-                assist_player_name=goal.get("assistPlayerName"),
-                opta_event_id=goal.get("optaEventId"),
-                home_score=goal.get("homeScore"),
-                away_score=goal.get("awayScore"),
-            )
-            self.store_model_in_database(Goal, "Goal", goal_model)
+        rows = self.validate_table_rows(Goal, GoalModel, goals_data, match_id=match_id)
+        self.store_rows_in_database(Goal, "Goal", rows)
 
     def store_card_data(self, match_id: str, cards_data: List[dict]) -> None:
         """
@@ -272,38 +709,186 @@ class StatsPerformProvider:
 
         return: None
         """
-        for card in cards_data:
-            card_model = CardModel(
-                match_id=match_id,
-                contestant_id=card.get("contestantId"),
-                period_id=card.get("periodId"),
-                time_min=card.get("timeMin"),
-                time_min_sec=card.get("timeMinSec"),
-                last_updated=card.get("lastUpdated"),
-                timestamp=card.get("timestamp"),
-                type=card.get("type"),
-                player_id=card.get("playerId"),
-                player_name=card.get("playerName"),
-                opta_event_id=card.get("optaEventId"),
-                card_reason=card.get("cardReason"),
+        rows = self.validate_table_rows(Card, CardModel, cards_data, match_id=match_id)
+        self.store_rows_in_database(Card, "Card", rows)
+
+    def store_section(
+        self, match_id: str, section: str, store_function, *args, required=False
+    ) -> bool:
+        """
+        Store one section of a match inside its own savepoint.
+
+        A failing section is rolled back to the savepoint and logged, so the
+        other sections of the match are still committed, and its files are
+        retried on the next run. A failing required section aborts the whole
+        match.
+
+        match_id: str: The match id.
+        section: str: The section name, used for logging.
+        store_function: Callable: The store method to run for the section.
+        args: Any: The arguments passed to the store method.
+        required: bool: Re-raise the error of a failing section.
+
+        return: bool: True if the section was stored.
+        """
+        self.logger.debug("Storing %s data for match id: %s", section, match_id)
+        if self.parquet_sink is not None:
+            sink_savepoint = self.parquet_sink.savepoint()
+        try:
+            with self.session.begin_nested():
+                store_function(*args)
+                if self.bulk_writer is not None:
+                    self.bulk_writer.flush()
+        except Exception as e:
+            if self.bulk_writer is not None:
+                self.bulk_writer.clear()
+            self.dimension_cache.rollback()
+            if self.parquet_sink is not None:
+                self.parquet_sink.rollback_to(sink_savepoint)
+            self.logger.error(
+                "Error storing %s data for match id: %s. Error: %s",
+                section,
+                match_id,
+                e,
             )
-            self.store_model_in_database(Card, "Card", card_model)
+            if required:
+                raise
+            self._failed_sections.append(section)
+            return False
+        self.logger.debug("Stored %s data for match id: %s", section, match_id)
+        return True
+
+    @contextmanager
+    def match_scope(self, match_id: str, season: Optional[str] = None):
+        """
+        Provide one transactional scope around all the sections of a match.
+
+        Rows are only added to the session inside the scope, and everything is
+        committed once when the scope exits, or rolled back on an exception.
+        When the match is read from files, the files are recorded in the
+        ingestion manifest in the same transaction, and the rows of an earlier
+        version of a file are replaced. When a section of the match failed, the
+        files are recorded with the failed sections, so they count as changed
+        and are replaced on the next run. The periods and scores of a match which
+        is already stored are replaced as well. The rows of the parquet sink are
+        written into temporary files right before the database commit, and
+        renamed into place once it succeeded. The stages measured inside the
+        scope are attributed to the match.
 
-    def process_event_data(self, df_events: pd.DataFrame) -> None:
+        match_id: str: The match id.
+        season: str: The season of the match, used by the parquet sink.
         """
-        Process the event data.
+        with self.metrics.match(match_id):
+            self._in_match_scope = True
+            if self.bulk_writer is not None:
+                self.bulk_writer.autocommit = False
+            if self.parquet_sink is not None:
+                self.parquet_sink.begin_match(match_id, season)
+            self._failed_sections = []
+            try:
+                current_files = self._current_files
+                for current_file in current_files:
+                    if current_file["replace"]:
+                        self.clear_match_data(match_id, current_file["file_type"])
+                if self.session.get(Match, match_id) is not None:
+                    self.clear_shared_data(match_id)
+                yield
+                for current_file in current_files:
+                    current_file["match_id"] = match_id
+                    current_file["failed_sections"] = self._failed_sections
+                    self.manifest.record_file(
+                        current_file["file_path"],
+                        current_file["file_type"],
+                        current_file["fingerprint"],
+                        match_id=match_id,
+                        failed_sections=self._failed_sections,
+                    )
+                if self.parquet_sink is not None:
+                    with self.metrics.measure("write.parquet"):
+                        self.parquet_sink.prepare()
+                with self.metrics.measure("commit"):
+                    self.session.commit()
+                if self.parquet_sink is not None:
+                    self.parquet_sink.commit()
+                self.dimension_cache.commit()
+                self.logger.info("Committed match id: %s", match_id)
+            except Exception:
+                self.session.rollback()
+                self.dimension_cache.rollback()
+                if self.parquet_sink is not None:
+                    self.parquet_sink.rollback()
+                self.logger.error("Rolled back match id: %s", match_id)
+                raise
+            finally:
+                self._in_match_scope = False
+                if self.bulk_writer is not None:
+                    self.bulk_writer.autocommit = True
+
+    def clear_match_data(self, match_id: str, file_type: str) -> None:
+        """
+        Delete the rows an earlier ingest of a file stored for a match, and
+        its parquet files once the match is committed.
+
+        match_id: str: The match id.
+        file_type: str: The file type, match_event or match_stats.
+
+        return: None
+        """
+        self.logger.info("Replacing %s data of match id: %s", file_type, match_id)
+        for model in self.FEED_MODELS[file_type]:
+            if model is Qualifier:
+                event_ids = select(Event.e_id).where(Event.match_id == match_id)
+                query = delete(Qualifier).where(Qualifier.event_id.in_(event_ids))
+            else:
+                query = delete(model).where(model.match_id == match_id)
+            self.session.execute(query)
+        if self.parquet_sink is not None:
+            for model in self.PARQUET_FEED_MODELS[file_type]:
+                self.parquet_sink.clear(model)
+
+    def clear_shared_data(self, match_id: str) -> None:
+        """
+        Delete the periods and scores stored for a match, before they are
+        stored again, e.g. from the other file of the match.
 
-        dataframe: pd.DataFrame: The event data.
+        match_id: str: The match id.
 
         return: None
         """
+        self.logger.debug("Replacing shared data of match id: %s", match_id)
+        for model in self.SHARED_MODELS:
+            self.session.execute(delete(model).where(model.match_id == match_id))
+
+    def get_season(self, feed: MatchFeed) -> Optional[str]:
+        """
+        Get the season of a match, e.g. 2023/2024.
+
+        feed: MatchFeed: The feed data.
 
-        match_details = df_events.loc["matchDetails", "liveData"]
-        events_data = df_events.loc["event", "liveData"]
-        contestants = df_events.loc["contestant", "matchInfo"]
+        return: str: The tournament calendar name, or the year of the match date.
+        """
+        calendar = feed.match_info.get("tournamentCalendar") or {}
+        if calendar.get("name"):
+            return calendar["name"]
+        local_date = feed.match_info.get("localDate")
+        return local_date[:4] if local_date else None
+
+    def get_match_info(self, feed: MatchFeed) -> tuple:
+        """
+        Get the match id, contestants and match details of a feed.
+
+        The match date, and the home and away team ids are added into the match
+        details dictionary.
+
+        feed: MatchFeed: The feed data.
+
+        return: tuple: The match id, contestants and match details.
+        """
+        match_details = feed.live_data["matchDetails"]
+        contestants = feed.match_info["contestant"]
 
         # getting match id
-        match_id = df_events.loc["id", "matchInfo"]
+        match_id = feed.match_info["id"]
 
         # getting contestants id.
         home_contestant_id = next(
@@ -318,154 +903,1027 @@ class StatsPerformProvider:
         )
 
         # getting match date
-        local_date = df_events.loc["localDate", "matchInfo"]
+        local_date = feed.match_info["localDate"]
 
         # adding match info in match_details dictionary
         match_details["local_date"] = local_date
         match_details["home_team_id"] = home_contestant_id
         match_details["away_team_id"] = away_contestant_id
 
-        self.logger.info(f"Storing match data for match id: {match_id}")
-        self.store_match_data(match_id, match_details)
-        self.logger.info(f"Stored match data for match id: {match_id}")
+        return match_id, contestants, match_details
 
-        self.logger.info(f"Storing team data for match id: {match_id}")
-        self.store_team_data(contestants)
-        self.logger.info(f"Stored team data for match id: {match_id}")
+    def reconcile_match_details(
+        self, match_id: str, event_details: dict, stats_details: dict
+    ) -> dict:
+        """
+        Merge the match details of the event and stats feeds of a match.
+
+        The stats feed summarizes the match, so its values are kept where the
+        feeds differ, and the event feed fills in the fields it misses. Every
+        field the feeds disagree on is logged.
+
+        match_id: str: The match id.
+        event_details: dict: The match details of the event feed.
+        stats_details: dict: The match details of the stats feed.
+
+        return: dict: The merged match details.
+        """
+        match_details = dict(event_details)
+        for field, value in stats_details.items():
+            if value is None:
+                continue
+            if match_details.get(field) not in (None, value):
+                self.logger.warning(
+                    "The feeds of match id: %s differ on %s, using the stats feed",
+                    match_id,
+                    field,
+                )
+            match_details[field] = value
+        return match_details
 
-        self.logger.info(f"Storing period data for match id: {match_id}")
-        self.store_period_data(match_id, match_details)
-        self.logger.info(f"Stored period data for match id: {match_id}")
+    def store_shared_sections(
+        self, match_id: str, contestants: List[dict], match_details: dict
+    ) -> None:
+        """
+        Store the sections which both feeds of a match repeat: the match, its
+        teams, periods and scores. The match section is required, as the other
+        rows of the match refer to it.
 
-        self.logger.info(f"Storing score data for match id: {match_id}")
-        self.store_score_data(match_id, match_details)
-        self.logger.info(f"Stored score data for match id: {match_id}")
+        match_id: str: The match id.
+        contestants: List[dict]: The teams of the match.
+        match_details: dict: The match details.
 
-        self.logger.info(f"Storing event data for match id: {match_id}")
-        self.store_event_data(match_id, events_data)
-        self.logger.info(f"Stored event data for match id: {match_id}")
+        return: None
+        """
+        self.store_section(
+            match_id,
+            "match",
+            self.store_match_data,
+            match_id,
+            match_details,
+            required=True,
+        )
+        self.store_section(match_id, "team", self.store_team_data, contestants)
+        self.store_section(
+            match_id, "period", self.store_period_data, match_id, match_details
+        )
+        self.store_section(
+            match_id, "score", self.store_score_data, match_id, match_details
+        )
 
-    def process_stats_data(self, df_stats: pd.DataFrame) -> None:
+    def store_event_sections(self, match_id: str, feed: MatchFeed) -> None:
+        """
+        Store the events of an event feed, one batch at a time, as they are
+        read from a streamed feed, or as they were prepared by the pipeline.
+        The invalid events of a batch are dropped when it is validated, so a
+        batch which still fails aborts the match, instead of losing its events.
+
+        match_id: str: The match id.
+        feed: MatchFeed: The event feed.
+
+        return: None
+        """
+        prepared_events = feed.prepared.get("event")
+        if prepared_events is None:
+            for events_data in self.iter_event_batches(feed):
+                self.store_section(
+                    match_id,
+                    "event",
+                    self.store_event_data,
+                    match_id,
+                    events_data,
+                    required=True,
+                )
+        else:
+            for prepared in prepared_events:
+                self.store_section(
+                    match_id,
+                    "event",
+                    self.store_prepared_event_data,
+                    prepared,
+                    required=True,
+                )
+
+    def store_stats_sections(self, match_id: str, feed: MatchFeed) -> None:
+        """
+        Store the lineups, cards and goals of a stats feed.
+
+        match_id: str: The match id.
+        feed: MatchFeed: The stats feed.
+
+        return: None
+        """
+        lineup = feed.live_data["lineUp"]
+        goals = feed.live_data["goal"]
+        cards = feed.live_data["card"]
+        self.store_section(match_id, "lineup", self.store_player_data, lineup)
+        self.store_section(match_id, "cards", self.store_card_data, match_id, cards)
+        self.store_section(match_id, "goals", self.store_goal_data, match_id, goals)
+
+    def process_event_data(self, df_events: Union[MatchFeed, "pd.DataFrame"]) -> None:
+        """
+        Process the event data.
+
+        All the sections of the match are stored in a single transaction, and
+        the events are stored one batch at a time, as they are read from a
+        streamed feed, or as they were prepared by the pipeline.
+
+        df_events: MatchFeed | pd.DataFrame: The event data.
+
+        return: None
+        """
+        feed = self.as_feed(df_events)
+        match_id, contestants, match_details = self.get_match_info(feed)
+
+        with self.match_scope(match_id, season=self.get_season(feed)):
+            self.store_shared_sections(match_id, contestants, match_details)
+            self.store_event_sections(match_id, feed)
+
+    def process_stats_data(self, df_stats: Union[MatchFeed, "pd.DataFrame"]) -> None:
         """
         Process the stats data.
 
-        dataframe: pd.DataFrame: The stats data.
+        All the sections of the match are stored in a single transaction.
+
+        df_stats: MatchFeed | pd.DataFrame: The stats data.
 
         return: None
         """
+        feed = self.as_feed(df_stats)
+        match_id, contestants, match_details = self.get_match_info(feed)
 
-        match_details = df_stats.loc["matchDetails", "liveData"]
-        contestants = df_stats.loc["contestant", "matchInfo"]
-        lineup = df_stats.loc["lineUp", "liveData"]
-        goals = df_stats.loc["goal", "liveData"]
-        cards = df_stats.loc["card", "liveData"]
+        with self.match_scope(match_id, season=self.get_season(feed)):
+            self.store_shared_sections(match_id, contestants, match_details)
+            self.store_stats_sections(match_id, feed)
 
-        # getting match id
-        match_id = df_stats.loc["id", "matchInfo"]
+    def process_match_data(
+        self,
+        df_events: Union[MatchFeed, "pd.DataFrame"],
+        df_stats: Union[MatchFeed, "pd.DataFrame"],
+    ) -> None:
+        """
+        Process the event and stats data of one match together.
 
-        # getting contestants id.
-        home_contestant_id = next(
-            contestant["id"]
-            for contestant in contestants
-            if contestant["position"] == "home"
+        The match, teams, periods and scores are stored once, from the match
+        details of both feeds, reconciled with reconcile_match_details. The
+        events and qualifiers come from the event feed, and the lineups, goals
+        and cards from the stats feed. All the sections are stored in a single
+        transaction.
+
+        df_events: MatchFeed | pd.DataFrame: The event data.
+        df_stats: MatchFeed | pd.DataFrame: The stats data.
+
+        return: None
+        """
+        event_feed = self.as_feed(df_events)
+        stats_feed = self.as_feed(df_stats)
+        match_id, event_contestants, event_details = self.get_match_info(event_feed)
+        stats_match_id, stats_contestants, stats_details = self.get_match_info(
+            stats_feed
         )
-        away_contestant_id = next(
-            contestant["id"]
-            for contestant in contestants
-            if contestant["position"] == "away"
+        if stats_match_id != match_id:
+            raise ValueError(
+                f"The event feed of match id: {match_id} and the stats feed of "
+                f"match id: {stats_match_id} are not of the same match"
+            )
+        match_details = self.reconcile_match_details(
+            match_id, event_details, stats_details
         )
+        contestants = list(
+            {
+                contestant["id"]: contestant
+                for contestant in event_contestants + stats_contestants
+            }.values()
+        )
+        season = self.get_season(stats_feed) or self.get_season(event_feed)
 
-        # getting match date
-        local_date = df_stats.loc["localDate", "matchInfo"]
+        with self.match_scope(match_id, season=season):
+            self.store_shared_sections(match_id, contestants, match_details)
+            self.store_event_sections(match_id, event_feed)
+            self.store_stats_sections(match_id, stats_feed)
 
-        # adding match info in match_details dictionary
-        match_details["local_date"] = local_date
-        match_details["home_team_id"] = home_contestant_id
-        match_details["away_team_id"] = away_contestant_id
+    def load_file(self, file_path: str) -> tuple:
+        """
+        Open a feed file and get its fingerprint, e.g. in a worker thread.
+
+        Opening the file, with its match info, is measured as the read stage.
+        The events are left in the file, and decoded batch by batch with
+        iter_event_batches.
+
+        file_path: str: The file path.
 
-        self.logger.info(f"Storing match data for match id: {match_id}")
-        self.store_match_data(match_id, match_details)
-        self.logger.info(f"Stored match data for match id: {match_id}")
+        return: tuple: The feed and the file fingerprint.
+        """
+        with self.metrics.measure("read"):
+            feed = self.read_feed(file_path)
+            fingerprint = get_file_fingerprint(file_path)
+        return feed, fingerprint
 
-        self.logger.info(f"Storing team data for match id: {match_id}")
-        self.store_team_data(contestants)
-        self.logger.info(f"Stored team data for match id: {match_id}")
+    def iter_event_batches(self, feed: MatchFeed) -> Iterator[List[dict]]:
+        """
+        Yield the events of a feed in batches of batch_size, and measure their
+        decoding as the parse stage.
 
-        self.logger.info(f"Storing period data for match id: {match_id}")
-        self.store_period_data(match_id, match_details)
-        self.logger.info(f"Stored period data for match id: {match_id}")
+        feed: MatchFeed: The event feed.
 
-        self.logger.info(f"Storing score data for match id: {match_id}")
-        self.store_score_data(match_id, match_details)
-        self.logger.info(f"Stored score data for match id: {match_id}")
+        return: Iterator[List[dict]]: The event batches.
+        """
+        batches = feed.iter_batches("event", self.batch_size)
+        while True:
+            with self.metrics.measure("parse") as measured:
+                events_data = next(batches, None)
+                measured.rows = len(events_data or [])
+            if events_data is None:
+                return
+            yield events_data
+
+    def process_file(
+        self,
+        file_path: str,
+        file_type: str,
+        feed: Optional[MatchFeed] = None,
+        fingerprint: Optional[dict] = None,
+    ) -> FileResult:
+        """
+        Read and process one match event or match stats file.
 
-        self.logger.info(f"Storing lineup data for match id: {match_id}")
-        self.store_player_data(lineup)
-        self.logger.info(f"Stored lineup data for match id: {match_id}")
+        The file is recorded in the ingestion manifest together with its data.
 
-        self.logger.info(f"Storing cards data for match id: {match_id}")
-        self.store_card_data(match_id, cards)
-        self.logger.info(f"Stored cards data for match id: {match_id}")
+        file_path: str: The file path.
+        file_type: str: The file type, match_event or match_stats.
+        feed: MatchFeed: The feed of the file, when it is already read.
+        fingerprint: dict: The fingerprint of the file, when it is already read.
+
+        return: FileResult: The outcome of the file.
+        """
+        return self.process_match_files(
+            [(file_path, file_type)],
+            feeds={file_path: feed} if feed is not None else None,
+            fingerprints={file_path: fingerprint} if fingerprint is not None else None,
+        )[0]
+
+    def process_match_files(
+        self,
+        files: List[tuple],
+        feeds: Optional[Dict[str, MatchFeed]] = None,
+        fingerprints: Optional[Dict[str, dict]] = None,
+    ) -> List[FileResult]:
+        """
+        Read and process the files of one match in a single transaction.
 
-        self.logger.info(f"Storing goals data for match id: {match_id}")
-        self.store_goal_data(match_id, goals)
-        self.logger.info(f"Stored goals data for match id: {match_id}")
+        A match event and a match stats file are processed together with
+        process_match_data, a single file with the process method of its type.
+        The files are recorded in the ingestion manifest together with their
+        data, so they succeed or fail together. The files of a match with a
+        failed section are stored, but reported as failed.
 
-    def process_match_event_data(self, file_path_list: List) -> None:
+        files: List[tuple]: The (file_path, file_type) pairs of the match.
+        feeds: Dict[str, MatchFeed]: The feeds by file path, when they are
+            already read.
+        fingerprints: Dict[str, dict]: The fingerprints by file path, when the
+            files are already read.
+
+        return: List[FileResult]: The outcome of every file.
+        """
+        feeds = dict(feeds or {})
+        fingerprints = fingerprints or {}
+        current_files = [
+            {"file_path": file_path, "file_type": file_type}
+            for file_path, file_type in files
+        ]
+        try:
+            try:
+                for current_file in current_files:
+                    file_path = current_file["file_path"]
+                    self.logger.info(
+                        "Processing %s data from file: %s",
+                        current_file["file_type"].replace("_", " "),
+                        file_path,
+                    )
+                    if file_path not in feeds:
+                        with self.metrics.measure("read"):
+                            feeds[file_path] = self.read_feed(file_path)
+                    current_file["fingerprint"] = fingerprints.get(
+                        file_path
+                    ) or get_file_fingerprint(file_path)
+                # the manifest lookup and the match are one write transaction.
+                begin_write(self.session)
+                entries = self.manifest.get_entries(
+                    [file_path for file_path, _ in files]
+                )
+                for current_file in current_files:
+                    current_file["replace"] = current_file["file_path"] in entries
+                self._current_files = current_files
+
+                feeds_by_type = {
+                    file_type: feeds[file_path] for file_path, file_type in files
+                }
+                if len(files) == 2 and set(feeds_by_type) == set(self.FILE_PROCESSORS):
+                    self.process_match_data(
+                        feeds_by_type["match_event"], feeds_by_type["match_stats"]
+                    )
+                elif len(files) == 1:
+                    file_path, file_type = files[0]
+                    getattr(self, self.FILE_PROCESSORS[file_type])(feeds[file_path])
+                else:
+                    raise ValueError(
+                        f"Expected a match event and a match stats file, got: {files}"
+                    )
+            finally:
+                for feed in feeds.values():
+                    feed.close()
+                self._current_files = []
+        except Exception as e:
+            # a file can fail before its match scope, e.g. with invalid JSON.
+            self.session.rollback()
+            self.logger.error(
+                "Error processing data from files: %s. Error: %s",
+                ", ".join(file_path for file_path, _ in files),
+                e,
+            )
+            return [
+                FileResult(
+                    current_file["file_path"],
+                    current_file["file_type"],
+                    success=False,
+                    error=str(e),
+                    match_id=current_file.get("match_id"),
+                )
+                for current_file in current_files
+            ]
+        results = []
+        for current_file in current_files:
+            failed_sections = current_file.get("failed_sections")
+            results.append(
+                FileResult(
+                    current_file["file_path"],
+                    current_file["file_type"],
+                    success=not failed_sections,
+                    error=(
+                        f"Failed sections: {', '.join(failed_sections)}"
+                        if failed_sections
+                        else None
+                    ),
+                    match_id=current_file.get("match_id"),
+                )
+            )
+        return results
+
+    def process_match_event_data(self, file_path_list: List) -> List[FileResult]:
         """
         Process the match event data.
 
         file_path_list: List: The file path to the match event data file.
 
-        return: None
+        return: List[FileResult]: The outcome of every file.
         """
+        return [
+            self.process_file(file_path, "match_event") for file_path in file_path_list
+        ]
 
-        for file_path in file_path_list:
-            data = self.get_json_data(file_path)
-            try:
-                self.logger.info(f"Processing match event data from file: {file_path}")
-                self.process_event_data(data)
-            except Exception as e:
-                self.logger.error(
-                    f"Error processing match event data from file: {file_path}. Error: {e}"
-                )
-
-    def process_match_stats_data(self, file_path_list: List) -> None:
+    def process_match_stats_data(self, file_path_list: List) -> List[FileResult]:
         """
         Process the match stats data.
 
         file_path_list: list: The file path to the match stats data file.
 
-        return: None
+        return: List[FileResult]: The outcome of every file.
+        """
+        return [
+            self.process_file(file_path, "match_stats") for file_path in file_path_list
+        ]
+
+    def get_worker_config(self) -> dict:
+        """
+        Get the arguments to re-create this provider in a worker process.
+
+        return: dict: Keyword arguments of StatsPerformProvider.
+        """
+        return {
+            "data_path": self.data_path,
+            "database_url": self.database_url,
+            "bulk_insert": self.bulk_writer is not None,
+            "batch_size": self.batch_size,
+            "parquet_path": self.parquet_path,
+            "database_sink": self.database_sink,
+            "defer_indexes": self.defer_indexes,
+            "qualifier_layout": self.qualifier_layout,
+            "include_patterns": self.include_patterns,
+            "exclude_patterns": self.exclude_patterns,
+            "json_decoder": self.json_decoder,
+        }
+
+    def process_files_in_parallel(
+        self, files: List[tuple], workers: int
+    ) -> List[FileResult]:
+        """
+        Process files in a pool of worker processes.
+
+        The files are grouped by match with pair_files. Every worker opens its
+        own database engine and session, and every match is committed by the
+        worker which processed it.
+
+        files: List[tuple]: The (file_path, file_type) pairs to process.
+        workers: int: The number of worker processes.
+
+        return: List[FileResult]: The outcome of every file, in match order.
+        """
+        self.logger.info("Processing %s files with %s workers.", len(files), workers)
+        matches = list(pair_files(files, list(self.FILE_PROCESSORS)))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(self.get_worker_config(),),
+        ) as executor:
+            futures = [
+                executor.submit(process_match_files, match_files)
+                for match_files in matches
+            ]
+            results = []
+            for match_files, future in zip(matches, futures):
+                try:
+                    match_results = future.result()
+                    for result in match_results:
+                        if result.metrics is not None:
+                            self.metrics.merge(result.metrics)
+                    results.extend(match_results)
+                except Exception as e:
+                    file_paths = ", ".join(file_path for file_path, _ in match_files)
+                    self.logger.error(
+                        "Worker failed processing files: %s. Error: %s", file_paths, e
+                    )
+                    results.extend(
+                        FileResult(file_path, file_type, success=False, error=str(e))
+                        for file_path, file_type in match_files
+                    )
+        return results
+
+    def with_session(self, session: Session) -> "StatsPerformProvider":
+        """
+        Get a copy of this provider storing through another session.
+
+        The copy has its own transactional state, bulk writer, parquet sink and
+        dimension cache, so several copies can store matches at once. It
+        records into the metrics of this provider.
+
+        session: Session: The database session of the copy.
+
+        return: StatsPerformProvider: The provider copy.
+        """
+        provider = copy.copy(self)
+        provider.session = session
+        provider._in_match_scope = False
+        provider._current_files = []
+        provider._failed_sections = []
+        provider.dimension_cache = DimensionCache()
+        if self.bulk_writer is not None:
+            provider.bulk_writer = BulkWriter(
+                session, self.logger, batch_size=self.batch_size, metrics=self.metrics
+            )
+        if self.parquet_sink is not None:
+            provider.parquet_sink = ParquetSink(
+                self.parquet_path, self.logger, self.PARQUET_DATASETS
+            )
+        return provider
+
+    async def process_files_async(
+        self, files: List[tuple], concurrency: int
+    ) -> List[FileResult]:
         """
+        Process files with several matches stored at once over asyncio.
 
-        for file_path in file_path_list:
-            data = self.get_json_data(file_path)
+        The files are grouped by match with pair_files. Every one of the
+        concurrency lanes holds one connection of the async engine, and
+        processes matches one after the other. The files are read, and their
+        events decoded and validated, in a thread pool, so the event loop only
+        runs the writes while the other lanes wait on the database.
+
+        files: List[tuple]: The (file_path, file_type) pairs to process.
+        concurrency: int: The number of lanes and database connections.
+
+        return: List[FileResult]: The outcome of every file, in match order.
+        """
+        self.logger.info(
+            "Processing %s files with %s async lanes.", len(files), concurrency
+        )
+        loop = asyncio.get_running_loop()
+        matches = list(pair_files(files, list(self.FILE_PROCESSORS)))
+        pending = [PendingMatch(index, files) for index, files in enumerate(matches)]
+        results = [None] * len(matches)
+
+        async def run_lane(executor: ThreadPoolExecutor) -> None:
+            async with self.db.get_async_session(pool_size=concurrency) as session:
+                lane = self.with_session(session.sync_session)
+                while pending:
+                    match = await loop.run_in_executor(
+                        executor, lane.prepare_pending_match, pending.pop(0)
+                    )
+                    if match.error is not None:
+                        results[match.index] = [
+                            FileResult(
+                                file_path, file_type, success=False, error=match.error
+                            )
+                            for file_path, file_type in match.files
+                        ]
+                        continue
+                    results[match.index] = await session.run_sync(
+                        lambda _: lane.process_match_files(
+                            match.files,
+                            feeds=match.feeds,
+                            fingerprints=match.fingerprints,
+                        )
+                    )
+                self.dimension_cache.hits += lane.dimension_cache.hits
+                self.dimension_cache.misses += lane.dimension_cache.misses
+
+        lanes = min(concurrency, len(matches))
+        try:
+            with ThreadPoolExecutor(max_workers=lanes) as executor:
+                await asyncio.gather(*[run_lane(executor) for _ in range(lanes)])
+        finally:
+            await self.db.dispose_async_engine()
+        return [result for match_results in results for result in match_results]
+
+    def get_files_to_process(self, force: bool = False) -> List[tuple]:
+        """
+        Get the match event files, and then the match stats files, to process,
+        with a single walk of the data directory.
+
+        force: bool: Also get the files which did not change since their ingest.
+
+        return: List[tuple]: The (file_path, file_type) pairs.
+        """
+        self.logger.info("Getting data files from StatsPerform data provider directory")
+        feed_files = sort_feed_files(self.iter_feed_files(), list(self.FILE_PROCESSORS))
+        if not force:
+            changed_files = set(
+                self.manifest.filter_changed_files(
+                    [feed_file.path for feed_file in feed_files]
+                )
+            )
+            feed_files = [
+                feed_file for feed_file in feed_files if feed_file.path in changed_files
+            ]
+        return [(feed_file.path, feed_file.file_type) for feed_file in feed_files]
+
+    def iter_files_to_process(self, force: bool = False) -> Iterator[tuple]:
+        """
+        Yield the files to process while the data directory is walked, so they
+        can be processed before the walk completes.
+
+        The manifest is read once here, and the files are checked against it
+        without the session, so the files can be yielded from another thread,
+        e.g. the feeder of the pipeline. Touched but unchanged files are not
+        updated in the manifest, unlike with get_files_to_process.
+
+        force: bool: Also yield the files which did not change since their ingest.
+
+        return: Iterator[tuple]: The (file_path, file_type) pairs, in walk order.
+        """
+        fingerprints = {} if force else self.manifest.get_fingerprints()
+
+        def iter_files() -> Iterator[tuple]:
+            for feed_file in self.iter_feed_files():
+                if force or is_file_changed(
+                    feed_file.path, fingerprints.get(feed_file.path)
+                ):
+                    yield feed_file.path, feed_file.file_type
+
+        return iter_files()
+
+    def parse_pending_match(self, pending: PendingMatch) -> PendingMatch:
+        """
+        Read and parse the files of a pending match, the parse stage of the
+        pipeline.
+
+        pending: PendingMatch: The pending match.
+
+        return: PendingMatch: The match with its feeds and fingerprints, or its
+            error.
+        """
+        for file_path, _ in pending.files:
             try:
-                self.logger.info(f"Processing match stats data from file: {file_path}")
-                self.process_stats_data(data)
+                feed, fingerprint = self.load_file(file_path)
             except Exception as e:
-                self.logger.error(
-                    f"Error processing match stats data from file: {file_path}. Error: {e}"
+                self.logger.error("Error reading file: %s. Error: %s", file_path, e)
+                return self.fail_pending_match(pending, e)
+            pending.feeds[file_path] = feed
+            pending.fingerprints[file_path] = fingerprint
+        return pending
+
+    def fail_pending_match(
+        self, pending: PendingMatch, error: Exception
+    ) -> PendingMatch:
+        """
+        Mark a pending match as failed, e.g. when a pipeline stage raised, so
+        that the write stage returns a failed result for each of its files.
+
+        pending: PendingMatch: The pending match.
+        error: Exception: The error of the match.
+
+        return: PendingMatch: The match with its error, and without its feeds.
+        """
+        pending.error = str(error)
+        for feed in pending.feeds.values():
+            feed.close()
+        pending.feeds = {}
+        return pending
+
+    def prepare_event_batch(self, match_id: str, events_data: List[dict]):
+        """
+        Validate a batch of events for store_prepared_event_data.
+
+        match_id: str: The match id.
+        events_data: List[dict]: The event data.
+
+        return: tuple | Exception: The event and qualifier rows, or the error
+            which made the batch invalid, so that its section fails when it is
+            stored.
+        """
+        try:
+            return self.build_event_rows(match_id, events_data)
+        except Exception as e:
+            return e
+
+    def iter_prepared_event_batches(
+        self, match_id: str, prepared: list, batches: Iterator[List[dict]]
+    ) -> Iterator:
+        """
+        Yield the event batches prepared ahead, and then prepare the rest of the
+        batches while they are read.
+
+        match_id: str: The match id.
+        prepared: list: The prepared batches.
+        batches: Iterator[List[dict]]: The event batches which are left.
+
+        return: Iterator: The prepared batches.
+        """
+        try:
+            yield from prepared
+            for events_data in batches:
+                yield self.prepare_event_batch(match_id, events_data)
+        finally:
+            batches.close()
+
+    def validate_pending_match(
+        self, pending: PendingMatch, all_batches: bool = False
+    ) -> PendingMatch:
+        """
+        Validate the events of a parsed match, the validate stage of the
+        pipeline.
+
+        The events are the bulk of the rows. Their first PREPARED_BATCHES
+        batches are read and validated or normalized into rows here, and the
+        rest stays in the file, and is read and validated by the write stage
+        while the match is written. So at most PREPARED_BATCHES batches of a
+        match wait in the pipeline queues, not its whole events.
+
+        pending: PendingMatch: The parsed match.
+        all_batches: bool: Read and validate all the event batches here, so
+            the write stage only stores rows.
+
+        return: PendingMatch: The match with the prepared event batches.
+        """
+        if pending.error is not None:
+            return pending
+        for file_path, file_type in pending.files:
+            if file_type != "match_event":
+                continue
+            feed = pending.feeds[file_path]
+            match_id = feed.match_info.get("id")
+            batches = self.iter_event_batches(feed)
+            with self.metrics.match(match_id):
+                prepared = [
+                    self.prepare_event_batch(match_id, events_data)
+                    for events_data in islice(
+                        batches, None if all_batches else self.PREPARED_BATCHES
+                    )
+                ]
+            feed.prepared["event"] = self.iter_prepared_event_batches(
+                match_id, prepared, batches
+            )
+        return pending
+
+    def prepare_pending_match(self, pending: PendingMatch) -> PendingMatch:
+        """
+        Parse a pending match and validate all its events, e.g. in a worker
+        thread, so that only the writes of the match are left.
+
+        pending: PendingMatch: The pending match.
+
+        return: PendingMatch: The match with its feeds and prepared event
+            batches, or its error.
+        """
+        pending = self.parse_pending_match(pending)
+        try:
+            return self.validate_pending_match(pending, all_batches=True)
+        except Exception as e:
+            self.logger.error(
+                "Error validating files: %s. Error: %s",
+                ", ".join(file_path for file_path, _ in pending.files),
+                e,
+            )
+            return self.fail_pending_match(pending, e)
+
+    def process_files_in_pipeline(
+        self,
+        files: Iterable[tuple],
+        parse_workers: int = 1,
+        validate_workers: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> List[FileResult]:
+        """
+        Process files in a pipeline of parse, validate and write stages.
+
+        The files are grouped by match with pair_files, and the files of a match
+        go through the stages together. Matches are parsed and validated by
+        threads, while the matches before them are written by this thread, with
+        its session. The stages are connected by queues of queue_size matches,
+        so parsing pauses while the writes fall behind. A match which fails in a
+        stage gets a failed result for each of its files, while an error of the
+        files iterable is raised once the matches before it are written.
+
+        files: Iterable[tuple]: The (file_path, file_type) pairs to process, e.g.
+            while they are discovered.
+        parse_workers: int: The number of threads parsing matches.
+        validate_workers: int: The number of threads validating events.
+        queue_size: int: The number of matches waiting between two stages.
+
+        return: List[FileResult]: The outcome of every file, in match order.
+        """
+        pipeline = Pipeline(
+            [
+                Stage(
+                    "parse",
+                    self.parse_pending_match,
+                    parse_workers,
+                    on_error=self.fail_pending_match,
+                ),
+                Stage(
+                    "validate",
+                    self.validate_pending_match,
+                    validate_workers,
+                    on_error=self.fail_pending_match,
+                ),
+            ],
+            self.logger,
+            queue_size=queue_size,
+        )
+        pending_matches = (
+            PendingMatch(index, match_files)
+            for index, match_files in enumerate(
+                pair_files(files, list(self.FILE_PROCESSORS))
+            )
+        )
+        results = {}
+        for pending in pipeline.run(pending_matches):
+            if pending.error is not None:
+                match_results = [
+                    FileResult(file_path, file_type, success=False, error=pending.error)
+                    for file_path, file_type in pending.files
+                ]
+            else:
+                match_results = self.process_match_files(
+                    pending.files,
+                    feeds=pending.feeds,
+                    fingerprints=pending.fingerprints,
                 )
+            results[pending.index] = match_results
+        return [result for index in sorted(results) for result in results[index]]
+
+    def finish_run(self, results: List[FileResult]) -> RunReport:
+        """
+        Log the outcome of a run, and update what depends on the stored data.
+
+        The deferred indexes are built, and the match details of the ingested
+        matches are refreshed. The run report is kept in run_report, and
+        written to the metrics_path and prometheus_path files when they are set.
+
+        results: List[FileResult]: The outcome of every file of the run.
 
-    def process_data(self) -> None:
+        return: RunReport: The metrics of the run.
+        """
+        failed = [result for result in results if not result.success]
+        self.logger.info("Processed %s files, %s failed.", len(results), len(failed))
+        self.logger.info(
+            "Dimension cache skipped %s unchanged rows, stored %s new or changed rows.",
+            self.dimension_cache.hits,
+            self.dimension_cache.misses,
+        )
+        if self.defer_indexes:
+            with self.metrics.measure("create_indexes"):
+                self.db.create_indexes()
+        # refresh the summary rows of the ingested matches only.
+        match_ids = {
+            result.match_id for result in results if result.success and result.match_id
+        }
+        if match_ids:
+            with self.metrics.measure("refresh.match_details", rows=len(match_ids)):
+                refresh_match_details(self.session, self.logger, sorted(match_ids))
+
+        self.run_report = self.metrics.report(results)
+        for name, stage in self.run_report.stages.items():
+            self.logger.info(
+                "Stage %s: %s rows in %.3fs (%.0f rows/sec), %s calls, %s retries, "
+                "%s failures.",
+                name,
+                stage.rows,
+                stage.seconds,
+                stage.rows_per_sec,
+                stage.calls,
+                stage.retries,
+                stage.failures,
+            )
+        if self.metrics_path:
+            self.run_report.write_json(self.metrics_path)
+        if self.prometheus_path:
+            self.run_report.write_prometheus(self.prometheus_path)
+        return self.run_report
+
+    def process_data(
+        self,
+        workers: int = 1,
+        force: bool = False,
+        parse_workers: int = 1,
+        validate_workers: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> List[FileResult]:
         """
         Process the data from the StatsPerform data provider.
 
-        return: None
+        Only new and changed files are processed, unless force is set. With
+        deferred indexes, the missing indexes are built once the files are
+        loaded.
+
+        workers: int: The number of worker processes. With 1, the files go
+            through a pipeline of parse, validate and write stages in this
+            process.
+        force: bool: Re-ingest all the files, also the unchanged ones.
+        parse_workers: int: The number of threads parsing files in the pipeline.
+        validate_workers: int: The number of threads validating events in the
+            pipeline.
+        queue_size: int: The number of files waiting between two pipeline
+            stages.
+
+        return: List[FileResult]: The outcome of every file.
         """
 
-        match_event_files = self.get_match_related_files(file_type="match_event")
-        match_stats_files = self.get_match_related_files(file_type="match_stats")
-        if not match_event_files and not match_stats_files:
-            self.logger.info("No match event or match stats data files found.")
-            return
-        if match_event_files:
-            self.logger.info("Processing match event data.")
-            self.process_match_event_data(match_event_files)
-        if match_stats_files:
-            self.logger.info(" Processing match stats data.")
-            self.process_match_stats_data(match_stats_files)
-        # create the match_detail view.
-        create_match_detail_view(self.session, self.logger)
+        # the dimension cache and the metrics are scoped to one run.
+        self.dimension_cache.clear()
+        self.metrics.clear()
+
+        if workers > 1:
+            files = self.get_files_to_process(force=force)
+            results = self.process_files_in_parallel(files, workers) if files else []
+        else:
+            # the files are processed while the data directory is still walked.
+            results = self.process_files_in_pipeline(
+                self.iter_files_to_process(force=force),
+                parse_workers,
+                validate_workers,
+                queue_size,
+            )
+        if not results:
+            self.logger.info("No new match event or match stats data files found.")
+        self.finish_run(results)
+        return results
+
+    def process_queued_files(
+        self,
+        work_queue: WorkQueue,
+        worker_id: str,
+        claim_size: int = 1,
+        poll_seconds: float = WORK_QUEUE_POLL_SECONDS,
+    ) -> List[FileResult]:
+        """
+        Claim and process matches from the work queue, until every file is done
+        or failed.
+
+        The files of a claimed match are grouped with pair_files, and its
+        event and stats files are processed together with process_match_files.
+        The leases are extended by a heartbeat thread meanwhile. While other
+        nodes hold leases, it waits and claims again, so the files of a node
+        which crashed are retried once their lease expires.
+
+        work_queue: WorkQueue: The work queue, on the session of this provider.
+        worker_id: str: The id of this worker, unique across the nodes.
+        claim_size: int: The number of matches claimed at once.
+        poll_seconds: float: The seconds to wait for the leases of other nodes.
+
+        return: List[FileResult]: The outcome of every file processed here.
+        """
+        self.logger.info("Processing queued files as worker %s.", worker_id)
+        results = []
+        heartbeat = Heartbeat(
+            self.db,
+            self.logger,
+            worker_id,
+            interval=work_queue.lease_seconds / 3,
+            lease_seconds=work_queue.lease_seconds,
+        )
+        with heartbeat:
+            try:
+                while True:
+                    with self.metrics.measure("queue.claim") as measured:
+                        leases = work_queue.claim(worker_id, limit=claim_size)
+                        measured.rows = len(leases)
+                        measured.retries = sum(
+                            1 for lease in leases if lease.attempts > 1
+                        )
+                    if not leases:
+                        if not work_queue.get_status_counts().get(LEASED):
+                            break
+                        time.sleep(poll_seconds)
+                        continue
+                    files = [(lease.file_path, lease.file_type) for lease in leases]
+                    for match_files in pair_files(files, list(self.FILE_PROCESSORS)):
+                        for result in self.process_match_files(match_files):
+                            work_queue.complete(
+                                worker_id,
+                                result.file_path,
+                                result.success,
+                                result.error,
+                            )
+                            results.append(result)
+            finally:
+                # leases which were not processed, e.g. on KeyboardInterrupt.
+                work_queue.release(worker_id)
+        return results
+
+    def process_data_distributed(
+        self,
+        worker_id: Optional[str] = None,
+        force: bool = False,
+        claim_size: int = 1,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> List[FileResult]:
+        """
+        Process the data on any number of nodes, sharing a work queue table.
+
+        Every node registers the new and changed files it finds in the work
+        queue, and then claims matches with leases until none are left. Adding
+        nodes splits the matches between more workers. On databases other than
+        PostgreSQL, the files are processed by this node only, as with
+        process_data.
+
+        worker_id: str: The id of this worker, unique across the nodes. By
+            default the host name, the process id and a random suffix.
+        force: bool: Re-ingest all the files, also the unchanged ones.
+        claim_size: int: The number of matches claimed at once.
+        lease_seconds: int: The seconds a lease lasts without a heartbeat.
+        max_attempts: int: The number of times a file is tried.
+
+        return: List[FileResult]: The outcome of every file processed here.
+        """
+        if self.db.engine.dialect.name not in self.WORK_QUEUE_DIALECTS:
+            self.logger.warning(
+                "The work queue needs PostgreSQL, processing the files on this "
+                "node only."
+            )
+            return self.process_data(force=force)
+
+        self.dimension_cache.clear()
+        self.metrics.clear()
+
+        work_queue = WorkQueue(
+            self.session,
+            self.logger,
+            lease_seconds=lease_seconds,
+            max_attempts=max_attempts,
+        )
+        work_queue.register_files(self.get_files_to_process(force=force))
+        results = self.process_queued_files(
+            work_queue, worker_id or get_worker_id(), claim_size=claim_size
+        )
+        self.finish_run(results)
+        return results
+
+    async def process_data_async(
+        self, concurrency: int = 4, force: bool = False
+    ) -> List[FileResult]:
+        """
+        Process the data from the StatsPerform data provider with asyncio.
+
+        Like process_data, but files are read in a thread pool and several
+        matches are stored at once over a pool of concurrency connections, so
+        parsing overlaps with database round-trips. It needs the asyncio
+        extra, and a database every connection can reach, e.g. not an
+        in-memory SQLite database.
+
+        concurrency: int: The number of matches stored at once.
+        force: bool: Re-ingest all the files, also the unchanged ones.
+
+        return: List[FileResult]: The outcome of every file.
+        """
+        self.dimension_cache.clear()
+        self.metrics.clear()
+
+        files = self.get_files_to_process(force=force)
+        if not files:
+            self.logger.info("No new match event or match stats data files found.")
+            self.finish_run([])
+            return []
+        results = await self.process_files_async(files, concurrency)
+        self.finish_run(results)
+        return results
@@ -0,0 +1,46 @@
+"""
+Process pool entrypoints for the StatsPerform provider.
+
+Every worker process builds its own provider, and with it its own engine and
+session from ``Database``, because connections cannot be shared across
+processes.
+"""
+
+from typing import List
+
+from fcb_data_providers.providers.results import FileResult
+
+_provider = None
+
+
+def init_worker(provider_config: dict) -> None:
+    """
+    Create the provider of the current worker process.
+
+    provider_config: dict: Keyword arguments of StatsPerformProvider.
+
+    return: None
+    """
+    global _provider
+
+    from fcb_data_providers.providers.stats_perform import StatsPerformProvider
+
+    _provider = StatsPerformProvider(**provider_config)
+
+
+def process_match_files(files: List[tuple]) -> List[FileResult]:
+    """
+    Process the feed files of one match with the provider of the current worker
+    process.
+
+    The stage metrics of the match are sent back with its first result, and
+    merged into the metrics of the run by the parent process.
+
+    files: List[tuple]: The (file_path, file_type) pairs of the match.
+
+    return: List[FileResult]: The outcome of every file.
+    """
+    _provider.metrics.clear()
+    results = _provider.process_match_files(files)
+    results[0].metrics = _provider.metrics.snapshot()
+    return results
@@ -0,0 +1,73 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm.session import Session
+
+from fcb_data_providers.database_models import Event, Qualifier
+
+# one row per qualifier in the qualifiers table, or one map per event row.
+QUALIFIER_LAYOUTS = ("rows", "compact")
+
+
+def pack_qualifiers(event_rows: List[dict], qualifier_rows: List[dict]) -> None:
+    """
+    Store the qualifiers of every event as a map on the event row.
+
+    The map holds the value of every qualifier by its qualifier id. Events
+    without qualifiers get an empty map, so they are not read from the
+    qualifiers table.
+
+    event_rows: List[dict]: The validated event rows, updated in place.
+    qualifier_rows: List[dict]: The validated qualifier rows of the events.
+
+    return: None
+    """
+    packed = defaultdict(dict)
+    for row in qualifier_rows:
+        packed[row["event_id"]][str(row["qualifier_id"])] = row["value"]
+    for row in event_rows:
+        row["qualifiers"] = packed.get(row["e_id"], {})
+
+
+def unpack_qualifiers(packed: dict) -> Dict[int, Optional[str]]:
+    """
+    Get the qualifier values by qualifier id from a packed map.
+
+    packed: dict: The map of an event row, keyed by the qualifier id strings.
+
+    return: Dict[int, Optional[str]]: The values by qualifier id.
+    """
+    return {int(qualifier_id): value for qualifier_id, value in packed.items()}
+
+
+def get_match_qualifiers(
+    session: Session, match_id: str
+) -> Dict[int, Dict[int, Optional[str]]]:
+    """
+    Get the qualifiers of the events of a match, in either layout.
+
+    Events stored with the compact layout are read from their map, and the
+    others from the qualifiers table.
+
+    session: Session: The database session.
+    match_id: str: The match id.
+
+    return: Dict[int, Dict[int, Optional[str]]]: The qualifier values by
+        qualifier id, by event id.
+    """
+    qualifiers = defaultdict(dict)
+    packed_query = select(Event.e_id, Event.qualifiers).where(
+        Event.match_id == match_id, Event.qualifiers.is_not(None)
+    )
+    for event_id, packed in session.execute(packed_query):
+        qualifiers[event_id].update(unpack_qualifiers(packed))
+
+    rows_query = (
+        select(Qualifier.event_id, Qualifier.qualifier_id, Qualifier.value)
+        .join(Event, Event.e_id == Qualifier.event_id)
+        .where(Event.match_id == match_id)
+    )
+    for event_id, qualifier_id, value in session.execute(rows_query):
+        qualifiers[event_id][qualifier_id] = value
+    return dict(qualifiers)
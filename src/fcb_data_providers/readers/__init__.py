@@ -0,0 +1,3 @@
+from .compression import open_feed_file
+from .decoders import load_feed
+from .streaming import JsonStreamReader, MatchFeed, read_feed
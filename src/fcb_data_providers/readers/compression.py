@@ -0,0 +1,72 @@
+import gzip
+import io
+from typing import IO
+
+# extensions of the feed formats: a JSON document, or a JSON Lines event stream.
+JSON_EXTENSIONS = (".json", ".jsonl")
+
+# extensions of the compressed feed files, after their format extension.
+COMPRESSION_EXTENSIONS = (".gz", ".zst")
+
+FEED_EXTENSIONS = tuple(
+    f"{extension}{compression}"
+    for extension in JSON_EXTENSIONS
+    for compression in ("",) + COMPRESSION_EXTENSIONS
+)
+
+
+def import_zstandard():
+    """Import zstandard, which is only needed for zstd compressed feeds."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "Reading .zst feeds needs zstandard, install it with "
+            "`pip install fcb_data_providers[zstd]`."
+        ) from e
+    return zstandard
+
+
+def strip_compression(file_path: str) -> str:
+    """Remove the compression extension of a file path, e.g. .json.gz to .json."""
+    for compression in COMPRESSION_EXTENSIONS:
+        if file_path.endswith(compression):
+            return file_path[: -len(compression)]
+    return file_path
+
+
+def is_json_lines(file_path: str) -> bool:
+    """Check if a feed file is a JSON Lines event stream, e.g. a .jsonl.gz file."""
+    return strip_compression(file_path).endswith(".jsonl")
+
+
+def open_feed_file(file_path: str, mode: str = "r") -> IO:
+    """
+    Open a feed file, compressing or decompressing .gz and .zst files while
+    they are written or read, without an uncompressed copy on disk or in
+    memory.
+
+    file_path: str: The file path.
+    mode: str: r or w for text, rb or wb for bytes.
+
+    return: IO: The file object.
+    """
+    if mode not in ("r", "w", "rb", "wb"):
+        raise ValueError(f"Unknown mode: {mode}, expected r, w, rb or wb")
+    binary = mode.endswith("b")
+    encoding = None if binary else "utf-8"
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, mode if binary else f"{mode}t", encoding=encoding)
+    if file_path.endswith(".zst"):
+        zstandard = import_zstandard()
+        raw = open(file_path, mode if binary else f"{mode}b")
+        try:
+            if mode.startswith("r"):
+                stream = zstandard.ZstdDecompressor().stream_reader(raw)
+            else:
+                stream = zstandard.ZstdCompressor().stream_writer(raw)
+        except BaseException:
+            raw.close()
+            raise
+        return stream if binary else io.TextIOWrapper(stream, encoding=encoding)
+    return open(file_path, mode, encoding=encoding)
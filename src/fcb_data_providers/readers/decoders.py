@@ -0,0 +1,148 @@
+import json
+import mmap
+import os
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple
+
+from fcb_data_providers.readers.compression import (COMPRESSION_EXTENSIONS,
+                                                    is_json_lines,
+                                                    open_feed_file)
+from fcb_data_providers.readers.streaming import MatchFeed, read_feed
+
+# the JSON decoders, fastest first, and the package which installs them.
+JSON_DECODERS = {
+    "orjson": "orjson",
+    "msgspec": "msgspec",
+    "json": None,
+}
+
+
+def _decode_stdlib(data) -> Any:
+    """Decode JSON with the json module, which needs bytes instead of a buffer."""
+    return json.loads(data if isinstance(data, (bytes, str)) else bytes(data))
+
+
+def import_json_decoder(name: str) -> Callable[[Any], Any]:
+    """
+    Import a JSON decoder of JSON_DECODERS.
+
+    name: str: The decoder name.
+
+    return: Callable: A function decoding JSON from bytes or a buffer.
+    """
+    if name not in JSON_DECODERS:
+        raise ValueError(
+            f"Unknown JSON decoder: {name}, expected auto or one of "
+            f"{tuple(JSON_DECODERS)}"
+        )
+    try:
+        if name == "orjson":
+            import orjson
+
+            return orjson.loads
+        if name == "msgspec":
+            import msgspec
+
+            return msgspec.json.Decoder().decode
+    except ImportError as e:
+        raise ImportError(
+            f"The {name} JSON decoder needs {JSON_DECODERS[name]}, install it with "
+            f"`pip install fcb_data_providers[{name}]`."
+        ) from e
+    return _decode_stdlib
+
+
+@lru_cache(maxsize=None)
+def get_available_json_decoders() -> Tuple[str, ...]:
+    """
+    Get the JSON decoders which are installed, fastest first.
+
+    return: Tuple[str, ...]: The decoder names.
+    """
+    available = []
+    for name in JSON_DECODERS:
+        try:
+            import_json_decoder(name)
+        except ImportError:
+            continue
+        available.append(name)
+    return tuple(available)
+
+
+def get_json_decoder(name: str = "auto") -> Callable[[Any], Any]:
+    """
+    Get a function decoding JSON from bytes or a buffer, e.g. a memory map.
+
+    name: str: The decoder name, auto for the fastest installed one: orjson,
+        msgspec, and then the json module.
+
+    return: Callable: The decode function.
+    """
+    if name == "auto":
+        name = get_available_json_decoders()[0]
+    return import_json_decoder(name)
+
+
+def is_mappable(file_path: str) -> bool:
+    """
+    Check if a feed file is decoded at once from a memory map by load_feed, or
+    streamed, as it is compressed or a JSON Lines file.
+
+    file_path: str: The file path.
+
+    return: bool: True for uncompressed JSON files.
+    """
+    return not (is_json_lines(file_path) or file_path.endswith(COMPRESSION_EXTENSIONS))
+
+
+def _decode_mapped(file_path: str, decode: Callable[[Any], Any]) -> Any:
+    """Decode an uncompressed JSON file from a memory map of the file."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # an empty file can not be mapped, and is invalid JSON anyway.
+            return decode(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return decode(view)
+
+
+def load_feed(
+    file_path: str, decoder: str = "auto", stream_key: Optional[str] = "event"
+) -> MatchFeed:
+    """
+    Read a feed file into a MatchFeed with a JSON decoder.
+
+    Uncompressed JSON files are memory-mapped and decoded at once from the
+    mapped bytes, without reading them into a string first. Compressed and
+    JSON Lines files are read with read_feed instead, and their stream_key
+    list is streamed, so they are never held in memory decompressed. The lines
+    of JSON Lines files are decoded with the decoder.
+
+    file_path: str: The file path.
+    decoder: str: The JSON decoder, see get_json_decoder.
+    stream_key: str: The liveData list streamed from compressed and JSON Lines
+        files, None to read everything.
+
+    return: MatchFeed: The feed.
+    """
+    decode = get_json_decoder(decoder)
+    if not is_mappable(file_path):
+        return read_feed(file_path, stream_key=stream_key, decode=decode)
+    feed = _decode_mapped(file_path, decode)
+    return MatchFeed(feed.get("matchInfo") or {}, feed.get("liveData") or {})
+
+
+def load_json_feed(file_path: str, decoder: str = "auto") -> dict:
+    """
+    Decode a whole feed file, with its matchInfo and liveData sections, see
+    load_feed.
+
+    file_path: str: The file path.
+    decoder: str: The JSON decoder, see get_json_decoder.
+
+    return: dict: The feed.
+    """
+    if is_mappable(file_path):
+        return _decode_mapped(file_path, get_json_decoder(decoder))
+    feed = load_feed(file_path, decoder, stream_key=None)
+    return {"matchInfo": feed.match_info, "liveData": feed.live_data}
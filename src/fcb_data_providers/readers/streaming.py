@@ -0,0 +1,362 @@
+import json
+import math
+from typing import (IO, TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator,
+                    List, Optional)
+
+from fcb_data_providers.readers.compression import (is_json_lines,
+                                                    open_feed_file)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = " \t\n\r"
+
+# characters which continue a number which was decoded short, e.g. from "12.".
+NUMBER_CONTINUATIONS = ".eE+-"
+
+# the liveData list held one item per line by JSON Lines feeds.
+JSON_LINES_KEY = "event"
+
+
+class JsonStreamReader:
+    """
+    Walk a JSON document incrementally from a text file object.
+
+    Containers can be entered one level at a time with ``iter_object`` and
+    ``iter_array``, while every value which is not entered is decoded as a
+    whole with ``read_value``. Only the current value and one chunk of the
+    file are held in memory.
+    """
+
+    def __init__(self, file_obj: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.file_obj = file_obj
+        self.chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read the next chunk into the buffer, return False at the end of the file."""
+        if self._eof:
+            return False
+        # grow the read size with the pending value, so decoding a large value
+        # which is retried after every read stays linear.
+        pending = len(self._buffer) - self._pos
+        chunk = self.file_obj.read(max(self.chunk_size, pending))
+        if not chunk:
+            self._eof = True
+            return False
+        pos = self._pos
+        self._buffer = self._buffer[pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Get the next non whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume the next non whitespace character, which must be ``char``."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found!r}")
+        self._pos += 1
+
+    def _is_cut_number(self, value, end: int) -> bool:
+        """Check if a decoded value may be a number cut at the end of the buffer."""
+        if end == len(self._buffer):
+            return True
+        return (
+            isinstance(value, (int, float))
+            and not isinstance(value, bool)
+            and self._buffer[end] in NUMBER_CONTINUATIONS
+        )
+
+    def read_value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number at the end of the buffer may continue in the next chunk,
+            # also when it was cut right after its fraction or exponent sign.
+            if self._is_cut_number(value, end) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _iter_container(self, open_char: str, close_char: str) -> Iterator[None]:
+        self.expect(open_char)
+        if self.peek() == close_char:
+            self._pos += 1
+            return
+        while True:
+            yield
+            separator = self.peek()
+            self._pos += 1
+            if separator == close_char:
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or {close_char!r}, found {separator!r}")
+
+    def iter_object(self) -> Iterator[str]:
+        """
+        Enter an object and yield its keys.
+
+        The caller must consume the value of every yielded key, with
+        ``read_value`` or by entering it, before asking for the next key.
+        """
+        for _ in self._iter_container("{", "}"):
+            key = self.read_value()
+            self.expect(":")
+            yield key
+
+    def iter_array(self) -> Iterator[None]:
+        """
+        Enter an array and yield once per element.
+
+        The caller must consume every element before asking for the next one.
+        """
+        return self._iter_container("[", "]")
+
+
+def is_missing(value) -> bool:
+    """Check if a value is the NaN pandas uses for keys missing in a section."""
+    return isinstance(value, float) and math.isnan(value)
+
+
+class MatchFeed:
+    """
+    A StatsPerform feed file, split into its matchInfo and liveData sections.
+
+    Lists of liveData can be streamed: they are then read lazily from the
+    file, and can only be iterated once through ``iter_batches``. Rows which
+    are already prepared for storing, e.g. validated in another thread, can be
+    kept in ``prepared`` by liveData key, as a list or as an iterator which
+    prepares them while they are read.
+    """
+
+    def __init__(
+        self,
+        match_info: dict,
+        live_data: dict,
+        streams: Optional[Dict[str, Iterator[dict]]] = None,
+    ):
+        self.match_info = match_info
+        self.live_data = live_data
+        self._streams = streams or {}
+        self.prepared: Dict[str, Iterable] = {}
+
+    @classmethod
+    def from_dataframe(cls, dataframe: "pd.DataFrame") -> "MatchFeed":
+        """
+        Create a feed from the dataframe of ``pd.read_json``.
+
+        dataframe: pd.DataFrame: The feed dataframe.
+
+        return: MatchFeed: The feed.
+        """
+        sections = {
+            column: {
+                key: value
+                for key, value in dataframe[column].items()
+                if not is_missing(value)
+            }
+            for column in ("matchInfo", "liveData")
+            if column in dataframe
+        }
+        return cls(sections.get("matchInfo", {}), sections.get("liveData", {}))
+
+    def load(self) -> "MatchFeed":
+        """
+        Read the streamed lists into liveData, e.g. to parse a whole file in
+        a worker thread.
+
+        return: MatchFeed: The feed itself.
+        """
+        for key, stream in self._streams.items():
+            self.live_data[key] = list(stream)
+        self._streams.clear()
+        return self
+
+    def close(self) -> None:
+        """
+        Close the streams and the prepared iterators which were not iterated,
+        and with them the file.
+
+        return: None
+        """
+        for stream in self._streams.values():
+            stream.close()
+        self._streams.clear()
+        for prepared in self.prepared.values():
+            if hasattr(prepared, "close"):
+                prepared.close()
+        self.prepared.clear()
+
+    def iter_batches(self, key: str, batch_size: int) -> Iterator[List[dict]]:
+        """
+        Yield the items of a liveData list in batches.
+
+        key: str: The liveData key, e.g. event.
+        batch_size: int: The maximum number of items per batch.
+
+        return: Iterator[List[dict]]: The batches.
+        """
+        # a stream stays in the feed until it is exhausted, so close() can
+        # still close its file while the batches are read.
+        items = self._streams.get(key)
+        if items is None:
+            items = iter(self.live_data.get(key) or [])
+
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        self._streams.pop(key, None)
+        if batch:
+            yield batch
+
+
+def _stream_array(
+    reader: JsonStreamReader,
+    keys: Iterator[str],
+    live_data: dict,
+    file_obj: Optional[IO] = None,
+) -> Iterator[dict]:
+    """
+    Yield the elements of the current array, then read the rest of liveData.
+
+    The file is closed once the stream is exhausted, when it is given.
+    """
+    try:
+        for _ in reader.iter_array():
+            yield reader.read_value()
+        for key in keys:
+            live_data[key] = reader.read_value()
+    finally:
+        if file_obj is not None:
+            file_obj.close()
+
+
+def _stream_lines(
+    file_obj: IO[str], items: List[dict], decode: Callable[[Any], Any]
+) -> Iterator[dict]:
+    """
+    Yield the items, then the JSON value of every non empty line of the file.
+
+    The file is closed once the stream is exhausted.
+    """
+    try:
+        yield from items
+        for line in file_obj:
+            if line.strip():
+                yield decode(line)
+    finally:
+        file_obj.close()
+
+
+def _read_json_feed(
+    file_obj: IO[str],
+    stream_key: Optional[str],
+    required_keys: tuple,
+    chunk_size: int,
+) -> MatchFeed:
+    """Read a JSON feed document, see read_feed."""
+    reader = JsonStreamReader(file_obj, chunk_size=chunk_size)
+    match_info, live_data, streams = {}, {}, {}
+    for section in reader.iter_object():
+        if section != "liveData":
+            value = reader.read_value()
+            if section == "matchInfo":
+                match_info = value
+            continue
+        keys = reader.iter_object()
+        for key in keys:
+            if key != stream_key:
+                live_data[key] = reader.read_value()
+                continue
+            if match_info and all(required in live_data for required in required_keys):
+                # the stream owns the file from here on.
+                streams[key] = _stream_array(reader, keys, live_data, file_obj)
+                return MatchFeed(match_info, live_data, streams)
+            live_data[key] = list(_stream_array(reader, keys, live_data))
+    return MatchFeed(match_info, live_data, streams)
+
+
+def _read_json_lines_feed(
+    file_obj: IO[str], stream_key: Optional[str], decode: Callable[[Any], Any]
+) -> MatchFeed:
+    """Read a JSON Lines event stream, see read_feed."""
+    header = {}
+    for line in file_obj:
+        if line.strip():
+            header = decode(line)
+            break
+    match_info = header.get("matchInfo") or {}
+    live_data = header.get("liveData") or {}
+    events = _stream_lines(file_obj, live_data.pop(JSON_LINES_KEY, None) or [], decode)
+    if stream_key == JSON_LINES_KEY:
+        # the stream owns the file from here on.
+        return MatchFeed(match_info, live_data, {JSON_LINES_KEY: events})
+    live_data[JSON_LINES_KEY] = list(events)
+    return MatchFeed(match_info, live_data)
+
+
+def read_feed(
+    file_path: str,
+    stream_key: Optional[str] = "event",
+    required_keys: tuple = ("matchDetails",),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    decode: Callable[[Any], Any] = json.loads,
+) -> MatchFeed:
+    """
+    Read a feed file, streaming one of its liveData lists.
+
+    matchInfo and the other liveData sections are decoded as a whole, while the
+    ``stream_key`` list is left in the file and read element by element while
+    the feed is iterated. If the list comes before one of the ``required_keys``
+    or matchInfo in the file, it is read into memory instead, so those sections
+    are available before the list is processed.
+
+    JSON Lines files, e.g. match_event_<id>.jsonl, hold the feed without its
+    events on their first line, and one event per line after it. Every line is
+    decoded with ``decode``, e.g. the decoder of get_json_decoder. Files
+    compressed with gzip or zstd, e.g. match_event_<id>.json.gz, are
+    decompressed while they are read.
+
+    file_path: str: The file path to the JSON or JSON Lines file.
+    stream_key: str: The liveData list to stream, None to read everything.
+    required_keys: tuple: liveData keys needed before the stream is processed.
+    chunk_size: int: The number of characters read from the file at once.
+    decode: Callable: Decodes a line of a JSON Lines file.
+
+    return: MatchFeed: The feed.
+    """
+    file_obj = open_feed_file(file_path)
+    try:
+        if is_json_lines(file_path):
+            feed = _read_json_lines_feed(file_obj, stream_key, decode)
+        else:
+            feed = _read_json_feed(file_obj, stream_key, required_keys, chunk_size)
+    except BaseException:
+        file_obj.close()
+        raise
+    if not feed._streams:
+        file_obj.close()
+    return feed
@@ -0,0 +1,5 @@
+from fcb_data_providers.lazy import lazy_exports
+
+__all__ = ["EventRepository"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {"EventRepository": ".events"})
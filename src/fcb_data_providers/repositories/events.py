@@ -0,0 +1,276 @@
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+from sqlalchemy import select
+
+from fcb_data_providers.database import Database
+from fcb_data_providers.database_models import Event, Qualifier
+from fcb_data_providers.qualifiers import unpack_qualifiers
+from fcb_data_providers.sinks.parquet import import_pyarrow
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# maximum number of event ids looked up with a single IN query.
+LOOKUP_BATCH_SIZE = 500
+
+# event columns returned by the repository.
+EVENT_COLUMNS = (
+    "e_id",
+    "event_id",
+    "type_id",
+    "period_id",
+    "time_min",
+    "time_sec",
+    "x",
+    "y",
+    "outcome",
+    "timestamp",
+    "last_modified",
+    "match_id",
+    "team_id",
+    "player_id",
+)
+
+QUALIFIER_MODES = (None, "join", "pivot")
+OUTPUT_FORMATS = ("pandas", "arrow")
+
+
+class EventRepository:
+    """
+    Read the stored events in chunks.
+
+    Events are streamed from a server-side cursor and returned chunk by chunk,
+    so reading a whole season only keeps one chunk in memory. The qualifiers of
+    every chunk are read in either layout, and can be joined as one row per
+    qualifier or pivoted into one column per qualifier id.
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+
+    def build_events_query(
+        self,
+        match_ids: Optional[List[str]] = None,
+        type_ids: Optional[List[int]] = None,
+        player_ids: Optional[List[str]] = None,
+        with_qualifiers: bool = False,
+    ):
+        """
+        Build the query of the filtered events, in match order.
+
+        match_ids: List[str]: Only the events of these matches.
+        type_ids: List[int]: Only the events of these types.
+        player_ids: List[str]: Only the events of these players.
+        with_qualifiers: bool: Also select the compact qualifiers column.
+
+        return: Select: The query.
+        """
+        columns = [Event.__table__.c[name] for name in EVENT_COLUMNS]
+        if with_qualifiers:
+            columns.append(Event.qualifiers)
+        query = self.filter_events(select(*columns), match_ids, type_ids, player_ids)
+        return query.order_by(
+            Event.match_id, Event.period_id, Event.time_min, Event.time_sec, Event.id
+        )
+
+    @staticmethod
+    def filter_events(
+        query,
+        match_ids: Optional[List[str]] = None,
+        type_ids: Optional[List[int]] = None,
+        player_ids: Optional[List[str]] = None,
+    ):
+        """
+        Filter a query of the events.
+
+        query: Select: The query, selecting from the events table.
+        match_ids: List[str]: Only the events of these matches.
+        type_ids: List[int]: Only the events of these types.
+        player_ids: List[str]: Only the events of these players.
+
+        return: Select: The filtered query.
+        """
+        if match_ids is not None:
+            query = query.where(Event.match_id.in_(match_ids))
+        if type_ids is not None:
+            query = query.where(Event.type_id.in_(type_ids))
+        if player_ids is not None:
+            query = query.where(Event.player_id.in_(player_ids))
+        return query
+
+    def get_qualifier_ids(
+        self,
+        connection,
+        match_ids: Optional[List[str]] = None,
+        type_ids: Optional[List[int]] = None,
+        player_ids: Optional[List[str]] = None,
+    ) -> List[int]:
+        """
+        Get the qualifier ids of the filtered events, in either layout.
+
+        The pivoted chunks all have one column per qualifier id of the filtered
+        events, so their columns do not depend on the events of the chunk.
+
+        connection: Connection: The database connection.
+        match_ids: List[str]: Only the events of these matches.
+        type_ids: List[int]: Only the events of these types.
+        player_ids: List[str]: Only the events of these players.
+
+        return: List[int]: The sorted qualifier ids.
+        """
+        rows_query = self.filter_events(
+            select(Qualifier.qualifier_id)
+            .distinct()
+            .join(Event, Event.e_id == Qualifier.event_id),
+            match_ids,
+            type_ids,
+            player_ids,
+        )
+        qualifier_ids = set(connection.execute(rows_query).scalars())
+
+        packed_query = self.filter_events(
+            select(Event.qualifiers).where(Event.qualifiers.is_not(None)),
+            match_ids,
+            type_ids,
+            player_ids,
+        )
+        result = connection.execution_options(
+            stream_results=True, yield_per=DEFAULT_CHUNK_SIZE
+        ).execute(packed_query)
+        for packed in result.scalars():
+            qualifier_ids.update(unpack_qualifiers(packed))
+        return sorted(qualifier_ids)
+
+    def get_qualifiers(
+        self, connection, rows: List[dict]
+    ) -> Dict[int, Dict[int, Optional[str]]]:
+        """
+        Get the qualifiers of a chunk of events, in either layout.
+
+        connection: Connection: The database connection.
+        rows: List[dict]: The event rows, with their compact qualifiers column.
+
+        return: Dict[int, Dict[int, Optional[str]]]: The qualifier values by
+            qualifier id, by event id.
+        """
+        qualifiers = defaultdict(dict)
+        event_ids = []
+        for row in rows:
+            packed = row.pop("qualifiers")
+            if packed is None:
+                event_ids.append(row["e_id"])
+            else:
+                qualifiers[row["e_id"]].update(unpack_qualifiers(packed))
+
+        for start in range(0, len(event_ids), LOOKUP_BATCH_SIZE):
+            end = start + LOOKUP_BATCH_SIZE
+            batch = event_ids[start:end]
+            query = select(
+                Qualifier.event_id, Qualifier.qualifier_id, Qualifier.value
+            ).where(Qualifier.event_id.in_(batch))
+            for event_id, qualifier_id, value in connection.execute(query):
+                qualifiers[event_id][qualifier_id] = value
+        return qualifiers
+
+    def build_chunk(
+        self,
+        connection,
+        rows: List[dict],
+        qualifiers: Optional[str],
+        qualifier_ids: Optional[List[int]] = None,
+    ):
+        """
+        Build the dataframe of a chunk of events.
+
+        connection: Connection: The database connection.
+        rows: List[dict]: The event rows.
+        qualifiers: str: None, join or pivot.
+        qualifier_ids: List[int]: The qualifier ids of the pivoted columns.
+
+        return: pd.DataFrame: The events.
+        """
+        if qualifiers is None:
+            return pd.DataFrame(rows, columns=list(EVENT_COLUMNS))
+
+        event_qualifiers = self.get_qualifiers(connection, rows)
+        if qualifiers == "pivot":
+            for row in rows:
+                for qualifier_id, value in event_qualifiers[row["e_id"]].items():
+                    row[f"qualifier_{qualifier_id}"] = value
+            columns = [f"qualifier_{qualifier_id}" for qualifier_id in qualifier_ids]
+            return pd.DataFrame(rows).reindex(columns=list(EVENT_COLUMNS) + columns)
+
+        joined_rows = []
+        for row in rows:
+            values = event_qualifiers[row["e_id"]]
+            if not values:
+                joined_rows.append({**row, "qualifier_id": None, "value": None})
+            for qualifier_id, value in values.items():
+                joined_rows.append(
+                    {**row, "qualifier_id": qualifier_id, "value": value}
+                )
+        return pd.DataFrame(
+            joined_rows, columns=list(EVENT_COLUMNS) + ["qualifier_id", "value"]
+        )
+
+    def iter_events(
+        self,
+        match_ids: Optional[List[str]] = None,
+        type_ids: Optional[List[int]] = None,
+        player_ids: Optional[List[str]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        qualifiers: Optional[str] = None,
+        output: str = "pandas",
+    ) -> Iterator:
+        """
+        Read the filtered events in chunks of at most chunk_size events.
+
+        With qualifiers="join" every chunk has one row per qualifier, with its
+        qualifier_id and value, and events without qualifiers once. With
+        qualifiers="pivot" it has one row per event, and one qualifier_<id>
+        column per qualifier id of the filtered events, the same in every
+        chunk.
+
+        match_ids: List[str]: Only the events of these matches.
+        type_ids: List[int]: Only the events of these types.
+        player_ids: List[str]: Only the events of these players.
+        chunk_size: int: The number of events per chunk.
+        qualifiers: str: None, join or pivot.
+        output: str: pandas for DataFrame chunks, arrow for pyarrow Tables.
+
+        return: Iterator: The DataFrame or Table chunks.
+        """
+        if qualifiers not in QUALIFIER_MODES:
+            raise ValueError(
+                f"Unknown qualifiers mode: {qualifiers}, expected one of "
+                f"{QUALIFIER_MODES}"
+            )
+        if output not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown output format: {output}, expected one of {OUTPUT_FORMATS}"
+            )
+        pa = import_pyarrow()[0] if output == "arrow" else None
+
+        query = self.build_events_query(
+            match_ids, type_ids, player_ids, with_qualifiers=qualifiers is not None
+        )
+        with self.database.engine.connect() as connection:
+            qualifier_ids = None
+            if qualifiers == "pivot":
+                qualifier_ids = self.get_qualifier_ids(
+                    connection, match_ids, type_ids, player_ids
+                )
+            result = connection.execution_options(
+                stream_results=True, yield_per=chunk_size
+            ).execute(query)
+            for partition in result.mappings().partitions():
+                chunk = self.build_chunk(
+                    connection,
+                    [dict(row) for row in partition],
+                    qualifiers,
+                    qualifier_ids,
+                )
+                if pa is not None:
+                    chunk = pa.Table.from_pandas(chunk, preserve_index=False)
+                yield chunk
@@ -0,0 +1,312 @@
+import glob
+import os
+import shutil
+import uuid
+from collections import defaultdict
+from logging import Logger
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import (JSON, BigInteger, Boolean, DateTime, Float, Integer,
+                        String)
+
+# partition columns, encoded in the directory names of every dataset.
+PARTITION_COLUMNS = ("season", "match_id")
+
+# audit columns of every table, set by the database and not written to parquet.
+AUDIT_COLUMNS = ("created_at", "updated_at")
+
+
+def import_pyarrow():
+    """Import pyarrow, which is only needed for the parquet sink."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "The parquet sink needs pyarrow, install it with "
+            "`pip install fcb_data_providers[parquet]`."
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+def get_arrow_type(column):
+    """
+    Get the arrow type of a database model column.
+
+    column: Column: The SQLAlchemy column.
+
+    return: pyarrow.DataType: The arrow type.
+    """
+    pa, _ = import_pyarrow()
+    column_type = column.type
+    if isinstance(column_type, BigInteger):
+        return pa.int64()
+    if isinstance(column_type, Integer):
+        return pa.int32()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column_type, String):
+        return pa.string()
+    if isinstance(column_type, JSON):
+        # the packed qualifiers of an event, values by qualifier id.
+        return pa.map_(pa.string(), pa.string())
+    raise TypeError(f"No arrow type for column {column.name}: {column_type}")
+
+
+def get_dataset_columns(model) -> list:
+    """
+    Get the columns of a database model which are written to its dataset.
+
+    The partition columns, the audit columns and the surrogate keys generated
+    by the database are left out.
+
+    model: BaseModel: The database model class.
+
+    return: list: The SQLAlchemy columns.
+    """
+    return [
+        column
+        for column in model.__table__.columns
+        if column.name not in PARTITION_COLUMNS + AUDIT_COLUMNS
+        and not (column.primary_key and column.autoincrement is True)
+    ]
+
+
+def get_season_partition(season: Optional[str]) -> str:
+    """Get a season value which is safe to use in a directory name."""
+    if not season:
+        return "unknown"
+    return str(season).replace("/", "-")
+
+
+class ParquetSink:
+    """
+    Write the rows of a match into partitioned parquet datasets.
+
+    Rows are buffered per dataset while a match is stored, written into
+    temporary files with ``prepare`` before the database commit, and renamed
+    into ``<root>/<dataset>/season=<season>/match_id=<id>/`` with ``commit``
+    once the database commit succeeded, so a failed match leaves no files. Every
+    dataset is typed from its database model, and its strings are dictionary
+    encoded. A re-ingested match replaces its earlier files, also in another
+    season, and datasets cleared with ``clear`` lose their files of the match
+    even when no rows are written.
+    """
+
+    def __init__(self, root_path: str, logger: Logger, datasets: Dict[type, str]):
+        self.pa, self.pq = import_pyarrow()
+        self.root_path = root_path
+        self.logger = logger
+        self.datasets = datasets
+        self._schemas = {}
+        self._rows: Dict[type, List[dict]] = defaultdict(list)
+        self._cleared: Set[type] = set()
+        # temporary and final file paths of the prepared datasets.
+        self._staged: Dict[type, tuple] = {}
+        self._match_id = None
+        self._season = None
+
+    def begin_match(self, match_id: str, season: Optional[str] = None) -> None:
+        """
+        Start buffering the rows of a match.
+
+        match_id: str: The match id.
+        season: str: The season of the match, e.g. 2023/2024.
+
+        return: None
+        """
+        self._rows.clear()
+        self._cleared.clear()
+        self._staged.clear()
+        self._match_id = match_id
+        self._season = season
+
+    def accepts(self, model) -> bool:
+        """Check if rows of the model are written by this sink."""
+        return model in self.datasets
+
+    def clear(self, model) -> None:
+        """
+        Replace the files of a dataset for the current match when it is
+        committed, also when none of its rows are written, e.g. when the file
+        of a dataset is re-ingested.
+
+        model: BaseModel: The database model class of the dataset.
+
+        return: None
+        """
+        self._cleared.add(model)
+
+    def add(self, model, row: dict) -> None:
+        """
+        Buffer one validated row.
+
+        model: BaseModel: The database model class of the row.
+        row: dict: The validated row data.
+
+        return: None
+        """
+        self._rows[model].append(row)
+
+    def add_many(self, model, rows: List[dict]) -> None:
+        """
+        Buffer many validated rows.
+
+        model: BaseModel: The database model class of the rows.
+        rows: List[dict]: The validated rows data.
+
+        return: None
+        """
+        self._rows[model].extend(rows)
+
+    def savepoint(self) -> Dict[type, int]:
+        """
+        Get the number of buffered rows per dataset, to roll back to.
+
+        return: Dict[type, int]: The savepoint.
+        """
+        return {model: len(rows) for model, rows in self._rows.items()}
+
+    def rollback_to(self, savepoint: Dict[type, int]) -> None:
+        """
+        Drop the rows buffered since a savepoint, e.g. of a failing section.
+
+        savepoint: Dict[type, int]: The savepoint.
+
+        return: None
+        """
+        for model, rows in self._rows.items():
+            start = savepoint.get(model, 0)
+            del rows[start:]
+
+    def get_schema(self, model):
+        """
+        Get the arrow schema of a dataset from the columns of its database
+        model, see get_dataset_columns.
+
+        model: BaseModel: The database model class.
+
+        return: pyarrow.Schema: The schema, without the partition columns.
+        """
+        if model not in self._schemas:
+            self._schemas[model] = self.pa.schema(
+                [
+                    (column.name, get_arrow_type(column))
+                    for column in get_dataset_columns(model)
+                ]
+            )
+        return self._schemas[model]
+
+    def get_partition_path(self, model) -> str:
+        """Get the partition directory of a dataset for the current match."""
+        return os.path.join(
+            self.root_path,
+            self.datasets[model],
+            f"season={get_season_partition(self._season)}",
+            f"match_id={self._match_id}",
+        )
+
+    def remove_partitions(self, model, keep: Optional[str] = None) -> None:
+        """
+        Delete the partitions of a dataset for the current match, in every
+        season.
+
+        model: BaseModel: The database model class.
+        keep: str: A partition directory which is kept, e.g. the one just written.
+
+        return: None
+        """
+        pattern = os.path.join(
+            glob.escape(os.path.join(self.root_path, self.datasets[model])),
+            "season=*",
+            glob.escape(f"match_id={self._match_id}"),
+        )
+        for partition_path in glob.glob(pattern):
+            if partition_path != keep:
+                shutil.rmtree(partition_path)
+
+    def write_rows(self, model, rows: List[dict]) -> tuple:
+        """
+        Write the rows of a dataset into a temporary file in the partition of
+        the current match. The file is renamed by commit, so readers never see
+        a partial file.
+
+        model: BaseModel: The database model class.
+        rows: List[dict]: The validated rows.
+
+        return: tuple: The temporary file path, and the file path it is
+            renamed to.
+        """
+        schema = self.get_schema(model)
+        columns = {name: [row.get(name) for row in rows] for name in schema.names}
+        table = self.pa.Table.from_pydict(columns, schema=schema)
+
+        partition_path = self.get_partition_path(model)
+        os.makedirs(partition_path, exist_ok=True)
+        file_path = os.path.join(partition_path, "part-0.parquet")
+        temp_path = os.path.join(partition_path, f".{uuid.uuid4().hex}.tmp")
+        self._staged[model] = (temp_path, file_path)
+        self.pq.write_table(table, temp_path, use_dictionary=True)
+        return temp_path, file_path
+
+    def prepare(self) -> None:
+        """
+        Write the buffered rows of the current match into temporary files,
+        e.g. right before the database commit, so that a row which can not be
+        written still fails the match.
+
+        return: None
+        """
+        for model in self.datasets:
+            rows = self._rows.get(model)
+            if rows and model not in self._staged:
+                self.write_rows(model, rows)
+
+    def commit(self) -> None:
+        """
+        Rename the prepared files of the current match into place, e.g. once
+        the database commit succeeded, and delete its earlier partitions of the
+        written and cleared datasets. The rows are prepared first when they
+        were not yet.
+
+        return: None
+        """
+        self.prepare()
+        for model in self.datasets:
+            staged = self._staged.pop(model, None)
+            if staged is not None:
+                temp_path, file_path = staged
+                os.replace(temp_path, file_path)
+                self.remove_partitions(model, keep=os.path.dirname(file_path))
+                self.logger.debug(
+                    "Wrote %s rows into parquet dataset %s for match id: %s",
+                    len(self._rows[model]),
+                    self.datasets[model],
+                    self._match_id,
+                )
+            elif model in self._cleared:
+                self.remove_partitions(model)
+        self._rows.clear()
+        self._cleared.clear()
+
+    def rollback(self) -> None:
+        """
+        Drop the buffered rows and the prepared files of the current match.
+
+        return: None
+        """
+        for temp_path, _ in self._staged.values():
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            try:
+                # the partition directory of a new match is left empty.
+                os.rmdir(os.path.dirname(temp_path))
+            except OSError:
+                pass
+        self._staged.clear()
+        self._rows.clear()
+        self._cleared.clear()
@@ -0,0 +1,373 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fcb_data_providers.readers.compression import (is_json_lines,
+                                                    open_feed_file)
+
+# event types with their relative frequency in a match, passes dominate.
+EVENT_TYPES = {1: 50, 3: 3, 4: 4, 5: 6, 6: 2, 7: 3, 8: 3, 12: 5, 13: 1, 15: 1, 49: 8}
+
+QUALIFIER_IDS = [1, 2, 3, 5, 6, 15, 22, 56, 102, 103, 140, 141, 212, 213, 233, 279]
+QUALIFIER_VALUES = ["Back", "Left", "Right", "Center", "12.3", "45.1", "1", None]
+
+POSITIONS = ["Goalkeeper", "Defender", "Midfielder", "Striker", "Substitute"]
+
+# the event ids of every match, so that they are unique across matches.
+EVENT_IDS_PER_MATCH = 10_000_000
+
+KICK_OFF = datetime(2023, 10, 1, 15, 0, tzinfo=timezone.utc)
+
+
+def format_time(value: datetime) -> str:
+    """Format a time as in the feeds, e.g. 2023-10-01T15:00:00.000Z."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+def generate_match_info(match_id: str, teams: List[str]) -> dict:
+    """
+    Generate the matchInfo section of a feed.
+
+    match_id: str: The match id.
+    teams: List[str]: The home and away team ids.
+
+    return: dict: The matchInfo section.
+    """
+    return {
+        "id": match_id,
+        "localDate": KICK_OFF.strftime("%Y-%m-%d"),
+        "tournamentCalendar": {"id": "calendar_1", "name": "2023/2024"},
+        "contestant": [
+            {
+                "id": team_id,
+                "name": f"Team {team_id}",
+                "shortName": team_id[:3].upper(),
+                "officialName": f"FC Team {team_id}",
+                "code": team_id[:3].upper(),
+                "position": position,
+            }
+            for team_id, position in zip(teams, ("home", "away"))
+        ],
+    }
+
+
+def generate_match_details(rng: random.Random) -> dict:
+    """
+    Generate the liveData.matchDetails section of a feed.
+
+    rng: random.Random: The random generator.
+
+    return: dict: The matchDetails section.
+    """
+    home_goals, away_goals = rng.randint(0, 4), rng.randint(0, 4)
+    second_half = KICK_OFF + timedelta(minutes=62)
+    return {
+        "matchStatus": "Played",
+        "winner": "home" if home_goals > away_goals else "away",
+        "matchLengthMin": 94,
+        "matchLengthSec": rng.randint(0, 59),
+        "period": [
+            {
+                "id": 1,
+                "start": format_time(KICK_OFF),
+                "end": format_time(KICK_OFF + timedelta(minutes=47)),
+                "lengthMin": 47,
+                "lengthSec": 0,
+            },
+            {
+                "id": 2,
+                "start": format_time(second_half),
+                "end": format_time(second_half + timedelta(minutes=48)),
+                "lengthMin": 48,
+                "lengthSec": 0,
+            },
+        ],
+        "scores": {
+            "ht": {"home": min(home_goals, 1), "away": min(away_goals, 1)},
+            "ft": {"home": home_goals, "away": away_goals},
+            "total": {"home": home_goals, "away": away_goals},
+        },
+    }
+
+
+def generate_events(
+    rng: random.Random,
+    teams: List[str],
+    events: int,
+    qualifiers_per_event: int,
+    players_per_team: int,
+    first_event_id: int,
+) -> List[dict]:
+    """
+    Generate the liveData.event list of a feed, in match order.
+
+    rng: random.Random: The random generator.
+    teams: List[str]: The home and away team ids.
+    events: int: The number of events.
+    qualifiers_per_event: int: The average number of qualifiers per event.
+    players_per_team: int: The number of players of every team.
+    first_event_id: int: The id of the first event.
+
+    return: List[dict]: The events.
+    """
+    type_ids, weights = list(EVENT_TYPES), list(EVENT_TYPES.values())
+    generated = []
+    for index in range(events):
+        period_id = 1 if index < events // 2 else 2
+        seconds = int(index / max(events, 1) * 94 * 60)
+        team = rng.randrange(2)
+        timestamp = KICK_OFF + timedelta(
+            seconds=seconds, milliseconds=rng.randint(0, 999)
+        )
+        qualifier_count = rng.randint(0, 2 * qualifiers_per_event)
+        qualifier_ids = rng.sample(
+            QUALIFIER_IDS, min(qualifier_count, len(QUALIFIER_IDS))
+        )
+        event_id = first_event_id + index
+        generated.append(
+            {
+                "id": event_id,
+                "eventId": index + 1,
+                "typeId": rng.choices(type_ids, weights)[0],
+                "periodId": period_id,
+                "timeMin": seconds // 60,
+                "timeSec": seconds % 60,
+                "contestantId": teams[team],
+                "playerId": f"{teams[team]}_player_{rng.randint(1, players_per_team)}",
+                "playerName": "F. Player",
+                "outcome": rng.randint(0, 1),
+                "x": round(rng.uniform(0, 100), 1),
+                "y": round(rng.uniform(0, 100), 1),
+                "timeStamp": format_time(timestamp),
+                "timestamp": format_time(timestamp),
+                "lastModified": format_time(timestamp + timedelta(seconds=5)),
+                "qualifier": [
+                    {
+                        "id": event_id * 100 + number,
+                        "qualifierId": qualifier_id,
+                        "value": rng.choice(QUALIFIER_VALUES),
+                    }
+                    for number, qualifier_id in enumerate(qualifier_ids)
+                ],
+            }
+        )
+    return generated
+
+
+def generate_lineups(
+    rng: random.Random, teams: List[str], players_per_team: int
+) -> List[dict]:
+    """
+    Generate the liveData.lineUp list of a feed.
+
+    rng: random.Random: The random generator.
+    teams: List[str]: The home and away team ids.
+    players_per_team: int: The number of players of every team.
+
+    return: List[dict]: The lineups.
+    """
+    return [
+        {
+            "contestantId": team_id,
+            "formationUsed": "4231",
+            "player": [
+                {
+                    "playerId": f"{team_id}_player_{number}",
+                    "firstName": f"First {number}",
+                    "lastName": f"Last {number}",
+                    "shortFirstName": f"F{number}",
+                    "shortLastName": f"L{number}",
+                    "matchName": f"F. Last {number}",
+                    "shirtNumber": number,
+                    "position": POSITIONS[min(number // 4, len(POSITIONS) - 1)],
+                    "positionSide": rng.choice(["Left", "Centre", "Right"]),
+                    "formationPlace": str(number) if number <= 11 else "0",
+                    "captain": "yes" if number == 1 else None,
+                }
+                for number in range(1, players_per_team + 1)
+            ],
+        }
+        for team_id in teams
+    ]
+
+
+def generate_incidents(
+    rng: random.Random, teams: List[str], players_per_team: int, kind: str, count: int
+) -> List[dict]:
+    """
+    Generate the liveData.goal or liveData.card list of a feed.
+
+    rng: random.Random: The random generator.
+    teams: List[str]: The home and away team ids.
+    players_per_team: int: The number of players of every team.
+    kind: str: goal or card.
+    count: int: The number of goals or cards.
+
+    return: List[dict]: The goals or cards.
+    """
+    incidents = []
+    for index in range(count):
+        team_id = rng.choice(teams)
+        player_id = f"{team_id}_player_{rng.randint(1, players_per_team)}"
+        minute = rng.randint(1, 94)
+        timestamp = KICK_OFF + timedelta(minutes=minute)
+        incident = {
+            "contestantId": team_id,
+            "periodId": 1 if minute <= 45 else 2,
+            "timeMin": minute,
+            "timeMinSec": f"{minute}:{rng.randint(0, 59):02d}",
+            "lastUpdated": format_time(timestamp + timedelta(seconds=30)),
+            "timestamp": format_time(timestamp),
+            "optaEventId": str(rng.randint(10**8, 10**9)),
+        }
+        if kind == "goal":
+            incident.update(
+                {
+                    "type": "G",
+                    "scorerId": player_id,
+                    "scorerName": "F. Scorer",
+                    "homeScore": index,
+                    "awayScore": 0,
+                }
+            )
+        else:
+            incident.update(
+                {
+                    "type": rng.choice(["YC", "YC", "YC", "RC"]),
+                    "playerId": player_id,
+                    "playerName": "F. Player",
+                    "cardReason": "Foul",
+                }
+            )
+        incidents.append(incident)
+    return incidents
+
+
+def generate_match_event_feed(
+    match_id: str,
+    events: int = 1800,
+    qualifiers_per_event: int = 4,
+    players_per_team: int = 18,
+    first_event_id: int = 0,
+    seed: int = 0,
+) -> dict:
+    """
+    Generate a synthetic match_event feed.
+
+    match_id: str: The match id.
+    events: int: The number of events.
+    qualifiers_per_event: int: The average number of qualifiers per event.
+    players_per_team: int: The number of players of every team.
+    first_event_id: int: The id of the first event.
+    seed: int: The seed of the random generator.
+
+    return: dict: The feed.
+    """
+    rng = random.Random(seed)
+    teams = [f"{match_id}_home", f"{match_id}_away"]
+    live_data = {"matchDetails": generate_match_details(rng)}
+    live_data["event"] = generate_events(
+        rng, teams, events, qualifiers_per_event, players_per_team, first_event_id
+    )
+    return {"matchInfo": generate_match_info(match_id, teams), "liveData": live_data}
+
+
+def generate_match_stats_feed(
+    match_id: str,
+    players_per_team: int = 18,
+    goals: int = 3,
+    cards: int = 4,
+    seed: int = 0,
+) -> dict:
+    """
+    Generate a synthetic match_stats feed.
+
+    match_id: str: The match id.
+    players_per_team: int: The number of players of every team.
+    goals: int: The number of goals.
+    cards: int: The number of cards.
+    seed: int: The seed of the random generator.
+
+    return: dict: The feed.
+    """
+    rng = random.Random(seed)
+    teams = [f"{match_id}_home", f"{match_id}_away"]
+    live_data = {
+        "matchDetails": generate_match_details(rng),
+        "lineUp": generate_lineups(rng, teams, players_per_team),
+        "goal": generate_incidents(rng, teams, players_per_team, "goal", goals),
+        "card": generate_incidents(rng, teams, players_per_team, "card", cards),
+    }
+    return {"matchInfo": generate_match_info(match_id, teams), "liveData": live_data}
+
+
+def write_feed_file(file_path: str, feed: dict) -> None:
+    """
+    Write a feed in the format of its file extension, e.g. .json, .jsonl or
+    .json.gz.
+
+    JSON Lines files get the feed without its events on their first line, and
+    one event per line after it.
+
+    file_path: str: The file path.
+    feed: dict: The feed.
+
+    return: None
+    """
+    with open_feed_file(file_path, "w") as f:
+        if not is_json_lines(file_path):
+            json.dump(feed, f)
+            return
+        live_data = dict(feed["liveData"])
+        events = live_data.pop("event", [])
+        f.write(json.dumps({**feed, "liveData": live_data}) + "\n")
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def write_synthetic_feeds(
+    data_path: str,
+    matches: int = 1,
+    events: int = 1800,
+    qualifiers_per_event: int = 4,
+    players_per_team: int = 18,
+    seed: int = 0,
+    extension: str = ".json",
+) -> List[str]:
+    """
+    Write the match_event and match_stats files of synthetic matches.
+
+    data_path: str: The directory of the files.
+    matches: int: The number of matches.
+    events: int: The number of events per match.
+    qualifiers_per_event: int: The average number of qualifiers per event.
+    players_per_team: int: The number of players of every team.
+    seed: int: The seed of the random generator.
+    extension: str: The file extension, e.g. .json, .jsonl or .json.gz.
+
+    return: List[str]: The written file paths.
+    """
+    os.makedirs(data_path, exist_ok=True)
+    file_paths = []
+    for number in range(matches):
+        match_id = f"synthetic_{seed}_{number}"
+        feeds = {
+            "match_event": generate_match_event_feed(
+                match_id,
+                events=events,
+                qualifiers_per_event=qualifiers_per_event,
+                players_per_team=players_per_team,
+                first_event_id=(seed * matches + number) * EVENT_IDS_PER_MATCH,
+                seed=seed + number,
+            ),
+            "match_stats": generate_match_stats_feed(
+                match_id, players_per_team=players_per_team, seed=seed + number
+            ),
+        }
+        for file_type, feed in feeds.items():
+            file_path = os.path.join(data_path, f"{file_type}_{match_id}{extension}")
+            write_feed_file(file_path, feed)
+            file_paths.append(file_path)
+    return file_paths
@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm.session import Session
+
+# dialects with a native INSERT ... ON CONFLICT DO UPDATE statement.
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# columns which are never overwritten by an upsert.
+UPSERT_IGNORED_COLUMNS = ("created_at", "updated_at")
+
+
+def supports_upsert(session: Session) -> bool:
+    """
+    Check if the database of the session has a native upsert.
+
+    session: Session: The database session.
+
+    return: bool: True for PostgreSQL and SQLite.
+    """
+    return getattr(session.get_bind().dialect, "name", None) in UPSERT_INSERTS
+
+
+def build_upsert(model, dialect_name: str):
+    """
+    Build the upsert statement of a model.
+
+    Rows with a new primary key are inserted. Existing rows are only updated
+    when at least one of their columns changed, so unchanged rows are skipped
+    by the database without being written.
+
+    model: BaseModel: The model class.
+    dialect_name: str: The database dialect, postgresql or sqlite.
+
+    return: Insert: The upsert statement, to execute with a list of rows.
+    """
+    table = model.__table__
+    primary_key = [column.name for column in table.primary_key.columns]
+    update_columns = [
+        column.name
+        for column in table.columns
+        if column.name not in primary_key and column.name not in UPSERT_IGNORED_COLUMNS
+    ]
+
+    statement = UPSERT_INSERTS[dialect_name](table)
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=primary_key,
+        set_={
+            **{name: excluded[name] for name in update_columns},
+            "updated_at": datetime.utcnow(),
+        },
+        where=or_(
+            *[table.c[name].is_distinct_from(excluded[name]) for name in update_columns]
+        ),
+    )
+
+
+def upsert_rows(session: Session, model, rows: List[dict]) -> int:
+    """
+    Insert or update rows of a model with one statement.
+
+    Rows repeating a primary key are de-duplicated first, the last one wins, as
+    a single statement cannot update the same row twice.
+
+    session: Session: The database session.
+    model: BaseModel: The model class.
+    rows: List[dict]: The validated rows.
+
+    return: int: The number of distinct rows sent to the database.
+    """
+    primary_key = [column.name for column in model.__table__.primary_key.columns]
+    unique_rows = {tuple(row[name] for name in primary_key): row for row in rows}
+    if not unique_rows:
+        return 0
+
+    statement = build_upsert(model, session.get_bind().dialect.name)
+    session.execute(statement, list(unique_rows.values()))
+    return len(unique_rows)
@@ -1,30 +1,181 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+from collections import defaultdict
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
 
-from dotenv import load_dotenv
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_FILE_NAME = "app.log"
 
-# Load environment variables from .env file
-load_dotenv()
+# an error logged from the same line is kept ERROR_BURST times, and then only
+# once every ERROR_SAMPLE_RATE times.
+ERROR_BURST = 10
+ERROR_SAMPLE_RATE = 100
 
+_handlers: List[logging.Handler] = []
+_listener: Optional[QueueListener] = None
 
-# Create log directory if it doesn't exist
-LOG_DIR = os.path.join(os.path.dirname(__file__), "log")
-os.makedirs(LOG_DIR, exist_ok=True)
 
-# Set up logging
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+class ErrorSampler(logging.Filter):
+    """
+    Sample the errors which repeat, e.g. the same failing section of every
+    match of a season.
+
+    Errors are counted by the line which logs them. The first ``burst`` ones
+    are kept, and then one of every ``sample_rate``, with the number of
+    repeats added to its message. Records below ERROR are always kept.
+    """
+
+    def __init__(self, burst: int = ERROR_BURST, sample_rate: int = ERROR_SAMPLE_RATE):
+        super().__init__()
+        self.burst = burst
+        self.sample_rate = sample_rate
+        self._counts: Dict[tuple, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.ERROR:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            self._counts[key] += 1
+            count = self._counts[key]
+        if count <= self.burst:
+            return True
+        if (count - self.burst) % self.sample_rate:
+            return False
+        record.msg = (
+            f"{record.getMessage()} "
+            f"[repeated {count} times, logging 1 of {self.sample_rate}]"
+        )
+        record.args = None
+        return True
+
+
+def configure_logging(
+    log_dir: Optional[str] = None,
+    level: Optional[str] = None,
+    use_queue: bool = True,
+    sample_errors: bool = True,
+) -> None:
+    """
+    Configure the root logger to log to the console, and to a log file.
+
+    With use_queue, records are only put on a queue by the logging thread, and
+    formatted and written by a QueueListener thread, so slow disk writes do
+    not block the ingest. Calling it again replaces the handlers it added.
+
+    log_dir: str: The directory of the app.log file, LOG_DIR by default. Without
+        both, only the console is logged to.
+    level: str: The log level, LOG_LEVEL or INFO by default.
+    use_queue: bool: Write the records from a listener thread.
+    sample_errors: bool: Sample the errors which repeat, with ErrorSampler.
+
+    return: None
+    """
+    global _listener
+
+    stop_logging()
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    log_dir = log_dir or os.getenv("LOG_DIR")
+
+    handlers = [logging.StreamHandler()]
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+        handlers.append(logging.FileHandler(os.path.join(log_dir, LOG_FILE_NAME)))
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    if use_queue:
+        _listener = QueueListener(
+            queue.SimpleQueue(), *handlers, respect_handler_level=True
+        )
+        _listener.start()
+        handlers = [QueueHandler(_listener.queue)]
+    if sample_errors:
+        for handler in handlers:
+            handler.addFilter(ErrorSampler())
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    for handler in handlers:
+        root_logger.addHandler(handler)
+    _handlers.extend(handlers)
+
+
+def load_environment(env_file: Optional[str] = None) -> None:
+    """
+    Load the environment variables of a .env file, without overriding the
+    variables which are already set.
+
+    env_file: str: The .env file, by default the first one found upwards from
+        the package directory.
+
+    return: None
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv(env_file)
+
+
+def initialize(
+    log_dir: Optional[str] = None,
+    level: Optional[str] = None,
+    env_file: Optional[str] = None,
+    use_queue: bool = True,
+) -> None:
+    """
+    Initialize the package explicitly: load the .env file, and configure
+    logging. Importing the package does neither.
+
+    log_dir: str: The directory of the app.log file, LOG_DIR by default.
+    level: str: The log level, LOG_LEVEL or INFO by default.
+    env_file: str: The .env file, optional.
+    use_queue: bool: Write the log records from a listener thread.
+
+    return: None
+    """
+    load_environment(env_file)
+    configure_logging(log_dir=log_dir, level=level, use_queue=use_queue)
+
+
+def stop_logging() -> None:
+    """
+    Remove the handlers added by configure_logging, and write the records
+    still waiting in its queue.
+
+    return: None
+    """
+    global _listener
+
+    root_logger = logging.getLogger()
+    for handler in _handlers:
+        root_logger.removeHandler(handler)
+        handler.close()
+    _handlers.clear()
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _restart_listener() -> None:
+    """Start the queue listener again in a forked process, e.g. a pool worker."""
+    global _listener
 
-logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+    if _listener is not None:
+        _listener = QueueListener(
+            _listener.queue, *_listener.handlers, respect_handler_level=True
+        )
+        _listener.start()
 
-# Set up file handler
-LOG_FILE = os.path.join(LOG_DIR, "app.log")
-file_handler = logging.FileHandler(LOG_FILE)
-file_handler.setLevel(LOG_LEVEL)
-file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 
-# Add file handler to the root logger
-logging.getLogger().addHandler(file_handler)
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_listener)
 
 
 def get_logger(name: str) -> logging.Logger:
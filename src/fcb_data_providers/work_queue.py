@@ -0,0 +1,381 @@
+import os
+import socket
+import threading
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from logging import Logger
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.orm.session import Session
+
+from fcb_data_providers.database_models import WorkItem
+from fcb_data_providers.discovery import get_match_id
+from fcb_data_providers.upsert import UPSERT_INSERTS
+
+# a node which did not heartbeat for this long is considered crashed.
+DEFAULT_LEASE_SECONDS = 300
+
+# a file failing this many times is not claimed again.
+DEFAULT_MAX_ATTEMPTS = 3
+
+# maximum number of file paths registered with a single statement.
+REGISTER_BATCH_SIZE = 500
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+def utc_now() -> datetime:
+    """Get the current UTC time, naive like the other timestamps of the tables."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def get_worker_id() -> str:
+    """Get a worker id which is unique across the nodes, e.g. host:pid:suffix."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class Lease:
+    """
+    A file claimed by a worker.
+
+    file_path: str: The file path.
+    file_type: str: The file type, e.g. match_event or match_stats.
+    attempts: int: The number of claims of the file, this one included.
+    match_id: str: The match id of the file name, see get_match_id.
+    """
+
+    file_path: str
+    file_type: str
+    attempts: int
+    match_id: str
+
+
+class WorkQueue:
+    """
+    Distribute the feed files between nodes through the work_queue table.
+
+    Files are registered as pending, and claimed by the nodes with a lease.
+    The files of a match, e.g. its event and stats files, are claimed
+    together, so two nodes never store the same match at once. On PostgreSQL,
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` lets every node claim different
+    matches without waiting for the others. The owner of a lease
+    extends it with heartbeats, and the files of a node which stopped
+    heartbeating can be claimed again once their lease expired, until they
+    were attempted ``max_attempts`` times.
+
+    Leases are compared with the UTC clock of the nodes, which should be
+    synchronized well within ``lease_seconds``.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        logger: Logger,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.session = session
+        self.logger = logger
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def register_files(self, files: List[tuple]) -> None:
+        """
+        Add files to the queue, or make them pending again once they were done
+        or failed, e.g. when they changed since.
+
+        Files which are leased are left to their owner. Nodes can register the
+        same files at once.
+
+        files: List[tuple]: The (file_path, file_type) pairs.
+
+        return: None
+        """
+        dialect_name = self.session.get_bind().dialect.name
+        for start in range(0, len(files), REGISTER_BATCH_SIZE):
+            end = start + REGISTER_BATCH_SIZE
+            batch = files[start:end]
+            rows = [
+                {
+                    "file_path": file_path,
+                    "file_type": file_type,
+                    "match_id": get_match_id(file_path, file_type),
+                    "status": PENDING,
+                }
+                for file_path, file_type in batch
+            ]
+            if dialect_name in UPSERT_INSERTS:
+                statement = UPSERT_INSERTS[dialect_name](
+                    WorkItem
+                ).on_conflict_do_nothing(index_elements=["file_path"])
+                self.session.execute(statement, rows)
+            else:
+                file_paths = [row["file_path"] for row in rows]
+                existing = set(
+                    self.session.scalars(
+                        select(WorkItem.file_path).where(
+                            WorkItem.file_path.in_(file_paths)
+                        )
+                    )
+                )
+                new_rows = [row for row in rows if row["file_path"] not in existing]
+                if new_rows:
+                    self.session.execute(insert(WorkItem), new_rows)
+            self.session.execute(
+                update(WorkItem)
+                .where(
+                    WorkItem.file_path.in_([file_path for file_path, _ in batch]),
+                    WorkItem.status.in_([DONE, FAILED]),
+                )
+                .values(status=PENDING, attempts=0, error=None)
+            )
+        self.session.commit()
+        self.logger.info("Registered %s files in the work queue", len(files))
+
+    def expire_leases(self) -> int:
+        """
+        Fail the files whose lease expired on their last attempt.
+
+        The other expired files are claimable again.
+
+        return: int: The number of failed files.
+        """
+        result = self.session.execute(
+            update(WorkItem)
+            .where(
+                WorkItem.status == LEASED,
+                WorkItem.lease_expires_at < utc_now(),
+                WorkItem.attempts >= self.max_attempts,
+            )
+            .values(
+                status=FAILED,
+                lease_owner=None,
+                error=f"Lease expired after {self.max_attempts} attempts",
+            )
+        )
+        self.session.commit()
+        if result.rowcount:
+            self.logger.error(
+                "Failed %s files whose lease expired after %s attempts",
+                result.rowcount,
+                self.max_attempts,
+            )
+        return result.rowcount
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[Lease]:
+        """
+        Lease the pending files, and the files whose lease expired, of whole
+        matches to a worker.
+
+        A match is only claimed when no other worker holds a lease on one of
+        its files. Every worker locks the first open file of a match before its
+        other files, with SKIP LOCKED, so only one of the workers claiming at
+        once gets the match, and the others move on to the next matches. Its
+        event and stats files are never processed by two workers at once.
+
+        worker_id: str: The id of the claiming worker.
+        limit: int: The maximum number of matches to claim.
+
+        return: List[Lease]: The claimed files, by match, with the match event
+            files before the match stats files.
+        """
+        self.expire_leases()
+        now = utc_now()
+        is_open = WorkItem.status.in_([PENDING, LEASED])
+        claimable = or_(
+            WorkItem.status == PENDING,
+            and_(WorkItem.status == LEASED, WorkItem.lease_expires_at < now),
+        )
+        leased_matches = select(WorkItem.match_id).where(
+            WorkItem.status == LEASED, WorkItem.lease_expires_at >= now
+        )
+        first_files = (
+            select(func.min(WorkItem.file_path))
+            .where(is_open)
+            .group_by(WorkItem.match_id)
+        )
+        match_ids = self.session.scalars(
+            select(WorkItem.match_id)
+            .where(
+                claimable,
+                WorkItem.file_path.in_(first_files),
+                WorkItem.match_id.not_in(leased_matches),
+            )
+            .order_by(WorkItem.match_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        items = self.session.scalars(
+            select(WorkItem)
+            .where(claimable, WorkItem.match_id.in_(match_ids))
+            .order_by(WorkItem.match_id, WorkItem.file_type, WorkItem.file_path)
+            .with_for_update(skip_locked=True)
+        ).all()
+        # a match with a file this worker could not lock, e.g. as it changed
+        # since, is left to the next claim.
+        open_files = dict(
+            self.session.execute(
+                select(WorkItem.match_id, func.count())
+                .where(WorkItem.match_id.in_(match_ids), is_open)
+                .group_by(WorkItem.match_id)
+            ).all()
+        )
+        locked_files = Counter(item.match_id for item in items)
+
+        leases = []
+        for item in items:
+            if locked_files[item.match_id] != open_files.get(item.match_id):
+                continue
+            if item.status == LEASED:
+                self.logger.warning(
+                    "Retrying file: %s, the lease of %s expired",
+                    item.file_path,
+                    item.lease_owner,
+                )
+            item.status = LEASED
+            item.attempts += 1
+            item.lease_owner = worker_id
+            item.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+            item.heartbeat_at = now
+            leases.append(
+                Lease(item.file_path, item.file_type, item.attempts, item.match_id)
+            )
+        self.session.commit()
+        return leases
+
+    def heartbeat(self, worker_id: str) -> int:
+        """
+        Extend the leases of a worker.
+
+        worker_id: str: The id of the worker.
+
+        return: int: The number of leases the worker still holds.
+        """
+        now = utc_now()
+        result = self.session.execute(
+            update(WorkItem)
+            .where(WorkItem.status == LEASED, WorkItem.lease_owner == worker_id)
+            .values(
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                heartbeat_at=now,
+            )
+        )
+        self.session.commit()
+        return result.rowcount
+
+    def complete(
+        self, worker_id: str, file_path: str, success: bool, error: str = None
+    ) -> bool:
+        """
+        Finish the lease of a file, as done, or as pending again to be retried.
+
+        A file which failed max_attempts times is failed for good.
+
+        worker_id: str: The id of the worker holding the lease.
+        file_path: str: The file path.
+        success: bool: True if the file was processed.
+        error: str: The error of a failed file.
+
+        return: bool: False if the worker did not hold the lease anymore.
+        """
+        item = self.session.get(WorkItem, file_path, with_for_update=True)
+        if item is None or item.status != LEASED or item.lease_owner != worker_id:
+            self.session.commit()
+            self.logger.warning("Lost the lease of file: %s", file_path)
+            return False
+        if success:
+            item.status = DONE
+            item.error = None
+        else:
+            item.status = FAILED if item.attempts >= self.max_attempts else PENDING
+            item.error = error
+        item.lease_owner = None
+        item.lease_expires_at = None
+        self.session.commit()
+        return True
+
+    def release(self, worker_id: str) -> int:
+        """
+        Give the leases of a worker back, e.g. when it stops early.
+
+        worker_id: str: The id of the worker.
+
+        return: int: The number of released files.
+        """
+        result = self.session.execute(
+            update(WorkItem)
+            .where(WorkItem.status == LEASED, WorkItem.lease_owner == worker_id)
+            .values(
+                status=PENDING,
+                attempts=WorkItem.attempts - 1,
+                lease_owner=None,
+                lease_expires_at=None,
+            )
+        )
+        self.session.commit()
+        return result.rowcount
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """
+        Get the number of files by status.
+
+        return: Dict[str, int]: The counts by status.
+        """
+        query = select(WorkItem.status, func.count()).group_by(WorkItem.status)
+        counts = dict(self.session.execute(query).all())
+        self.session.commit()
+        return counts
+
+
+class Heartbeat:
+    """
+    Extend the leases of a worker from a background thread, with its own
+    session, while the files are processed.
+    """
+
+    def __init__(
+        self,
+        database,
+        logger: Logger,
+        worker_id: str,
+        interval: float,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    ):
+        self.database = database
+        self.logger = logger
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                with self.database.session_scope() as session:
+                    WorkQueue(session, self.logger, self.lease_seconds).heartbeat(
+                        self.worker_id
+                    )
+            except Exception as e:
+                # the next heartbeat is tried anyway, before the lease expires.
+                self.logger.warning(
+                    "Heartbeat of worker %s failed. Error: %s", self.worker_id, e
+                )
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread = threading.Thread(
+            target=self._run, name=f"heartbeat-{self.worker_id}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._thread.join()
@@ -0,0 +1,10 @@
+import pytest
+
+from fcb_data_providers.providers import StatsPerformProvider
+
+
+@pytest.fixture
+def stats_perform_provider():
+    return StatsPerformProvider(
+        data_path="test_data_path", database_url="sqlite:///:memory:"
+    )
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import func, inspect, select
+
+from fcb_data_providers.database import Database, begin_write
+from fcb_data_providers.database_models import Event
+from fcb_data_providers.providers import StatsPerformProvider
+from tests.test_stats_perform import _write_event_files
+
+
+def _index_names(database: Database, table_name: str) -> set:
+    return {index["name"] for index in inspect(database.engine).get_indexes(table_name)}
+
+
+def test_create_tables_creates_indexes():
+    database = Database("sqlite:///:memory:")
+    database.create_tables()
+
+    assert _index_names(database, "events") == {
+        "ix_events_match_period_time",
+        "ix_events_player_type",
+        "ix_events_e_id",
+    }
+    assert _index_names(database, "qualifiers") == {"ix_qualifiers_event_qualifier"}
+    assert "ix_goals_match_id" in _index_names(database, "goals")
+
+
+def test_create_tables_without_indexes():
+    database = Database("sqlite:///:memory:")
+    database.create_tables(create_indexes=False)
+    # creating the tables again keeps the existing ones.
+    database.create_tables(create_indexes=False)
+
+    assert "events" in inspect(database.engine).get_table_names()
+    assert _index_names(database, "events") == set()
+
+    database.create_indexes()
+    assert len(_index_names(database, "events")) == 3
+
+    database.drop_indexes()
+    assert _index_names(database, "events") == set()
+
+
+def test_process_data_builds_deferred_indexes(tmp_path):
+    _write_event_files(tmp_path, ["match_1"])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url=f"sqlite:///{tmp_path / 'data.db'}",
+        bulk_insert=True,
+        defer_indexes=True,
+    )
+    assert _index_names(provider.db, "events") == set()
+
+    results = provider.process_data()
+
+    assert all(result.success for result in results)
+    assert len(_index_names(provider.db, "events")) == 3
+
+
+def test_sqlite_reads_do_not_take_the_write_lock(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'data.db'}")
+    database.create_tables()
+    reader = database.Session()
+    reader.scalar(select(func.count()).select_from(Event))
+    other = sqlite3.connect(tmp_path / "data.db", timeout=0, isolation_level=None)
+
+    # the open read transaction does not block a writer from beginning.
+    other.execute("BEGIN IMMEDIATE")
+    other.execute("ROLLBACK")
+
+    reader.commit()
+    begin_write(reader)
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        other.execute("BEGIN IMMEDIATE")
+    reader.rollback()
+    other.close()
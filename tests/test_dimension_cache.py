@@ -0,0 +1,29 @@
+from unittest.mock import patch
+
+from fcb_data_providers.dimension_cache import DimensionCache
+from fcb_data_providers.providers import stats_perform
+from tests.test_stats_perform import _event_feed
+
+
+def test_dimension_cache_only_caches_committed_rows():
+    cache = DimensionCache()
+    assert cache.changed("teams", "team_1", ["Team 1"])
+    cache.rollback()
+    assert cache.changed("teams", "team_1", ["Team 1"])
+    cache.commit()
+
+    assert not cache.changed("teams", "team_1", ["Team 1"])
+    assert cache.changed("teams", "team_1", ["Team One"])
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_unchanged_teams_are_not_stored_again(stats_perform_provider):
+    stats_perform_provider.process_event_data(_event_feed("match_1"))
+
+    with patch.object(
+        stats_perform, "TeamModel", wraps=stats_perform.TeamModel
+    ) as mock_team_model:
+        stats_perform_provider.process_event_data(_event_feed("match_2"))
+
+    mock_team_model.assert_not_called()
+    assert stats_perform_provider.dimension_cache.hits == 2
@@ -0,0 +1,121 @@
+import os
+
+from fcb_data_providers.discovery import (iter_feed_files, pair_feed_files,
+                                          pair_files, parse_feed_file_name)
+from tests.test_manifest import _write_feed
+from tests.test_stats_perform import _event_feed_json
+
+
+def _touch(root, *relative_paths):
+    for relative_path in relative_paths:
+        file_path = root / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("{}")
+
+
+def test_parse_feed_file_name():
+    assert parse_feed_file_name("match_event_abc.json") == ("match_event", "abc")
+    assert parse_feed_file_name("match_stats_abc.json") == ("match_stats", "abc")
+    assert parse_feed_file_name("match_event_.json") is None
+    assert parse_feed_file_name("match_event_abc.json.gz") == ("match_event", "abc")
+    assert parse_feed_file_name("match_stats_abc.jsonl.zst") == ("match_stats", "abc")
+    assert parse_feed_file_name("match_event_abc.txt") is None
+    assert parse_feed_file_name("squads.json") is None
+
+
+def test_iter_feed_files_walks_subdirectories(tmp_path):
+    _touch(
+        tmp_path,
+        "match_stats_1.json",
+        "notes.txt",
+        "2023/match_event_2.json",
+        "2023/cup/match_event_3.json",
+        "2022/match_event_1.json",
+    )
+
+    feed_files = list(iter_feed_files(str(tmp_path)))
+
+    assert [os.path.relpath(feed_file.path, tmp_path) for feed_file in feed_files] == [
+        "match_stats_1.json",
+        os.path.join("2022", "match_event_1.json"),
+        os.path.join("2023", "match_event_2.json"),
+        os.path.join("2023", "cup", "match_event_3.json"),
+    ]
+    assert [feed_file.match_id for feed_file in feed_files] == ["1", "1", "2", "3"]
+
+
+def test_iter_feed_files_patterns(tmp_path):
+    _touch(
+        tmp_path,
+        "2023/match_event_1.json",
+        "2023/friendlies/match_event_2.json",
+        "2022/match_event_3.json",
+        "2023/match_stats_1.json",
+    )
+
+    feed_files = iter_feed_files(
+        str(tmp_path),
+        file_types=["match_event"],
+        include=["2023/*"],
+        exclude=["*/friendlies"],
+    )
+
+    assert [feed_file.match_id for feed_file in feed_files] == ["1"]
+
+
+def test_pair_feed_files(tmp_path):
+    _touch(
+        tmp_path,
+        "events/match_event_1.json",
+        "events/match_event_2.json",
+        "stats/match_stats_1.json",
+    )
+
+    matches = list(pair_feed_files(iter_feed_files(str(tmp_path))))
+
+    assert [match.match_id for match in matches] == ["1", "2"]
+    assert sorted(matches[0].files) == ["match_event", "match_stats"]
+    assert sorted(matches[1].files) == ["match_event"]
+
+
+def test_process_data_walks_nested_directories(tmp_path):
+    from fcb_data_providers.providers import StatsPerformProvider
+
+    for season, match_id in [("2022", "match_1"), ("2023", "match_2")]:
+        os.makedirs(tmp_path / "feeds" / season)
+        _write_feed(
+            tmp_path / "feeds" / season / f"match_event_{match_id}.json",
+            _event_feed_json(match_id),
+        )
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path / "feeds"),
+        database_url=f"sqlite:///{tmp_path / 'fcb.db'}",
+        exclude_patterns=["2022"],
+    )
+
+    results = provider.process_data()
+
+    assert [os.path.relpath(result.file_path, tmp_path) for result in results] == [
+        os.path.join("feeds", "2023", "match_event_match_2.json")
+    ]
+    assert provider.process_data() == []
+
+
+def test_pair_files_keeps_other_files_on_their_own():
+    files = [
+        ("a/match_stats_1.json", "match_stats"),
+        ("a/match_event_2.json", "match_event"),
+        ("b/match_event_1.json", "match_event"),
+        ("b/match_event_2.json", "match_event"),
+        ("feeds/other.json", "match_event"),
+    ]
+
+    assert list(pair_files(files)) == [
+        [
+            ("b/match_event_1.json", "match_event"),
+            ("a/match_stats_1.json", "match_stats"),
+        ],
+        [("a/match_event_2.json", "match_event")],
+        [("b/match_event_2.json", "match_event")],
+        [("feeds/other.json", "match_event")],
+    ]
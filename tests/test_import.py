@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import fcb_data_providers
+
+
+def _run(code):
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(fcb_data_providers.__path__[0])}
+    process = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env
+    )
+    assert process.returncode == 0, process.stderr
+    return process.stdout.strip()
+
+
+def test_import_has_no_heavy_imports_or_side_effects():
+    output = _run(
+        "import logging, sys\n"
+        "import fcb_data_providers.providers\n"
+        "print(sorted(m for m in ('pandas', 'sqlalchemy', 'dotenv') if m in sys.modules),"
+        " len(logging.getLogger().handlers))"
+    )
+
+    assert output == "[] 0"
+
+
+def test_provider_does_not_configure_logging_or_load_dotenv():
+    output = _run(
+        "import logging, sys\n"
+        "from fcb_data_providers.providers import StatsPerformProvider\n"
+        "StatsPerformProvider(data_path='.', database_url='sqlite:///:memory:')\n"
+        "print('dotenv' in sys.modules, len(logging.getLogger().handlers))"
+    )
+
+    assert output == "False 0"
+
+
+def test_provider_import_does_not_load_pandas():
+    output = _run(
+        "import sys\n"
+        "from fcb_data_providers.providers import StatsPerformProvider\n"
+        "print('pandas' in sys.modules)"
+    )
+
+    assert output == "False"
+
+
+def test_lazy_exports():
+    import fcb_data_providers.providers as providers
+
+    assert providers.StatsPerformProvider.__name__ == "StatsPerformProvider"
+    assert "FileResult" in dir(providers)
+    assert fcb_data_providers.metrics.IngestMetrics
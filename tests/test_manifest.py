@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from fcb_data_providers.database_models import Event, IngestionManifest, Period
+from fcb_data_providers.providers import StatsPerformProvider
+from tests.test_stats_perform import _event_feed_json
+
+
+@pytest.fixture
+def provider(tmp_path):
+    return StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+
+
+def _write_feed(file_path, feed):
+    with open(file_path, "w") as f:
+        json.dump(feed, f)
+
+
+def test_process_data_skips_ingested_files(provider, tmp_path):
+    _write_feed(tmp_path / "match_event_1.json", _event_feed_json("match_1"))
+
+    assert len(provider.process_data()) == 1
+    assert provider.process_data() == []
+
+    entry = provider.session.get(IngestionManifest, f"{tmp_path}/match_event_1.json")
+    assert entry.match_id == "match_1"
+    assert provider.session.query(Event).count() == 5
+
+
+def test_touched_file_is_not_reingested(provider, tmp_path):
+    file_path = tmp_path / "match_event_1.json"
+    _write_feed(file_path, _event_feed_json("match_1"))
+    provider.process_data()
+
+    stat = os.stat(file_path)
+    os.utime(file_path, (stat.st_atime, stat.st_mtime + 60))
+
+    assert provider.get_match_related_files("match_event") == []
+    entry = provider.session.get(IngestionManifest, str(file_path))
+    assert entry.mtime == stat.st_mtime + 60
+
+
+def test_changed_file_replaces_its_rows(provider, tmp_path):
+    file_path = tmp_path / "match_event_1.json"
+    _write_feed(file_path, _event_feed_json("match_1"))
+    provider.process_data()
+
+    feed = _event_feed_json("match_1")
+    feed["liveData"]["event"] = feed["liveData"]["event"][:2]
+    _write_feed(file_path, feed)
+
+    assert len(provider.process_data()) == 1
+    assert provider.session.query(Event).count() == 2
+    assert provider.session.query(Period).count() == 1
+
+
+def test_force_reingests_unchanged_files(provider, tmp_path):
+    _write_feed(tmp_path / "match_event_1.json", _event_feed_json("match_1"))
+    provider.process_data()
+
+    results = provider.process_data(force=True)
+
+    assert [result.success for result in results] == [True]
+    assert provider.session.query(Event).count() == 5
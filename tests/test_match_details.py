@@ -0,0 +1,51 @@
+import json
+
+from sqlalchemy import update
+
+from fcb_data_providers.database_models import Match, MatchDetail
+from fcb_data_providers.match_details import refresh_match_details
+from fcb_data_providers.providers import StatsPerformProvider
+from tests.test_stats_perform import _stats_feed_json, _write_event_files
+
+
+def _provider(tmp_path):
+    return StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'data.db'}"
+    )
+
+
+def test_process_data_refreshes_match_details(tmp_path):
+    _write_event_files(tmp_path, ["match_1"])
+    with open(tmp_path / "match_stats_match_1.json", "w") as f:
+        json.dump(_stats_feed_json("match_1"), f)
+    provider = _provider(tmp_path)
+
+    results = provider.process_data()
+
+    assert {result.match_id for result in results} == {"match_1"}
+    detail = provider.session.get(MatchDetail, "match_1")
+    assert detail.home_team_name == "Team 1"
+    assert detail.away_team_name == "Team 2"
+    assert (detail.ft_home, detail.ft_away) == (2, 1)
+    assert (detail.home_goals, detail.away_goals) == (1, 0)
+    assert (detail.home_yellow_cards, detail.away_yellow_cards) == (0, 1)
+    assert (detail.home_red_cards, detail.away_red_cards) == (0, 0)
+
+
+def test_refresh_match_details_only_touches_given_matches(tmp_path):
+    _write_event_files(tmp_path, ["match_1", "match_2"])
+    provider = _provider(tmp_path)
+    provider.process_data()
+
+    session = provider.session
+    session.execute(update(Match).values(match_status="Postponed"))
+    session.commit()
+    assert refresh_match_details(session, provider.logger, ["match_2"])
+
+    session.expire_all()
+    assert session.get(MatchDetail, "match_1").match_status == "Played"
+    assert session.get(MatchDetail, "match_2").match_status == "Postponed"
+
+    assert refresh_match_details(session, provider.logger)
+    session.expire_all()
+    assert session.get(MatchDetail, "match_1").match_status == "Postponed"
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from fcb_data_providers.metrics import IngestMetrics
+from fcb_data_providers.providers import StatsPerformProvider
+from tests.test_stats_perform import _write_event_files
+
+
+def test_measure_records_stage_and_match():
+    metrics = IngestMetrics()
+    with metrics.match("match_1"):
+        with metrics.measure("write.events", rows=10):
+            pass
+    with metrics.measure("write.events") as measured:
+        measured.rows = 5
+
+    assert metrics.stages["write.events"].rows == 15
+    assert metrics.stages["write.events"].calls == 2
+    assert metrics.matches["match_1"]["write.events"].rows == 10
+
+
+def test_measure_counts_failures():
+    metrics = IngestMetrics()
+    with pytest.raises(ValueError):
+        with metrics.measure("validate.events", rows=3):
+            raise ValueError("invalid")
+
+    assert metrics.stages["validate.events"].failures == 1
+
+
+def test_merge_snapshot():
+    worker_metrics = IngestMetrics()
+    with worker_metrics.match("match_1"):
+        with worker_metrics.measure("parse", rows=4):
+            pass
+    metrics = IngestMetrics()
+    metrics.merge(worker_metrics.snapshot())
+    metrics.merge(worker_metrics.snapshot())
+
+    assert metrics.stages["parse"].rows == 8
+    assert metrics.matches["match_1"]["parse"].calls == 2
+
+
+def test_process_data_writes_run_report(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    _write_event_files(data_path, ["match_1", "match_2"])
+    provider = StatsPerformProvider(
+        data_path=str(data_path),
+        database_url=f"sqlite:///{tmp_path / 'fcb.db'}",
+        metrics_path=str(tmp_path / "metrics" / "run.json"),
+        prometheus_path=str(tmp_path / "metrics" / "fcb_ingest.prom"),
+    )
+
+    provider.process_data()
+
+    report = provider.run_report
+    assert report.files == 2
+    assert report.stages["write.events"].rows == 10
+    assert report.stages["validate.qualifiers"].rows == 20
+    assert report.stages["parse"].rows == 10
+    assert report.matches["match_1"]["write.qualifiers"].rows == 10
+    with open(tmp_path / "metrics" / "run.json") as f:
+        assert json.load(f)["stages"]["write.events"]["rows"] == 10
+    prometheus = (tmp_path / "metrics" / "fcb_ingest.prom").read_text()
+    assert 'fcb_ingest_stage_rows{stage="write.events"} 10' in prometheus
+    assert "fcb_ingest_run_files 2" in prometheus
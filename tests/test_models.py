@@ -0,0 +1,68 @@
+import pytest
+from pydantic import ValidationError
+
+from fcb_data_providers.models import EventModel, PlayerModel, validate_rows
+
+
+def _event(event_id, **fields):
+    return {
+        "id": event_id,
+        "eventId": 1,
+        "typeId": 5,
+        "periodId": 1,
+        "timeMin": 0,
+        "timeSec": 12,
+        "x": 50.0,
+        "y": 50.0,
+        "contestantId": "team_1",
+        **fields,
+    }
+
+
+def test_validate_rows_uses_feed_keys_and_context():
+    rows = validate_rows(EventModel, [_event(1), _event(2)], match_id="match_1")
+
+    assert [row["e_id"] for row in rows] == [1, 2]
+    assert rows[0]["type_id"] == 5
+    assert rows[0]["team_id"] == "team_1"
+    assert rows[0]["match_id"] == "match_1"
+    # optional feed keys may be missing.
+    assert rows[0]["outcome"] is None
+    assert rows[0]["player_id"] is None
+
+
+def test_validate_rows_returns_plain_dicts():
+    player = {
+        "playerId": "player_1",
+        "firstName": "First",
+        "lastName": "Last",
+        "matchName": "F. Last",
+        "shirtNumber": "10",
+        "captain": "yes",
+    }
+
+    rows = validate_rows(PlayerModel, [player], team_id="team_1")
+
+    assert type(rows[0]) is dict
+    assert rows[0]["id"] == "player_1"
+    assert rows[0]["shirt_number"] == 10
+    assert rows[0]["is_captain"] is True
+    assert rows[0]["team_id"] == "team_1"
+
+
+def test_validate_rows_invalid_row():
+    events = [_event(1), _event(2, typeId="pass"), _event(3)]
+
+    with pytest.raises(ValidationError):
+        validate_rows(EventModel, events, match_id="match_1")
+
+    rows = validate_rows(EventModel, events, skip_invalid=True, match_id="match_1")
+    assert [row["e_id"] for row in rows] == [1, 3]
+
+
+def test_models_accept_field_names():
+    event = EventModel(
+        event_id=1, type_id=5, time_min=0, time_sec=12, x=1.0, y=2.0, match_id="m"
+    )
+
+    assert event.model_dump()["event_id"] == 1
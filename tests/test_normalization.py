@@ -0,0 +1,61 @@
+import pandas as pd
+
+from fcb_data_providers.models import EventModel, validate_rows
+from fcb_data_providers.normalization import normalize_events, to_records
+from tests.test_stats_perform import _events_data
+
+
+def test_normalize_events_types_columns():
+    df_events, df_qualifiers, dropped = normalize_events("match_1", _events_data())
+
+    assert dropped == 0
+    assert len(df_events) == 5
+    assert df_events["x"].dtype == "float64"
+    assert df_events["time_min"].dtype == "Int64"
+    assert df_events["outcome"].dtype == "boolean"
+    assert isinstance(df_events["timestamp"].dtype, pd.DatetimeTZDtype)
+    assert df_events["match_id"].unique().tolist() == ["match_1"]
+
+    assert len(df_qualifiers) == 10
+    assert df_qualifiers["event_id"].tolist() == [
+        event_id for event_id in range(100, 105) for _ in range(2)
+    ]
+
+
+def test_normalize_events_drops_invalid_rows():
+    events = _events_data()
+    events[0]["x"] = "not a number"
+    events[1]["qualifier"][0]["qualifierId"] = None
+
+    df_events, df_qualifiers, dropped = normalize_events("match_1", events)
+
+    # the invalid event, its two qualifiers and the qualifier without an id.
+    assert dropped == 4
+    assert df_events["e_id"].tolist() == [101, 102, 103, 104]
+    assert len(df_qualifiers) == 7
+
+
+def test_normalize_events_drops_the_rows_pydantic_rejects():
+    events = _events_data()
+    events[0]["periodId"] = "first half"
+    events[2]["playerId"] = 5
+    events[3]["timestamp"] = "yesterday"
+
+    df_events, _, _ = normalize_events("match_1", events)
+    rows = validate_rows(EventModel, events, skip_invalid=True, match_id="match_1")
+
+    assert df_events["e_id"].tolist() == [row["e_id"] for row in rows] == [101, 104]
+
+
+def test_to_records_returns_python_values():
+    df_events, _, _ = normalize_events("match_1", _events_data())
+
+    record = to_records(df_events)[0]
+
+    assert type(record["e_id"]) is int
+    assert type(record["x"]) is float
+    assert record["outcome"] is True
+    assert record["period_id"] == 1
+    assert record["timestamp"].year == 2023
+    assert type(record["player_id"]) is str
+    assert to_records(df_events.iloc[:0]) == []
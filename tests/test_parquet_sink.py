@@ -0,0 +1,134 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from fcb_data_providers.database_models import Event, Goal, Match
+from fcb_data_providers.providers import StatsPerformProvider
+from fcb_data_providers.readers import MatchFeed
+from fcb_data_providers.sinks import ParquetSink
+from tests.test_stats_perform import (_event_feed_json, _stats_feed_json,
+                                      _write_match_files)
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+
+@pytest.fixture
+def parquet_provider(tmp_path):
+    return StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url="sqlite:///:memory:",
+        parquet_path=str(tmp_path / "parquet"),
+        database_sink=False,
+    )
+
+
+def _read_dataset(tmp_path, name):
+    return ds.dataset(tmp_path / "parquet" / name, partitioning="hive").to_table()
+
+
+def test_parquet_sink_writes_typed_event_partitions(parquet_provider, tmp_path):
+    feed = _event_feed_json("match_1")
+    feed["matchInfo"]["tournamentCalendar"] = {"name": "2023/2024"}
+    parquet_provider.process_event_data(MatchFeed(feed["matchInfo"], feed["liveData"]))
+
+    events = _read_dataset(tmp_path, "events")
+    assert events.num_rows == 5
+    assert events.schema.field("x").type == pa.float64()
+    assert events.schema.field("timestamp").type == pa.timestamp("us", tz="UTC")
+    assert set(events.column("match_id").to_pylist()) == {"match_1"}
+    assert set(events.column("season").to_pylist()) == {"2023-2024"}
+    assert _read_dataset(tmp_path, "qualifiers").num_rows == 10
+
+    # the database keeps the match, but not the events.
+    session = parquet_provider.session
+    assert session.query(Match).count() == 1
+    assert session.query(Event).count() == 0
+
+
+def test_parquet_sink_writes_stats_datasets(parquet_provider, tmp_path):
+    feed = _stats_feed_json("match_1")
+    parquet_provider.process_stats_data(MatchFeed(feed["matchInfo"], feed["liveData"]))
+    # the players are cached by now, but the lineup of every match is written.
+    feed = _stats_feed_json("match_2")
+    parquet_provider.process_stats_data(MatchFeed(feed["matchInfo"], feed["liveData"]))
+
+    lineups = _read_dataset(tmp_path, "lineups")
+    assert lineups.num_rows == 44
+    assert _read_dataset(tmp_path, "goals").num_rows == 2
+    assert _read_dataset(tmp_path, "cards").num_rows == 2
+    assert parquet_provider.session.query(Goal).count() == 0
+
+
+def test_reingested_file_replaces_its_partitions(parquet_provider, tmp_path):
+    _write_match_files(tmp_path, "match_1")
+    parquet_provider.process_data()
+    assert _read_dataset(tmp_path, "goals").num_rows == 1
+
+    stats_feed = _stats_feed_json("match_1")
+    stats_feed["liveData"]["goal"] = []
+    _write_match_files(tmp_path, "match_1", stats_feed=stats_feed)
+    parquet_provider.process_data(force=True)
+
+    assert not list((tmp_path / "parquet" / "goals").glob("*/match_id=match_1"))
+    assert _read_dataset(tmp_path, "cards").num_rows == 1
+
+
+def test_failed_commit_leaves_no_partitions(parquet_provider, tmp_path):
+    feed = _event_feed_json("match_1")
+    session = parquet_provider.session
+    with patch.object(session, "commit", side_effect=RuntimeError("disk full")):
+        with pytest.raises(RuntimeError):
+            parquet_provider.process_event_data(
+                MatchFeed(feed["matchInfo"], feed["liveData"])
+            )
+
+    assert not [path for path in (tmp_path / "parquet").rglob("*") if path.is_file()]
+
+
+def test_parquet_sink_schema_has_all_table_columns(tmp_path):
+    sink = ParquetSink(
+        str(tmp_path / "parquet"), logging.getLogger(__name__), {Event: "events"}
+    )
+    sink.begin_match("match_1")
+    sink.add_many(Event, [{"e_id": 1}, {"e_id": 2, "x": 50.5}])
+    sink.commit()
+
+    events = _read_dataset(tmp_path, "events")
+    assert events.column("x").to_pylist() == [None, 50.5]
+    assert "created_at" not in events.schema.names
+
+
+def test_parquet_sink_replaces_earlier_partitions(tmp_path):
+    sink = ParquetSink(
+        str(tmp_path / "parquet"), logging.getLogger(__name__), {Goal: "goals"}
+    )
+    sink.begin_match("match_1", season="2022/2023")
+    sink.add_many(Goal, [{"match_id": "match_1", "type": "G"}])
+    sink.commit()
+    sink.begin_match("match_1", season="2023/2024")
+    sink.add_many(Goal, [{"match_id": "match_1", "type": "G"}])
+    sink.commit()
+
+    goals_path = tmp_path / "parquet" / "goals"
+    partitions = [
+        path.relative_to(goals_path).as_posix()
+        for path in goals_path.glob("*/match_id=match_1")
+    ]
+    assert partitions == ["season=2023-2024/match_id=match_1"]
+
+    # a cleared dataset loses its partition, also without any rows.
+    sink.begin_match("match_1", season="2023/2024")
+    sink.clear(Goal)
+    sink.commit()
+    assert not list(goals_path.glob("*/match_id=match_1"))
+
+
+def test_database_sink_needs_parquet_path():
+    with pytest.raises(ValueError):
+        StatsPerformProvider(
+            data_path="test_data_path",
+            database_url="sqlite:///:memory:",
+            database_sink=False,
+        )
@@ -0,0 +1,243 @@
+import json
+import logging
+import threading
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+
+from fcb_data_providers.database_models import Event, Period
+from fcb_data_providers.pipeline import Pipeline, Stage
+from fcb_data_providers.providers import StatsPerformProvider
+from fcb_data_providers.providers.results import PendingMatch
+from tests.test_stats_perform import (_event_feed_json, _write_event_files,
+                                      _write_match_files)
+
+logger = logging.getLogger(__name__)
+
+
+def test_pipeline_runs_all_stages():
+    pipeline = Pipeline(
+        [Stage("double", lambda x: x * 2, workers=3), Stage("add", lambda x: x + 1)],
+        logger,
+        queue_size=2,
+    )
+
+    assert sorted(pipeline.run(range(20))) == [x * 2 + 1 for x in range(20)]
+
+
+def _invert(x):
+    return 1 / x
+
+
+def test_pipeline_passes_failing_items_to_on_error():
+    pipeline = Pipeline(
+        [Stage("invert", _invert, on_error=lambda item, error: str(error))], logger
+    )
+
+    assert list(pipeline.run([1, 0, 2])) == [1.0, "division by zero", 0.5]
+
+
+def test_pipeline_raises_stage_errors():
+    pipeline = Pipeline([Stage("invert", _invert)], logger)
+    results = pipeline.run([1, 0, 2])
+
+    assert next(results) == 1.0
+    assert next(results) == 0.5
+    with pytest.raises(ZeroDivisionError):
+        next(results)
+
+
+def test_pipeline_raises_feed_errors():
+    def items():
+        yield 1
+        raise OSError("walk failed")
+
+    pipeline = Pipeline([Stage("invert", _invert)], logger)
+    results = pipeline.run(items())
+
+    assert next(results) == 1.0
+    with pytest.raises(OSError, match="walk failed"):
+        next(results)
+
+
+def test_pipeline_applies_backpressure():
+    produced = []
+    release = threading.Event()
+
+    def items():
+        for item in range(100):
+            produced.append(item)
+            yield item
+
+    def slow(item):
+        release.wait()
+        return item
+
+    pipeline = Pipeline([Stage("slow", slow)], logger, queue_size=2)
+    results = pipeline.run(items())
+    threading.Timer(0.2, release.set).start()
+
+    assert next(results) == 0
+    # only the bounded queues are filled ahead of the slow stage.
+    assert len(produced) < 10
+    assert len(list(results)) == 99
+
+
+def test_pipeline_needs_workers():
+    with pytest.raises(ValueError):
+        Pipeline([Stage("none", lambda x: x, workers=0)], logger)
+
+
+def test_process_data_pipeline(tmp_path):
+    match_ids = [f"match_{index}" for index in range(5)]
+    _write_event_files(tmp_path, match_ids)
+    (tmp_path / "match_event_broken.json").write_text("{not json")
+    feed = _event_feed_json("match_invalid")
+    feed["liveData"]["event"][0]["typeId"] = "pass"
+    with open(tmp_path / "match_event_match_invalid.json", "w") as f:
+        json.dump(feed, f)
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url=f"sqlite:///{tmp_path / 'data.db'}",
+        batch_size=2,
+    )
+
+    results = provider.process_data(parse_workers=2, validate_workers=2, queue_size=1)
+
+    assert len(results) == 7
+    failed = [result.file_path for result in results if not result.success]
+    assert failed == [str(tmp_path / "match_event_broken.json")]
+    session = provider.session
+    # only the invalid event is dropped, the rest of its batch is stored.
+    assert session.scalar(select(func.count()).select_from(Event)) == 29
+    assert session.scalar(select(func.count()).select_from(Period)) == 6
+
+
+def test_process_data_pipeline_reports_failed_stages(tmp_path):
+    _write_event_files(tmp_path, ["match_1", "match_2"])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'data.db'}"
+    )
+    validate_pending_match = provider.validate_pending_match
+
+    def validate(pending):
+        if pending.files[0][0].endswith("match_2.json"):
+            raise RuntimeError("validation crashed")
+        return validate_pending_match(pending)
+
+    provider.validate_pending_match = validate
+
+    results = provider.process_data()
+
+    assert [result.success for result in results] == [True, False]
+    assert results[1].error == "validation crashed"
+
+
+def test_process_data_pipeline_raises_discovery_errors(tmp_path):
+    _write_match_files(tmp_path, "match_1")
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'data.db'}"
+    )
+    iter_feed_files = provider.iter_feed_files
+
+    def broken_walk():
+        yield from iter_feed_files()
+        raise OSError("walk failed")
+
+    provider.iter_feed_files = broken_walk
+
+    with pytest.raises(OSError, match="walk failed"):
+        provider.process_data()
+    session = provider.session
+    assert session.scalar(select(func.count()).select_from(Event)) == 5
+
+
+def test_validate_stage_prepares_a_bounded_number_of_batches(tmp_path):
+    _write_event_files(tmp_path, ["match_1"])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url=f"sqlite:///{tmp_path / 'data.db'}",
+        batch_size=1,
+        json_decoder="stream",
+    )
+    provider.PREPARED_BATCHES = 2
+    files = [(str(tmp_path / "match_event_match_1.json"), "match_event")]
+
+    pending = provider.parse_pending_match(PendingMatch(0, files))
+    pending = provider.validate_pending_match(pending)
+
+    # the events after the prepared batches are still in the file.
+    feed = pending.feeds[files[0][0]]
+    assert "event" in feed._streams
+    assert "event" not in feed.live_data
+
+    results = provider.process_match_files(
+        pending.files, feeds=pending.feeds, fingerprints=pending.fingerprints
+    )
+
+    assert [result.success for result in results] == [True]
+    session = provider.session
+    assert session.scalar(select(func.count()).select_from(Event)) == 5
+
+
+def test_prepare_pending_match_validates_all_batches(tmp_path):
+    _write_event_files(tmp_path, ["match_1"])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url=f"sqlite:///{tmp_path / 'data.db'}",
+        batch_size=1,
+        json_decoder="stream",
+    )
+    provider.PREPARED_BATCHES = 2
+    files = [(str(tmp_path / "match_event_match_1.json"), "match_event")]
+
+    pending = provider.prepare_pending_match(PendingMatch(0, files))
+
+    # nothing is left to decode or validate while the match is written.
+    with patch.object(provider, "build_event_rows", side_effect=AssertionError):
+        results = provider.process_match_files(
+            pending.files, feeds=pending.feeds, fingerprints=pending.fingerprints
+        )
+
+    assert [result.success for result in results] == [True]
+    session = provider.session
+    assert session.scalar(select(func.count()).select_from(Event)) == 5
+
+
+def test_prepare_pending_match_fails_on_a_cut_file(tmp_path):
+    feed = json.dumps(_event_feed_json("match_1"))
+    third_event = feed.index('"id": 102')
+    (tmp_path / "match_event_match_1.json").write_text(feed[:third_event])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url=f"sqlite:///{tmp_path / 'data.db'}",
+        batch_size=1,
+        json_decoder="stream",
+    )
+    files = [(str(tmp_path / "match_event_match_1.json"), "match_event")]
+
+    pending = provider.prepare_pending_match(PendingMatch(0, files))
+
+    assert pending.error
+    assert pending.feeds == {}
+
+
+def test_write_stage_fails_on_events_after_the_prepared_batches(tmp_path):
+    feed = json.dumps(_event_feed_json("match_1"))
+    # cut the file in the third event, after the prepared batches.
+    third_event = feed.index('"id": 102')
+    (tmp_path / "match_event_match_1.json").write_text(feed[:third_event])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url=f"sqlite:///{tmp_path / 'data.db'}",
+        batch_size=1,
+        json_decoder="stream",
+    )
+    provider.PREPARED_BATCHES = 1
+
+    results = provider.process_data()
+
+    assert [result.success for result in results] == [False]
+    session = provider.session
+    assert session.scalar(select(func.count()).select_from(Event)) == 0
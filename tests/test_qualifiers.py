@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from fcb_data_providers.database_models import Event, Qualifier
+from fcb_data_providers.providers import StatsPerformProvider
+from fcb_data_providers.qualifiers import get_match_qualifiers, pack_qualifiers
+from tests.test_stats_perform import _event_feed_json
+
+EXPECTED_QUALIFIERS = {100 + index: {56: "Back", 212: "12.3"} for index in range(5)}
+
+
+def _provider(tmp_path, **kwargs):
+    return StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url=f"sqlite:///{tmp_path / 'data.db'}",
+        **kwargs,
+    )
+
+
+def test_pack_qualifiers():
+    event_rows = [{"e_id": 1}, {"e_id": 2}]
+    qualifier_rows = [
+        {"event_id": 1, "qualifier_id": 56, "value": "Back"},
+        {"event_id": 1, "qualifier_id": 212, "value": None},
+    ]
+
+    pack_qualifiers(event_rows, qualifier_rows)
+
+    assert event_rows[0]["qualifiers"] == {"56": "Back", "212": None}
+    assert event_rows[1]["qualifiers"] == {}
+
+
+@pytest.mark.parametrize("bulk_insert", [False, True])
+def test_compact_qualifier_layout(tmp_path, bulk_insert):
+    with open(tmp_path / "match_event_match_1.json", "w") as f:
+        json.dump(_event_feed_json("match_1"), f)
+    provider = _provider(tmp_path, bulk_insert=bulk_insert, qualifier_layout="compact")
+
+    provider.process_data()
+
+    session = provider.session
+    assert session.scalar(select(func.count()).select_from(Qualifier)) == 0
+    assert session.scalar(select(Event.qualifiers).where(Event.e_id == 100)) == {
+        "56": "Back",
+        "212": "12.3",
+    }
+    assert get_match_qualifiers(session, "match_1") == EXPECTED_QUALIFIERS
+
+
+def test_get_match_qualifiers_reads_both_layouts(tmp_path):
+    feed = _event_feed_json("match_2")
+    for event in feed["liveData"]["event"]:
+        event["id"] += 100
+    with open(tmp_path / "match_event_match_1.json", "w") as f:
+        json.dump(_event_feed_json("match_1"), f)
+    _provider(tmp_path).process_data()
+    with open(tmp_path / "match_event_match_2.json", "w") as f:
+        json.dump(feed, f)
+    provider = _provider(tmp_path, qualifier_layout="compact")
+    provider.process_data()
+
+    session = provider.session
+    assert get_match_qualifiers(session, "match_1") == EXPECTED_QUALIFIERS
+    assert get_match_qualifiers(session, "match_2") == {
+        event_id + 100: qualifiers
+        for event_id, qualifiers in EXPECTED_QUALIFIERS.items()
+    }
+
+
+def test_unknown_qualifier_layout():
+    with pytest.raises(ValueError):
+        StatsPerformProvider(
+            data_path="test_data_path",
+            database_url="sqlite:///:memory:",
+            qualifier_layout="columns",
+        )
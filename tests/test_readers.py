@@ -0,0 +1,156 @@
+import json
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from fcb_data_providers.readers import JsonStreamReader, MatchFeed, read_feed
+from fcb_data_providers.readers.decoders import get_json_decoder, load_feed
+from fcb_data_providers.synthetic import write_feed_file
+
+FEED = {
+    "matchInfo": {"id": "match_1", "localDate": "2023-10-01"},
+    "liveData": {
+        "matchDetails": {"matchStatus": "Played", "matchLengthMin": 95},
+        "event": [
+            {"id": index, "x": 12.5 + index, "qualifier": [{"qualifierId": 1}]}
+            for index in range(25)
+        ],
+        "var": [{"type": "Goal", "value": 123456789}],
+    },
+}
+
+
+@pytest.fixture
+def feed_file(tmp_path):
+    file_path = tmp_path / "match_event_1.json"
+    file_path.write_text(json.dumps(FEED, indent=2))
+    return str(file_path)
+
+
+def test_read_feed_streams_events_in_batches(feed_file):
+    feed = read_feed(feed_file, chunk_size=7)
+
+    assert feed.match_info == FEED["matchInfo"]
+    assert feed.live_data["matchDetails"] == FEED["liveData"]["matchDetails"]
+    assert "event" not in feed.live_data
+
+    batches = list(feed.iter_batches("event", 10))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert sum(batches, []) == FEED["liveData"]["event"]
+    # the sections after the stream are read once the stream is exhausted.
+    assert feed.live_data["var"] == FEED["liveData"]["var"]
+
+
+def test_read_feed_loads_events_before_required_sections(tmp_path):
+    file_path = tmp_path / "match_event_1.json"
+    live_data = {"event": [{"id": 1}], "matchDetails": {"matchStatus": "Played"}}
+    file_path.write_text(json.dumps({"matchInfo": {"id": "m"}, "liveData": live_data}))
+
+    feed = read_feed(str(file_path))
+
+    assert feed.live_data == live_data
+    assert list(feed.iter_batches("event", 10)) == [[{"id": 1}]]
+
+
+def test_json_stream_reader_rejects_invalid_json(tmp_path):
+    file_path = tmp_path / "broken.json"
+    file_path.write_text('{"matchInfo": {"id": ')
+
+    with open(file_path) as file_obj:
+        reader = JsonStreamReader(file_obj, chunk_size=4)
+        keys = reader.iter_object()
+        assert next(keys) == "matchInfo"
+        with pytest.raises(json.JSONDecodeError):
+            reader.read_value()
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 40))
+def test_json_stream_reader_reads_numbers_cut_between_chunks(tmp_path, chunk_size):
+    numbers = [12.5, 3.25, 1e-7, 100.125, -4, 2e10] * 10
+    file_path = tmp_path / "numbers.json"
+    file_path.write_text(json.dumps(numbers))
+
+    with open(file_path) as file_obj:
+        reader = JsonStreamReader(file_obj, chunk_size=chunk_size)
+        values = [reader.read_value() for _ in reader.iter_array()]
+
+    assert values == numbers
+
+
+def test_match_feed_from_dataframe(feed_file):
+    feed = MatchFeed.from_dataframe(pd.read_json(feed_file))
+
+    assert feed.match_info == FEED["matchInfo"]
+    assert list(feed.iter_batches("event", 100)) == [FEED["liveData"]["event"]]
+
+
+@pytest.mark.parametrize(
+    "extension", [".json", ".json.gz", ".jsonl", ".jsonl.gz", ".json.zst"]
+)
+def test_read_feed_formats(tmp_path, extension):
+    if extension.endswith(".zst"):
+        pytest.importorskip("zstandard")
+    file_path = str(tmp_path / f"match_event_1{extension}")
+    write_feed_file(file_path, FEED)
+
+    feed = read_feed(file_path)
+
+    assert feed.match_info == FEED["matchInfo"]
+    assert list(feed.iter_batches("event", 100)) == [FEED["liveData"]["event"]]
+    assert feed.live_data["var"] == FEED["liveData"]["var"]
+
+    feed = read_feed(file_path, stream_key=None)
+    assert feed.live_data["event"] == FEED["liveData"]["event"]
+
+
+def test_get_json_data_decodes_compressed_feeds(stats_perform_provider, tmp_path):
+    file_path = str(tmp_path / "match_event_1.jsonl.gz")
+    write_feed_file(file_path, FEED)
+
+    feed = MatchFeed.from_dataframe(stats_perform_provider.get_json_data(file_path))
+
+    assert feed.match_info == FEED["matchInfo"]
+    assert feed.live_data["event"] == FEED["liveData"]["event"]
+
+
+@pytest.mark.parametrize("decoder", ["auto", "orjson", "msgspec", "json"])
+@pytest.mark.parametrize("extension", [".json", ".json.gz", ".jsonl"])
+def test_load_feed_decoders(tmp_path, decoder, extension):
+    if decoder in ("orjson", "msgspec"):
+        pytest.importorskip(decoder)
+    file_path = str(tmp_path / f"match_event_1{extension}")
+    write_feed_file(file_path, FEED)
+
+    feed = load_feed(file_path, decoder)
+
+    assert feed.match_info == FEED["matchInfo"]
+    assert feed.load().live_data == FEED["liveData"]
+
+
+@pytest.mark.parametrize("extension", [".json.gz", ".jsonl", ".jsonl.gz"])
+def test_load_feed_streams_compressed_and_json_lines_files(tmp_path, extension):
+    file_path = str(tmp_path / f"match_event_1{extension}")
+    write_feed_file(file_path, FEED)
+    decoded_lines = []
+
+    def decode(data):
+        decoded_lines.append(data)
+        return json.loads(data)
+
+    with patch(
+        "fcb_data_providers.readers.decoders.get_json_decoder", return_value=decode
+    ):
+        feed = load_feed(file_path, "json")
+
+    # the events are left in the file until they are iterated.
+    assert "event" not in feed.live_data
+    events = [event for batch in feed.iter_batches("event", 2) for event in batch]
+    assert events == FEED["liveData"]["event"]
+    if ".jsonl" in extension:
+        assert len(decoded_lines) == 1 + len(events)
+
+
+def test_get_json_decoder_rejects_unknown_decoders():
+    with pytest.raises(ValueError):
+        get_json_decoder("simplejson")
@@ -0,0 +1,99 @@
+import json
+
+import pandas as pd
+import pytest
+
+from fcb_data_providers.providers import StatsPerformProvider
+from fcb_data_providers.repositories import EventRepository
+from tests.test_stats_perform import _event_feed_json
+
+
+@pytest.fixture
+def repository(tmp_path):
+    for match_id in ["match_1", "match_2"]:
+        feed = _event_feed_json(match_id)
+        if match_id == "match_2":
+            for event in feed["liveData"]["event"]:
+                event["id"] += 100
+                event["playerId"] = "player_2"
+        with open(tmp_path / f"match_event_{match_id}.json", "w") as f:
+            json.dump(feed, f)
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'data.db'}"
+    )
+    provider.process_data()
+    return EventRepository(provider.db)
+
+
+def test_iter_events_in_chunks(repository):
+    chunks = list(repository.iter_events(chunk_size=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    events = pd.concat(chunks)
+    assert list(events["match_id"].unique()) == ["match_1", "match_2"]
+    assert "qualifiers" not in events.columns
+
+
+def test_iter_events_filters(repository):
+    events = pd.concat(
+        repository.iter_events(match_ids=["match_2"], player_ids=["player_2"])
+    )
+    assert list(events["e_id"]) == [200, 201, 202, 203, 204]
+
+    assert list(repository.iter_events(type_ids=[99])) == []
+
+
+def test_iter_events_joins_qualifiers(repository):
+    chunks = list(
+        repository.iter_events(match_ids=["match_1"], chunk_size=2, qualifiers="join")
+    )
+
+    events = pd.concat(chunks)
+    assert len(events) == 10
+    assert set(events["qualifier_id"]) == {56, 212}
+
+
+def test_iter_events_pivots_qualifiers(repository):
+    events = next(repository.iter_events(match_ids=["match_1"], qualifiers="pivot"))
+
+    assert len(events) == 5
+    assert list(events["qualifier_56"]) == ["Back"] * 5
+    assert list(events["qualifier_212"]) == ["12.3"] * 5
+
+
+def test_iter_events_arrow(repository):
+    pytest.importorskip("pyarrow")
+
+    table = next(repository.iter_events(output="arrow"))
+
+    assert table.num_rows == 10
+    assert "e_id" in table.column_names
+
+
+@pytest.mark.parametrize("qualifier_layout", ["rows", "compact"])
+def test_iter_events_pivots_the_same_columns_in_every_chunk(tmp_path, qualifier_layout):
+    feed = _event_feed_json("match_1")
+    feed["liveData"]["event"][-1]["qualifier"].append(
+        {"id": 3000, "qualifierId": 140, "value": "50.1"}
+    )
+    with open(tmp_path / "match_event_match_1.json", "w") as f:
+        json.dump(feed, f)
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url=f"sqlite:///{tmp_path / 'data.db'}",
+        qualifier_layout=qualifier_layout,
+    )
+    provider.process_data()
+
+    chunks = list(
+        EventRepository(provider.db).iter_events(chunk_size=2, qualifiers="pivot")
+    )
+
+    assert len(chunks) == 3
+    for chunk in chunks:
+        assert list(chunk.columns[-3:]) == [
+            "qualifier_56",
+            "qualifier_140",
+            "qualifier_212",
+        ]
+    assert list(pd.concat(chunks)["qualifier_140"].isna()) == [True] * 4 + [False]
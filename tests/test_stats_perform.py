@@ -1,31 +1,40 @@
+import json
 from unittest.mock import MagicMock, patch
 
+import pandas as pd
 import pytest
 
+from fcb_data_providers.bulk_writer import BulkWriter
+from fcb_data_providers.database_models import (Card, Event, Goal, Match,
+                                                Period, Qualifier, Score, Team)
 from fcb_data_providers.providers import StatsPerformProvider
 
 
-@pytest.fixture
-def stats_perform_provider():
-    return StatsPerformProvider(
-        data_path="test_data_path", database_url="sqlite:///:memory:"
-    )
+def test_get_match_related_files(stats_perform_provider, tmp_path):
+    for file_name in ["match_event_1.json", "match_stats_1.json", "other_file.txt"]:
+        (tmp_path / file_name).write_text("{}")
+    (tmp_path / "2023").mkdir()
+    (tmp_path / "2023" / "match_event_2.json").write_text("{}")
+    stats_perform_provider.data_path = str(tmp_path)
 
+    result = stats_perform_provider.get_match_related_files("match_event")
+    assert result == [
+        str(tmp_path / "match_event_1.json"),
+        str(tmp_path / "2023" / "match_event_2.json"),
+    ]
 
-def test_get_match_related_files(stats_perform_provider):
-    with patch(
-        "os.listdir",
-        return_value=["match_event_1.json", "match_stats_1.json", "other_file.txt"],
-    ):
-        result = stats_perform_provider.get_match_related_files("match_event")
-        assert result == ["test_data_path/match_event_1.json"]
 
+@pytest.mark.parametrize("json_decoder", ["auto", "json", "stream"])
+def test_get_json_data(stats_perform_provider, tmp_path, json_decoder):
+    file_path = tmp_path / "match_event_1.json"
+    file_path.write_text(json.dumps(_event_feed_json()))
+    stats_perform_provider.json_decoder = json_decoder
 
-def test_get_json_data(stats_perform_provider):
-    with patch("pandas.read_json", return_value="mock_dataframe") as mock_read_json:
-        result = stats_perform_provider.get_json_data("test_file_path.json")
-        mock_read_json.assert_called_once_with("test_file_path.json")
-        assert result == "mock_dataframe"
+    result = stats_perform_provider.get_json_data(str(file_path))
+
+    expected = pd.read_json(str(file_path))
+    assert result["liveData"]["event"] == expected["liveData"]["event"]
+    assert result["matchInfo"]["contestant"] == expected["matchInfo"]["contestant"]
 
 
 def test_store_match_data(stats_perform_provider):
@@ -79,3 +88,376 @@ def test_store_score_data(stats_perform_provider):
     stats_perform_provider.store_score_data("match_1", match_data)
     stats_perform_provider.session.add.assert_called_once()
     stats_perform_provider.session.commit.assert_called_once()
+
+
+def _events_data():
+    return [
+        {
+            "id": 100 + index,
+            "eventId": index,
+            "typeId": 1,
+            "periodId": 1,
+            "timeMin": index,
+            "timeSec": 0,
+            "x": 50.0,
+            "y": 50.0,
+            "outcome": 1,
+            "timestamp": "2023-10-01T15:00:00Z",
+            "lastModified": "2023-10-01T15:00:00Z",
+            "playerId": "player_1",
+            "contestantId": "team_1",
+            "qualifier": [
+                {"id": 1000 + index, "qualifierId": 56, "value": "Back"},
+                {"id": 2000 + index, "qualifierId": 212, "value": "12.3"},
+            ],
+        }
+        for index in range(5)
+    ]
+
+
+def test_store_event_data_bulk_insert():
+    provider = StatsPerformProvider(
+        data_path="test_data_path",
+        database_url="sqlite:///:memory:",
+        bulk_insert=True,
+        batch_size=4,
+    )
+    provider.store_event_data("match_1", _events_data())
+
+    assert provider.session.query(Event).count() == 5
+    assert provider.session.query(Qualifier).count() == 10
+    assert provider.bulk_writer.pending() == 0
+
+
+def test_bulk_writer_flushes_full_batches():
+    session = MagicMock()
+    writer = BulkWriter(session, MagicMock(), batch_size=2)
+    writer.add(Qualifier, {"qualifier_id": 1})
+    session.execute.assert_not_called()
+
+    writer.add(Qualifier, {"qualifier_id": 2})
+    writer.add(Qualifier, {"qualifier_id": 3})
+    assert session.execute.call_count == 1
+    assert writer.pending(Qualifier) == 1
+
+    assert writer.flush() == 1
+    assert session.execute.call_count == 2
+    assert session.commit.call_count == 2
+
+
+def _event_feed_json(match_id="match_1", periods=None):
+    match_info = {
+        "id": match_id,
+        "localDate": "2023-10-01",
+        "contestant": [
+            {
+                "id": "team_1",
+                "name": "Team 1",
+                "shortName": "T1",
+                "officialName": "Team 1",
+                "code": "T1",
+                "position": "home",
+            },
+            {
+                "id": "team_2",
+                "name": "Team 2",
+                "shortName": "T2",
+                "officialName": "Team 2",
+                "code": "T2",
+                "position": "away",
+            },
+        ],
+    }
+    live_data = {
+        "matchDetails": {
+            "matchStatus": "Played",
+            "winner": "home",
+            "matchLengthMin": 95,
+            "matchLengthSec": 10,
+            "period": periods
+            or [
+                {
+                    "start": "2023-10-01T15:00:00Z",
+                    "end": "2023-10-01T15:47:00Z",
+                    "lengthMin": 47,
+                    "lengthSec": 0,
+                }
+            ],
+            "scores": {
+                "ht": {"home": 1, "away": 0},
+                "ft": {"home": 2, "away": 1},
+                "total": {"home": 2, "away": 1},
+            },
+        },
+        "event": _events_data(),
+    }
+    return {"matchInfo": match_info, "liveData": live_data}
+
+
+def _event_feed(match_id="match_1", periods=None):
+    return pd.DataFrame(_event_feed_json(match_id, periods))
+
+
+def test_process_event_data_commits_once_per_match(stats_perform_provider):
+    session = stats_perform_provider.session
+    with patch.object(session, "commit", wraps=session.commit) as mock_commit:
+        stats_perform_provider.process_event_data(_event_feed())
+
+    mock_commit.assert_called_once()
+    assert session.query(Match).count() == 1
+    assert session.query(Team).count() == 2
+    assert session.query(Event).count() == 5
+    assert session.query(Qualifier).count() == 10
+
+
+def test_process_event_data_isolates_failing_section(stats_perform_provider):
+    stats_perform_provider.process_event_data(_event_feed(periods=[{"start": None}]))
+
+    session = stats_perform_provider.session
+    assert session.query(Period).count() == 0
+    assert session.query(Match).count() == 1
+    assert session.query(Event).count() == 5
+
+
+def test_process_file_fails_on_a_failing_event_batch(tmp_path):
+    _write_event_files(tmp_path, ["match_1"])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+
+    with patch.object(
+        provider, "store_event_rows", side_effect=RuntimeError("disk full")
+    ):
+        result = provider.process_file(
+            str(tmp_path / "match_event_match_1.json"), "match_event"
+        )
+
+    assert (result.success, result.error) == (False, "disk full")
+    session = provider.session
+    assert session.query(Match).count() == 0
+    assert provider.manifest.get_entry(result.file_path) is None
+
+
+def test_process_file_fails_on_a_failing_match_section(tmp_path):
+    _write_event_files(tmp_path, ["match_1"])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+
+    with patch.object(
+        provider, "store_match_data", side_effect=ValueError("invalid match")
+    ):
+        result = provider.process_file(
+            str(tmp_path / "match_event_match_1.json"), "match_event"
+        )
+
+    assert result.success is False
+    assert provider.session.query(Event).count() == 0
+
+
+def test_file_with_a_failed_section_is_retried_on_the_next_run(tmp_path):
+    _write_event_files(tmp_path, ["match_1"])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+
+    with patch.object(provider, "store_score_data", side_effect=KeyError("ht")):
+        results = provider.process_data()
+
+    assert [(r.success, r.error) for r in results] == [
+        (False, "Failed sections: score")
+    ]
+    session = provider.session
+    assert session.query(Score).count() == 0
+    assert session.query(Event).count() == 5
+    entry = provider.manifest.get_entry(results[0].file_path)
+    assert entry.failed_sections == "score"
+
+    results = provider.process_data()
+
+    assert [(r.success, r.error) for r in results] == [(True, None)]
+    assert session.query(Score).count() == 1
+    assert session.query(Event).count() == 5
+    assert provider.manifest.get_entry(results[0].file_path).failed_sections is None
+    assert provider.process_data() == []
+
+
+@pytest.mark.parametrize("bulk_insert", [False, True])
+def test_process_event_data_drops_qualifier_without_qualifier_id(bulk_insert):
+    provider = StatsPerformProvider(
+        data_path="test_data_path",
+        database_url="sqlite:///:memory:",
+        bulk_insert=bulk_insert,
+    )
+    feed = _event_feed_json()
+    del feed["liveData"]["event"][2]["qualifier"][0]["qualifierId"]
+
+    provider.process_event_data(pd.DataFrame(feed))
+
+    session = provider.session
+    assert session.query(Event).count() == 5
+    assert session.query(Qualifier).count() == 9
+    assert session.query(Qualifier).filter_by(q_id=1002).count() == 0
+
+
+def test_process_event_data_rolls_back_match_on_failed_commit(
+    stats_perform_provider,
+):
+    session = stats_perform_provider.session
+    with patch.object(session, "commit", side_effect=RuntimeError("disk full")):
+        with pytest.raises(RuntimeError):
+            stats_perform_provider.process_event_data(_event_feed())
+
+    assert session.query(Match).count() == 0
+    assert session.query(Event).count() == 0
+
+
+def _write_event_files(data_path, match_ids):
+    for match_id in match_ids:
+        with open(data_path / f"match_event_{match_id}.json", "w") as f:
+            json.dump(_event_feed_json(match_id), f)
+
+
+def test_process_file_reports_failure(stats_perform_provider, tmp_path):
+    broken_file = tmp_path / "match_event_broken.json"
+    broken_file.write_text("{not json")
+
+    result = stats_perform_provider.process_file(str(broken_file), "match_event")
+
+    assert result.success is False
+    assert result.error
+
+
+def test_process_data_with_workers(tmp_path):
+    _write_event_files(tmp_path, ["match_1", "match_2", "match_3"])
+    (tmp_path / "match_event_broken.json").write_text("{not json")
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path),
+        database_url=f"sqlite:///{tmp_path / 'fcb.db'}",
+        bulk_insert=True,
+    )
+
+    results = provider.process_data(workers=2)
+
+    assert len(results) == 4
+    assert sorted(r.file_path for r in results if not r.success) == [
+        f"{tmp_path}/match_event_broken.json"
+    ]
+    assert provider.session.query(Match).count() == 3
+    assert provider.session.query(Event).count() == 15
+
+
+def _stats_feed_json(match_id="match_1"):
+    feed = _event_feed_json(match_id)
+    live_data = feed["liveData"]
+    del live_data["event"]
+    live_data["lineUp"] = [
+        {
+            "contestantId": f"team_{team}",
+            "player": [
+                {
+                    "playerId": f"player_{team}_{number}",
+                    "firstName": "First",
+                    "lastName": f"Last {number}",
+                    "matchName": f"F. Last {number}",
+                    "shirtNumber": number,
+                    "position": "Midfielder",
+                    "formationPlace": str(number),
+                }
+                for number in range(1, 12)
+            ],
+        }
+        for team in (1, 2)
+    ]
+    live_data["goal"] = [
+        {
+            "contestantId": "team_1",
+            "periodId": 1,
+            "timeMin": 12,
+            "timeMinSec": "11:48",
+            "lastUpdated": "2023-10-01T15:13:00Z",
+            "timestamp": "2023-10-01T15:12:00Z",
+            "type": "G",
+            "scorerId": "player_1_9",
+            "scorerName": "F. Last 9",
+            "optaEventId": "2501",
+            "homeScore": 1,
+            "awayScore": 0,
+        }
+    ]
+    live_data["card"] = [
+        {
+            "contestantId": "team_2",
+            "periodId": 2,
+            "timeMin": 70,
+            "timeMinSec": "69:10",
+            "lastUpdated": "2023-10-01T16:30:00Z",
+            "timestamp": "2023-10-01T16:29:00Z",
+            "type": "YC",
+            "playerId": "player_2_4",
+            "playerName": "F. Last 4",
+            "optaEventId": "2502",
+            "cardReason": "Foul",
+        }
+    ]
+    return feed
+
+
+def _write_match_files(data_path, match_id, stats_feed=None):
+    with open(data_path / f"match_event_{match_id}.json", "w") as f:
+        json.dump(_event_feed_json(match_id), f)
+    with open(data_path / f"match_stats_{match_id}.json", "w") as f:
+        json.dump(stats_feed or _stats_feed_json(match_id), f)
+
+
+def test_process_data_merges_the_files_of_a_match(tmp_path):
+    stats_feed = _stats_feed_json("match_1")
+    stats_feed["liveData"]["matchDetails"]["matchLengthMin"] = 96
+    _write_match_files(tmp_path, "match_1", stats_feed)
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+
+    with patch.object(
+        provider, "process_match_data", wraps=provider.process_match_data
+    ) as mock_process_match_data:
+        results = provider.process_data()
+
+    mock_process_match_data.assert_called_once()
+    assert [(r.file_type, r.success, r.match_id) for r in results] == [
+        ("match_event", True, "match_1"),
+        ("match_stats", True, "match_1"),
+    ]
+    session = provider.session
+    assert session.query(Period).count() == 1
+    assert session.query(Score).count() == 1
+    assert session.query(Event).count() == 5
+    assert session.query(Goal).count() == 1
+    assert session.query(Card).count() == 1
+    assert session.get(Match, "match_1").match_length_min == 96
+
+
+def test_file_of_a_stored_match_replaces_its_shared_sections(tmp_path):
+    _write_event_files(tmp_path, ["match_1"])
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+    provider.process_data()
+
+    with open(tmp_path / "match_stats_match_1.json", "w") as f:
+        json.dump(_stats_feed_json("match_1"), f)
+    results = provider.process_data()
+
+    assert [r.file_type for r in results] == ["match_stats"]
+    assert provider.session.query(Period).count() == 1
+    assert provider.session.query(Score).count() == 1
+    assert provider.session.query(Event).count() == 5
+
+
+def test_process_match_data_rejects_feeds_of_different_matches(
+    stats_perform_provider,
+):
+    with pytest.raises(ValueError):
+        stats_perform_provider.process_match_data(
+            _event_feed("match_1"), pd.DataFrame(_stats_feed_json("match_2"))
+        )
@@ -0,0 +1,37 @@
+import json
+
+from fcb_data_providers.database_models import Event, Match, Player, Qualifier
+from fcb_data_providers.providers import StatsPerformProvider
+from fcb_data_providers.synthetic import (generate_match_event_feed,
+                                          write_synthetic_feeds)
+
+
+def test_generate_match_event_feed_is_reproducible():
+    feed = generate_match_event_feed("match_1", events=50, seed=3)
+
+    assert feed == generate_match_event_feed("match_1", events=50, seed=3)
+    assert len(feed["liveData"]["event"]) == 50
+    assert len({event["id"] for event in feed["liveData"]["event"]}) == 50
+
+
+def test_write_synthetic_feeds_are_processed(tmp_path):
+    file_paths = write_synthetic_feeds(
+        str(tmp_path), matches=2, events=40, players_per_team=14
+    )
+    provider = StatsPerformProvider(
+        data_path=str(tmp_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+
+    results = provider.process_data()
+
+    assert len(file_paths) == 4
+    assert all(result.success for result in results)
+    assert provider.session.query(Match).count() == 2
+    assert provider.session.query(Event).count() == 80
+    assert provider.session.query(Player).count() == 56
+    qualifiers = 0
+    for file_path in file_paths[::2]:
+        with open(file_path) as f:
+            events = json.load(f)["liveData"]["event"]
+        qualifiers += sum(len(event["qualifier"]) for event in events)
+    assert provider.session.query(Qualifier).count() == qualifiers
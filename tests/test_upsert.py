@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
+
+from fcb_data_providers.database_models import Match, Team
+from fcb_data_providers.upsert import build_upsert, upsert_rows
+from tests.test_stats_perform import _event_feed
+
+
+def _team(name="Team 1"):
+    return {
+        "id": "team_1",
+        "name": name,
+        "short_name": "T1",
+        "official_name": name,
+        "code": "T1",
+    }
+
+
+def test_build_upsert_postgresql():
+    statement = str(
+        build_upsert(Team, "postgresql").compile(dialect=postgresql.dialect())
+    )
+
+    assert "ON CONFLICT (id) DO UPDATE SET" in statement
+    assert "teams.name IS DISTINCT FROM excluded.name" in statement
+    assert "created_at = excluded.created_at" not in statement
+
+
+def test_upsert_rows_skips_unchanged_rows(stats_perform_provider):
+    session = stats_perform_provider.session
+    assert upsert_rows(session, Team, [_team(), _team()]) == 1
+    session.commit()
+    updated_at = session.get(Team, "team_1").updated_at
+
+    upsert_rows(session, Team, [_team()])
+    session.commit()
+    session.expire_all()
+    assert session.get(Team, "team_1").updated_at == updated_at
+
+    upsert_rows(session, Team, [_team("Team One")])
+    session.commit()
+    session.expire_all()
+    team = session.get(Team, "team_1")
+    assert team.name == "Team One"
+    assert team.updated_at > updated_at
+
+
+def test_process_event_data_upserts_repeated_entities(stats_perform_provider):
+    stats_perform_provider.process_event_data(_event_feed("match_1"))
+
+    with patch.object(stats_perform_provider.logger, "error") as mock_error:
+        stats_perform_provider.process_event_data(_event_feed("match_2"))
+
+    mock_error.assert_not_called()
+    session = stats_perform_provider.session
+    assert session.query(Team).count() == 2
+    assert session.query(Match).count() == 2
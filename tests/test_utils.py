@@ -0,0 +1,42 @@
+import logging
+
+from fcb_data_providers.utils import (ErrorSampler, configure_logging,
+                                      stop_logging)
+
+
+def _error_record(message="Error storing event data"):
+    return logging.LogRecord(
+        "fcb", logging.ERROR, "stats_perform.py", 10, message, None, None
+    )
+
+
+def test_error_sampler_samples_repeated_errors():
+    sampler = ErrorSampler(burst=2, sample_rate=3)
+
+    kept = [sampler.filter(_error_record()) for _ in range(8)]
+
+    assert kept == [True, True, False, False, True, False, False, True]
+
+
+def test_error_sampler_keeps_warnings():
+    sampler = ErrorSampler(burst=0, sample_rate=100)
+    record = _error_record()
+    record.levelno = logging.WARNING
+
+    assert sampler.filter(record)
+
+
+def test_configure_logging_writes_from_queue(tmp_path):
+    root_logger = logging.getLogger()
+    level = root_logger.level
+    try:
+        configure_logging(log_dir=str(tmp_path / "log"), level="INFO")
+        logging.getLogger("fcb_test").info("Stored %s rows", 10)
+        logging.getLogger("fcb_test").debug("Not written")
+    finally:
+        stop_logging()
+        root_logger.setLevel(level)
+
+    log_lines = (tmp_path / "log" / "app.log").read_text().splitlines()
+    assert len(log_lines) == 1
+    assert log_lines[0].endswith("fcb_test - INFO - Stored 10 rows")
@@ -0,0 +1,164 @@
+import logging
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from fcb_data_providers.database import Database
+from fcb_data_providers.database_models import Match, Period, WorkItem
+from fcb_data_providers.providers import StatsPerformProvider
+from fcb_data_providers.work_queue import WorkQueue, utc_now
+from tests.test_stats_perform import _write_event_files, _write_match_files
+
+FILES = [("a.json", "match_stats"), ("b.json", "match_event")]
+
+
+def _work_queue(tmp_path, **kwargs):
+    database = Database(f"sqlite:///{tmp_path / 'queue.db'}")
+    database.create_tables()
+    return WorkQueue(database.get_session(), logging.getLogger(__name__), **kwargs)
+
+
+def test_claim_leases_every_file_once(tmp_path):
+    work_queue = _work_queue(tmp_path)
+    work_queue.register_files(FILES)
+    work_queue.register_files(FILES)
+
+    first = work_queue.claim("worker_1")
+    second = work_queue.claim("worker_2")
+
+    assert [lease.file_path for lease in first] == ["a.json"]
+    assert [lease.file_path for lease in second] == ["b.json"]
+    assert work_queue.claim("worker_3") == []
+    assert work_queue.heartbeat("worker_1") == 1
+
+
+def test_claim_leases_the_files_of_a_match_together(tmp_path):
+    work_queue = _work_queue(tmp_path)
+    work_queue.register_files(
+        [
+            ("data/match_stats_1.json", "match_stats"),
+            ("data/match_event_2.json", "match_event"),
+            ("data/match_event_1.json", "match_event"),
+        ]
+    )
+
+    first = work_queue.claim("worker_1")
+    second = work_queue.claim("worker_2")
+
+    assert [(lease.file_path, lease.match_id) for lease in first] == [
+        ("data/match_event_1.json", "1"),
+        ("data/match_stats_1.json", "1"),
+    ]
+    assert [lease.file_path for lease in second] == ["data/match_event_2.json"]
+    assert work_queue.heartbeat("worker_1") == 2
+
+
+def test_claim_skips_matches_leased_by_another_worker(tmp_path):
+    work_queue = _work_queue(tmp_path)
+    work_queue.register_files([("data/match_event_1.json", "match_event")])
+    work_queue.claim("worker_1")
+
+    # the stats file of the match is found while worker_1 stores its events.
+    work_queue.register_files([("data/match_stats_1.json", "match_stats")])
+    assert work_queue.claim("worker_2") == []
+
+    work_queue.complete("worker_1", "data/match_event_1.json", success=True)
+    leases = work_queue.claim("worker_2")
+    assert [lease.file_path for lease in leases] == ["data/match_stats_1.json"]
+
+
+def test_expired_lease_is_retried_then_failed(tmp_path):
+    work_queue = _work_queue(tmp_path, max_attempts=2)
+    work_queue.register_files(FILES[:1])
+
+    def expire():
+        work_queue.session.execute(
+            update(WorkItem).values(lease_expires_at=utc_now() - timedelta(seconds=1))
+        )
+        work_queue.session.commit()
+
+    work_queue.claim("crashed_worker")
+    expire()
+    retried = work_queue.claim("worker_2")
+    assert retried[0].attempts == 2
+    assert not work_queue.complete("crashed_worker", "a.json", success=True)
+
+    expire()
+    assert work_queue.claim("worker_3") == []
+    assert work_queue.get_status_counts() == {"failed": 1}
+
+
+def test_failed_file_is_pending_until_max_attempts(tmp_path):
+    work_queue = _work_queue(tmp_path, max_attempts=2)
+    work_queue.register_files(FILES[:1])
+
+    work_queue.claim("worker_1")
+    work_queue.complete("worker_1", "a.json", success=False, error="invalid")
+    assert work_queue.get_status_counts() == {"pending": 1}
+
+    work_queue.claim("worker_1")
+    work_queue.complete("worker_1", "a.json", success=False, error="invalid")
+    assert work_queue.get_status_counts() == {"failed": 1}
+
+    work_queue.register_files(FILES[:1])
+    assert work_queue.get_status_counts() == {"pending": 1}
+
+
+def test_process_queued_files(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    _write_event_files(data_path, ["match_1", "match_2", "match_3"])
+    provider = StatsPerformProvider(
+        data_path=str(data_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+    work_queue = WorkQueue(provider.session, provider.logger)
+    work_queue.register_files(provider.get_files_to_process())
+
+    results = provider.process_queued_files(work_queue, "worker_1", claim_size=2)
+
+    assert len(results) == 3
+    assert all(result.success for result in results)
+    assert work_queue.get_status_counts() == {"done": 3}
+    assert provider.session.query(Match).count() == 3
+
+
+def test_process_queued_files_stores_the_files_of_a_match_together(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    _write_match_files(data_path, "match_1")
+    _write_match_files(data_path, "match_2")
+    provider = StatsPerformProvider(
+        data_path=str(data_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+    work_queue = WorkQueue(provider.session, provider.logger)
+    work_queue.register_files(provider.get_files_to_process())
+    process_match_files = provider.process_match_files
+    processed = []
+
+    def record_match_files(files, *args, **kwargs):
+        processed.append([file_type for _, file_type in files])
+        return process_match_files(files, *args, **kwargs)
+
+    provider.process_match_files = record_match_files
+
+    results = provider.process_queued_files(work_queue, "worker_1")
+
+    assert processed == [["match_event", "match_stats"]] * 2
+    assert all(result.success for result in results)
+    assert work_queue.get_status_counts() == {"done": 4}
+    # the match details of both feeds are stored once per match.
+    assert provider.session.query(Period).count() == 2
+
+
+def test_process_data_distributed_falls_back_on_sqlite(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    _write_event_files(data_path, ["match_1"])
+    provider = StatsPerformProvider(
+        data_path=str(data_path), database_url=f"sqlite:///{tmp_path / 'fcb.db'}"
+    )
+
+    results = provider.process_data_distributed()
+
+    assert [result.success for result in results] == [True]
+    assert provider.session.query(WorkItem).count() == 0